@@ -5,6 +5,7 @@ jWT 토큰 인증을 위한 미들웨어입니다. 각 endpoint에서 사용됩
 from fastapi import Request, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+from telemetry.tracing import traced
 from util import decode_jwt
 
 
@@ -12,6 +13,7 @@ class JWTBearer(HTTPBearer):
     def __init__(self, auto_error: bool = True):
         super(JWTBearer, self).__init__(auto_error=auto_error)
 
+    @traced('JWTBearer')
     async def __call__(self, request: Request):
         credentials: HTTPAuthorizationCredentials = await super(JWTBearer, self).__call__(request)
         if credentials:
@@ -0,0 +1,135 @@
+"""
+token bucket 방식으로 요청 수를 제한하는 미들웨어입니다. 각 endpoint에서 dependency로 사용됩니다.
+다른 dependency보다 먼저 실행되도록 `dependencies`의 맨 앞에 두어, 제한된 요청은 DB session을 열기 전에 거절합니다.
+"""
+
+import abc
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request, HTTPException
+from starlette import status
+
+from util import get_user_id_from_request
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+
+
+def _limit_from_env(name: str, default: str) -> Tuple[float, int]:
+    """
+    `초당 충전되는 요청 수,최대 누적 요청 수` 형식의 환경 변수를 읽습니다. ex) `2,10`
+    """
+    rate, capacity = os.environ.get(name, default).split(',')
+    return float(rate), int(capacity)
+
+
+class RateLimitBackend(abc.ABC):
+    """
+    bucket 상태를 저장하는 저장소입니다.
+    여러 프로세스가 같은 제한을 공유해야 한다면 redis 등을 사용하는 구현체를 `set_rate_limit_backend`로 등록합니다.
+    """
+
+    @abc.abstractmethod
+    def consume(self, key: str, rate: float, capacity: int) -> float:
+        """
+        `key`의 bucket에서 token 하나를 사용합니다.
+        사용할 수 있다면 0을, 아니라면 token이 충전될 때까지 기다려야 하는 시간(초)을 반환합니다.
+        """
+
+    @abc.abstractmethod
+    def reset(self):
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    프로세스 메모리에 bucket을 저장합니다. 최대 `max_keys`개의 bucket을 유지하고, 오래 사용되지 않은 bucket부터 제거합니다.
+    제거된 bucket은 가득 찬 상태로 다시 시작하므로 제한이 느슨해질 뿐 잘못 거절하지는 않습니다.
+    """
+
+    def __init__(self, max_keys: int = 100000, timer: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.timer = timer
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, capacity: int) -> float:
+        now = self.timer()
+
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / rate
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return retry_after
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+_rate_limit_backend: RateLimitBackend = InMemoryRateLimitBackend()
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    return _rate_limit_backend
+
+
+def set_rate_limit_backend(backend: RateLimitBackend):
+    global _rate_limit_backend
+    _rate_limit_backend = backend
+
+
+class RateLimiter:
+    """
+    `scope`별로 요청 수를 제한합니다. `per_user`면 JWT의 `id` claim으로, 아니라면 client ip로 요청자를 구분합니다.
+    token이 없거나 잘못된 경우에도 ip로 구분하므로, 인증에 실패하는 요청도 제한됩니다.
+    """
+
+    def __init__(self, scope: str, rate: float, capacity: int, per_user: bool = True):
+        self.scope = scope
+        self.rate = rate
+        self.capacity = capacity
+        self.per_user = per_user
+
+    async def __call__(self, request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        retry_after = get_rate_limit_backend().consume(f'{self.scope}:{self.get_identity(request)}',
+                                                       self.rate, self.capacity)
+        if retry_after > 0:
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail='Too many requests',
+                                headers={'Retry-After': str(math.ceil(retry_after))})
+
+    def get_identity(self, request: Request) -> str:
+        if self.per_user:
+            user_id = get_user_id_from_request(request)
+            if user_id is not None:
+                return f'user:{user_id}'
+
+        return f"ip:{request.client.host if request.client else ''}"
+
+
+make_reservation_rate_limiter = RateLimiter('make_reservation',
+                                            *_limit_from_env('RATE_LIMIT_MAKE_RESERVATION', '1,5'))
+get_exam_schedules_rate_limiter = RateLimiter('get_exam_schedules',
+                                              *_limit_from_env('RATE_LIMIT_GET_EXAM_SCHEDULES', '5,20'))
+login_rate_limiter = RateLimiter('login', *_limit_from_env('RATE_LIMIT_LOGIN', '1,10'), per_user=False)
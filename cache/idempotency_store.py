@@ -0,0 +1,165 @@
+"""
+`Idempotency-Key` 헤더로 요청된 쓰기 API의 응답을 저장합니다.
+같은 key로 다시 요청이 오면 저장된 응답을 그대로 반환해서, 재시도된 요청이 DB를 다시 조회/변경하지 않도록 합니다.
+`IDEMPOTENCY_BACKEND` 환경 변수로 저장소를 선택합니다. (`memory` / `db`)
+"""
+
+import abc
+import datetime
+import os
+from typing import Callable, NamedTuple, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from cache.ttl_cache import TTLCache
+from db.models import IdempotencyKey
+
+load_dotenv()
+
+IDEMPOTENCY_BACKEND = os.environ.get('IDEMPOTENCY_BACKEND', 'memory')
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', 60 * 60 * 24))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', 100000))
+# 처리 중인 요청의 key가 유지되는 시간. 요청을 처리하던 프로세스가 죽어도 이 시간이 지나면 다시 요청할 수 있습니다.
+IDEMPOTENCY_PENDING_TTL_SECONDS = 60
+
+
+class StoredResponse(NamedTuple):
+    fingerprint: str
+    # 처리 중인 요청이면 None
+    status_code: Optional[int] = None
+    media_type: Optional[str] = None
+    body: Optional[bytes] = None
+
+
+class IdempotencyStore(abc.ABC):
+    @abc.abstractmethod
+    def reserve(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        """
+        key를 처리 중 상태로 등록합니다. 새로 등록했다면 None을, 이미 존재하는 key라면 저장된 응답을 반환합니다.
+        """
+
+    @abc.abstractmethod
+    def save(self, key: str, response: StoredResponse):
+        ...
+
+    @abc.abstractmethod
+    def release(self, key: str):
+        """
+        응답을 저장하지 않고 key를 삭제합니다. 같은 key로 다시 요청할 수 있게 됩니다.
+        """
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """
+    프로세스 메모리에 응답을 저장합니다. 최대 `maxsize`개의 key를 `ttl`초 동안 유지합니다.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize, ttl)
+
+    def reserve(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        pending = StoredResponse(fingerprint=fingerprint)
+        if self.cache.add(key, pending, ttl=IDEMPOTENCY_PENDING_TTL_SECONDS):
+            return None
+
+        return self.cache.get(key, pending)
+
+    def save(self, key: str, response: StoredResponse):
+        self.cache.set(key, response)
+
+    def release(self, key: str):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """
+    `idempotency_keys` 테이블에 응답을 저장합니다. 여러 프로세스가 같은 저장소를 공유할 때 사용합니다.
+    만료된 row는 응답을 `cleanup_interval`번 저장할 때마다 한번씩 삭제됩니다.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], ttl: float, cleanup_interval: int = 1000):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.cleanup_interval = cleanup_interval
+        self._save_count = 0
+
+    def reserve(self, key: str, fingerprint: str) -> Optional[StoredResponse]:
+        now = _utcnow()
+
+        with self.session_factory() as session:
+            record = session.get(IdempotencyKey, key)
+            if record is not None and record.expires_at > now:
+                return _to_stored_response(record)
+
+            if record is not None:
+                session.delete(record)
+                session.flush()
+
+            session.add(IdempotencyKey(
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=now + datetime.timedelta(seconds=IDEMPOTENCY_PENDING_TTL_SECONDS)
+            ))
+            try:
+                session.commit()
+            except IntegrityError:
+                # 다른 프로세스가 같은 key를 먼저 등록한 경우
+                session.rollback()
+                record = session.get(IdempotencyKey, key)
+                return _to_stored_response(record) if record else StoredResponse(fingerprint=fingerprint)
+
+        return None
+
+    def save(self, key: str, response: StoredResponse):
+        with self.session_factory() as session:
+            record = session.get(IdempotencyKey, key)
+            if record is None:
+                record = IdempotencyKey(key=key)
+                session.add(record)
+
+            record.fingerprint = response.fingerprint
+            record.status_code = response.status_code
+            record.media_type = response.media_type
+            record.body = response.body
+            record.expires_at = _utcnow() + datetime.timedelta(seconds=self.ttl)
+            session.commit()
+
+            self._save_count += 1
+            if self._save_count % self.cleanup_interval == 0:
+                session.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= _utcnow()))
+                session.commit()
+
+    def release(self, key: str):
+        with self.session_factory() as session:
+            session.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key))
+            session.commit()
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+def _to_stored_response(record: IdempotencyKey) -> StoredResponse:
+    return StoredResponse(
+        fingerprint=record.fingerprint,
+        status_code=record.status_code,
+        media_type=record.media_type,
+        body=record.body
+    )
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    if IDEMPOTENCY_BACKEND == 'db':
+        from db.database import SessionLocal
+        return DatabaseIdempotencyStore(SessionLocal, IDEMPOTENCY_TTL_SECONDS)
+
+    return InMemoryIdempotencyStore(IDEMPOTENCY_MAX_KEYS, IDEMPOTENCY_TTL_SECONDS)
+
+
+idempotency_store = create_idempotency_store()
@@ -0,0 +1,197 @@
+"""
+여러 uvicorn worker가 각자 가진 프로세스 메모리 cache를 서로 맞추기 위한 invalidation bus 입니다.
+repository의 쓰기 method가 commit 전에 변경 event를 발행하면, 다른 worker들이 event를 받아 관련된 cache를 지웁니다.
+
+- postgres: 쓰기와 같은 transaction에서 `NOTIFY`를 실행하므로 commit된 변경만 전달됩니다.
+  worker마다 `LISTEN` 하는 thread가 event를 받습니다
+- 그 외(sqlite): 같은 프로세스 안의 bus들에게 commit 후 전달합니다
+
+event를 발행한 worker는 이미 자신의 cache를 직접 갱신하므로, 자신이 발행한 event는 무시합니다.
+"""
+
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+import weakref
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from db.database import engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CACHE_INVALIDATION_ENABLED = os.environ.get('CACHE_INVALIDATION_ENABLED', 'false').lower() == 'true'
+CACHE_INVALIDATION_CHANNEL = os.environ.get('CACHE_INVALIDATION_CHANNEL', 'cache_invalidation')
+# 연결이 끊겼을 때 다시 연결하기까지 기다리는 시간(초)
+CACHE_INVALIDATION_RECONNECT_SECONDS = float(os.environ.get('CACHE_INVALIDATION_RECONNECT_SECONDS', 1))
+
+# event 종류
+RESERVATION = 'reservation'
+EXAM_SCHEDULE = 'exam_schedule'
+# 놓친 event가 있을 수 있어 모든 cache를 지워야 하는 경우
+RESET = 'reset'
+
+# RESERVATION event의 변경 종류. 받은 worker는 유저 한 명의 변경만 cache에 반영하고 시험 일정의 cache는 유지합니다
+CREATED = 'created'
+UPDATED = 'updated'
+CONFIRMED = 'confirmed'
+DELETED = 'deleted'
+
+_PENDING_KEY = 'pending_invalidations'
+_POLL_TIMEOUT_SECONDS = 1
+
+
+class InvalidationEvent(NamedTuple):
+    kind: str
+    exam_schedule_id: Optional[int] = None
+    # 여러 유저의 예약이 함께 변경된 경우 None. 받은 worker는 시험 일정의 cache를 모두 지웁니다
+    user_id: Optional[int] = None
+    origin: str = ''
+    # 유저 한 명의 예약이 변경된 경우 변경 종류(CREATED, UPDATED, CONFIRMED, DELETED)
+    operation: Optional[str] = None
+
+    def to_payload(self) -> str:
+        return json.dumps(self._asdict(), separators=(',', ':'))
+
+    @classmethod
+    def from_payload(cls, payload: str) -> 'InvalidationEvent':
+        return cls(**json.loads(payload))
+
+
+InvalidationHandler = Callable[[InvalidationEvent], None]
+
+# 같은 프로세스 안의 bus들. postgres가 아닌 DB를 사용할 때 event를 전달합니다
+_local_buses: 'weakref.WeakSet[InvalidationBus]' = weakref.WeakSet()
+
+
+class InvalidationBus:
+    def __init__(self, bind: Engine = engine, enabled: bool = CACHE_INVALIDATION_ENABLED,
+                 channel: str = CACHE_INVALIDATION_CHANNEL,
+                 reconnect_interval: float = CACHE_INVALIDATION_RECONNECT_SECONDS):
+        self.bind = bind
+        self.enabled = enabled
+        self.channel = channel
+        self.reconnect_interval = reconnect_interval
+        self.origin = uuid.uuid4().hex
+        self._handlers: List[InvalidationHandler] = []
+        self._stopped = threading.Event()
+        self._listener: Optional[threading.Thread] = None
+        _local_buses.add(self)
+
+    def subscribe(self, handler: InvalidationHandler):
+        self._handlers.append(handler)
+
+    def publish(self, session: Session, kind: str, exam_schedule_id: Optional[int] = None,
+                user_id: Optional[int] = None, operation: Optional[str] = None):
+        """
+        session의 transaction이 commit되면 다른 worker들에게 event를 전달합니다. commit 전에 호출해야 합니다.
+        """
+        self.publish_many(session, kind, [(exam_schedule_id, user_id, operation)])
+
+    def publish_many(self, session: Session, kind: str,
+                     changes: Iterable[Tuple[Optional[int], Optional[int], Optional[str]]]):
+        """
+        `(exam_schedule_id, user_id, operation)` 목록의 event들을 한 번의 쿼리로 발행합니다.
+        """
+        if not self.enabled:
+            return
+
+        payloads = [InvalidationEvent(kind, exam_schedule_id, user_id, self.origin, operation).to_payload()
+                    for exam_schedule_id, user_id, operation in changes]
+        if not payloads:
+            return
+
+        if session.get_bind().dialect.name == 'postgresql':
+            session.execute(text('SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) payload'),
+                            {'channel': self.channel, 'payloads': payloads})
+        else:
+            # postgres와 같이 transaction이 시작된 뒤의 commit/rollback에만 event가 전달/취소되도록 합니다
+            session.connection()
+            session.info.setdefault(_PENDING_KEY, []).extend((self.channel, payload) for payload in payloads)
+
+    def dispatch(self, payload: str):
+        invalidation_event = InvalidationEvent.from_payload(payload)
+        if invalidation_event.origin != self.origin:
+            self._handle(invalidation_event)
+
+    def start(self):
+        if not self.enabled or self._listener is not None or self.bind.dialect.name != 'postgresql':
+            return
+
+        self._stopped.clear()
+        self._listener = threading.Thread(target=self._listen, name='cache-invalidation-listener', daemon=True)
+        self._listener.start()
+
+    def stop(self):
+        if self._listener is not None:
+            self._stopped.set()
+            self._listener.join()
+            self._listener = None
+
+    def _handle(self, invalidation_event: InvalidationEvent):
+        for handler in self._handlers:
+            try:
+                handler(invalidation_event)
+            except Exception:
+                logger.exception('failed to handle cache invalidation %s', invalidation_event)
+
+    def _listen(self):
+        while not self._stopped.is_set():
+            try:
+                connection = self.bind.raw_connection()
+                # LISTEN 중인 연결은 pool에 돌려주지 않습니다
+                connection.detach()
+                try:
+                    dbapi_connection = connection.driver_connection
+                    dbapi_connection.autocommit = True
+                    with dbapi_connection.cursor() as cursor:
+                        cursor.execute(f'LISTEN "{self.channel}"')
+
+                    # LISTEN 전(처음 연결 전에 cache를 만든 동안이나 연결이 끊겨 있던 동안)의 event는 받을 수 없으므로
+                    # 모든 cache를 지웁니다. cache는 다음 조회 때 DB에서 다시 만들어집니다
+                    self._handle(InvalidationEvent(RESET))
+
+                    self._receive(dbapi_connection)
+                finally:
+                    connection.close()
+            except Exception:
+                logger.exception('cache invalidation listener disconnected')
+                self._stopped.wait(self.reconnect_interval)
+
+    def _receive(self, dbapi_connection):
+        while not self._stopped.is_set():
+            readable, _, _ = select.select([dbapi_connection], [], [], _POLL_TIMEOUT_SECONDS)
+            if not readable:
+                continue
+
+            dbapi_connection.poll()
+            while dbapi_connection.notifies:
+                notify = dbapi_connection.notifies.pop(0)
+                self.dispatch(notify.payload)
+
+
+@event.listens_for(Session, 'after_commit')
+def _deliver_pending_invalidations(session: Session):
+    for channel, payload in session.info.pop(_PENDING_KEY, []):
+        for bus in list(_local_buses):
+            if bus.enabled and bus.channel == channel:
+                bus.dispatch(payload)
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_pending_invalidations(session: Session, previous_transaction):
+    # savepoint의 rollback은 바깥 transaction의 변경을 취소하지 않습니다
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,156 @@
+"""
+정수 집합을 압축해서 저장하는 roaring bitmap 입니다.
+값의 상위 16bit로 container를 나누고, container마다 값이 적으면 정렬된 배열로, 많으면 8KB bitmap으로 저장합니다.
+유저 id처럼 촘촘한 정수는 bitmap container로 1개당 1bit, 드문드문한 정수는 배열 container로 1개당 2byte를 사용합니다.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, Union
+
+# container의 값이 이 개수를 넘으면 bitmap으로 바꿉니다. (배열 2byte * 4096 = bitmap 8KB)
+ARRAY_CONTAINER_MAX_SIZE = 4096
+_BITMAP_BYTES = (1 << 16) // 8
+
+
+class _ArrayContainer:
+    __slots__ = ('values',)
+
+    def __init__(self, values: Iterable[int] = ()):
+        self.values = array('H', sorted(set(values)))
+
+    def __contains__(self, low: int) -> bool:
+        index = bisect_left(self.values, low)
+        return index < len(self.values) and self.values[index] == low
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.values)
+
+    def add(self, low: int) -> bool:
+        index = bisect_left(self.values, low)
+        if index < len(self.values) and self.values[index] == low:
+            return False
+        self.values.insert(index, low)
+        return True
+
+    def discard(self, low: int) -> bool:
+        index = bisect_left(self.values, low)
+        if index < len(self.values) and self.values[index] == low:
+            del self.values[index]
+            return True
+        return False
+
+    def nbytes(self) -> int:
+        return len(self.values) * self.values.itemsize
+
+
+class _BitmapContainer:
+    __slots__ = ('bits', 'size')
+
+    def __init__(self, values: Iterable[int] = ()):
+        self.bits = bytearray(_BITMAP_BYTES)
+        self.size = 0
+        for low in values:
+            self.add(low)
+
+    def __contains__(self, low: int) -> bool:
+        return bool(self.bits[low >> 3] >> (low & 7) & 1)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self.bits):
+            while byte:
+                lowest = byte & -byte
+                yield (index << 3) + lowest.bit_length() - 1
+                byte ^= lowest
+
+    def add(self, low: int) -> bool:
+        mask = 1 << (low & 7)
+        if self.bits[low >> 3] & mask:
+            return False
+        self.bits[low >> 3] |= mask
+        self.size += 1
+        return True
+
+    def discard(self, low: int) -> bool:
+        mask = 1 << (low & 7)
+        if not self.bits[low >> 3] & mask:
+            return False
+        self.bits[low >> 3] &= ~mask
+        self.size -= 1
+        return True
+
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+
+_Container = Union[_ArrayContainer, _BitmapContainer]
+
+
+def _make_container(lows: Iterable[int]) -> _Container:
+    container = _ArrayContainer(lows)
+    if len(container) > ARRAY_CONTAINER_MAX_SIZE:
+        return _BitmapContainer(container)
+    return container
+
+
+class RoaringBitmap:
+    """
+    0 이상 2^32 미만의 정수 집합입니다. thread-safe 하지 않으므로 사용하는 쪽에서 lock을 잡아야 합니다.
+    """
+
+    __slots__ = ('_containers', '_size')
+
+    def __init__(self, values: Iterable[int] = ()):
+        groups: Dict[int, list] = {}
+        for value in values:
+            groups.setdefault(value >> 16, []).append(value & 0xFFFF)
+
+        self._containers: Dict[int, _Container] = {high: _make_container(lows) for high, lows in groups.items()}
+        self._size = sum(len(container) for container in self._containers.values())
+
+    def __contains__(self, value: int) -> bool:
+        container = self._containers.get(value >> 16)
+        return container is not None and (value & 0xFFFF) in container
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[int]:
+        for high in sorted(self._containers):
+            for low in self._containers[high]:
+                yield high << 16 | low
+
+    def add(self, value: int):
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None:
+            container = self._containers[high] = _ArrayContainer()
+
+        if container.add(low):
+            self._size += 1
+            if isinstance(container, _ArrayContainer) and len(container) > ARRAY_CONTAINER_MAX_SIZE:
+                self._containers[high] = _BitmapContainer(container)
+
+    def discard(self, value: int):
+        high, low = value >> 16, value & 0xFFFF
+        container = self._containers.get(high)
+        if container is None or not container.discard(low):
+            return
+
+        self._size -= 1
+        if not container:
+            del self._containers[high]
+        elif isinstance(container, _BitmapContainer) and len(container) <= ARRAY_CONTAINER_MAX_SIZE:
+            self._containers[high] = _ArrayContainer(container)
+
+    def nbytes(self) -> int:
+        """
+        값을 저장하는 데 사용하는 대략적인 메모리 크기(byte)
+        """
+        return sum(container.nbytes() for container in self._containers.values())
@@ -0,0 +1,69 @@
+"""
+프로세스 메모리에 값을 저장하는 cache입니다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    최대 크기와 유효 시간(초)을 가지는 thread-safe LRU cache입니다.
+    유효 시간이 지난 항목은 조회 시점에 제거되고, 최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 제거됩니다.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+
+            value, expires_at = item
+            if expires_at <= self.timer():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> bool:
+        """
+        key가 없거나 만료된 경우에만 값을 저장합니다. 저장했다면 True를 반환합니다.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > self.timer():
+                return False
+
+            self._set(key, value, ttl)
+            return True
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _set(self, key: Hashable, value: Any, ttl: Optional[float]):
+        self._data[key] = (value, self.timer() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
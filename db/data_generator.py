@@ -0,0 +1,215 @@
+"""
+성능 테스트를 위한 대량의 데이터를 만들어 DB에 바로 저장합니다.
+    python -m db.data_generator --users 5000000 --exam-schedules 5000 --reservations 50000000 --reset
+
+- 유저: 사전 데이터와 같은 형식(`user {i}`, `admin {i}`, 비밀번호 789456)으로 만듭니다
+- 시험 일정: 현재 시각 기준 `--past-days`일 전부터 `--future-days`일 후까지, 평일 업무 시간에 몰리도록 분포합니다
+- 예약 신청: 시험 일정별 예약 수가 Zipf 분포를 따라 일부 인기 시험에 몰리도록 만듭니다.
+  인기 순위는 시험 일정에 무작위로 배정되고, 시험 일정마다 서로 다른 유저를 무작위로 고릅니다
+
+postgres에는 `COPY`로, 그 외(sqlite)에는 executemany로 `--batch-size`개씩 저장하므로 데이터 크기와 상관없이 일정한 메모리를 사용합니다.
+빈 DB에 저장하는 것을 가정하며, `--reset`이면 모든 테이블을 다시 만든 뒤 저장합니다.
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import io
+import itertools
+import random
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from db import models
+from db.database import Base, engine
+from db.partitions import create_reservation_partition
+from service.exam_schedule_service import MAX_RESERVATION_NUM
+from util import generate_uuid7
+
+# 사전 데이터와 같은 비밀번호(789456)
+_PASSWORD = hashlib.md5('789456'.encode('utf-8')).hexdigest()
+
+# 시험 시작 시각(시)과 그 비율. 오전과 이른 오후에 가장 많습니다
+_START_HOURS = (9, 10, 11, 13, 14, 15, 16, 17, 19)
+_START_HOUR_WEIGHTS = (10, 14, 12, 14, 12, 10, 8, 5, 3)
+# 시험 시간(분)과 그 비율
+_DURATION_MINUTES = (60, 90, 120, 180)
+_DURATION_WEIGHTS = (3, 4, 6, 2)
+# 주말에 뽑힌 날짜를 다시 뽑을 확률
+_WEEKEND_RESAMPLE_RATE = 0.7
+
+
+def generate_users(user_num: int, admin_num: int) -> Iterator[dict]:
+    for i in range(1, user_num + 1):
+        yield {'id': i, 'user_id': f'user {i}', 'password': _PASSWORD, 'role': 'client'}
+    for i in range(1, admin_num + 1):
+        yield {'id': user_num + i, 'user_id': f'admin {i}', 'password': _PASSWORD, 'role': 'admin'}
+
+
+def generate_exam_schedules(exam_schedule_num: int, now: datetime.datetime, past_days: int, future_days: int,
+                            rng: random.Random) -> List[dict]:
+    """
+    시작 시각 순서대로 id를 부여한 시험 일정 목록을 반환합니다. 시각은 timezone 없는 UTC 입니다.
+    """
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    start_times = []
+    for _ in range(exam_schedule_num):
+        day = today + datetime.timedelta(days=rng.randint(-past_days, future_days))
+        while day.weekday() >= 5 and rng.random() < _WEEKEND_RESAMPLE_RATE:
+            day = today + datetime.timedelta(days=rng.randint(-past_days, future_days))
+
+        hour = rng.choices(_START_HOURS, _START_HOUR_WEIGHTS)[0]
+        start_times.append(day.replace(hour=hour, minute=rng.choice((0, 30))))
+
+    start_times.sort()
+    return [
+        {'id': i, 'name': f'exam {i}', 'start_time': start_time,
+         'end_time': start_time + datetime.timedelta(minutes=rng.choices(_DURATION_MINUTES, _DURATION_WEIGHTS)[0])}
+        for i, start_time in enumerate(start_times, start=1)
+    ]
+
+
+def reservation_counts(exam_schedule_num: int, reservation_num: int, user_num: int, zipf_exponent: float,
+                       rng: random.Random) -> List[int]:
+    """
+    시험 일정별 예약 수를 반환합니다. 인기 순위가 k번째인 시험은 전체 예약의 `1 / k^zipf_exponent`에 비례하는 예약을 가지며,
+    한 시험의 예약 수는 유저 수를 넘을 수 없습니다.
+    """
+    if not exam_schedule_num:
+        return []
+
+    ranks = list(range(1, exam_schedule_num + 1))
+    rng.shuffle(ranks)
+    weights = [1 / rank ** zipf_exponent for rank in ranks]
+    total_weight = sum(weights)
+
+    return [min(round(reservation_num * weight / total_weight), user_num) for weight in weights]
+
+
+def generate_reservations(exam_schedules: List[dict], counts: List[int], user_num: int, confirmed_ratio: float,
+                          rng: random.Random) -> Iterator[dict]:
+    """
+    시험 일정마다 서로 다른 유저를 골라 예약을 만듭니다. 확정된 예약은 시험 일정의 최대 예약 수를 넘지 않습니다.
+    """
+    for exam_schedule, count in zip(exam_schedules, counts):
+        confirmed_num = min(round(count * confirmed_ratio), MAX_RESERVATION_NUM)
+        for index, user_id in enumerate(rng.sample(range(1, user_num + 1), count)):
+            yield {'id': generate_uuid7(), 'user_id': user_id, 'exam_schedule_id': exam_schedule['id'], 'comment': '',
+                   'confirmed': index < confirmed_num}
+
+
+def bulk_load(connection: Connection, table_name: str, rows: Iterable[dict], batch_size: int) -> int:
+    """
+    `rows`를 `batch_size`개씩 저장하고 저장한 row 수를 반환합니다. commit은 호출한 쪽에서 합니다.
+    """
+    table = Base.metadata.tables[table_name]
+    columns = [column.name for column in table.columns]
+    copy_sql = f'COPY {table_name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+    use_copy = connection.dialect.name == 'postgresql'
+
+    loaded_num = 0
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, batch_size)):
+        if use_copy:
+            buffer = io.StringIO()
+            # COPY는 따옴표 없는 빈 값을 NULL로 읽으므로, 빈 문자열(예약의 comment 등)도 따옴표로 감쌉니다
+            csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC).writerows([row[column] for column in columns]
+                                                                        for row in batch)
+            _copy(connection, copy_sql, buffer)
+        else:
+            connection.execute(insert(table), batch)
+        loaded_num += len(batch)
+
+    return loaded_num
+
+
+def _copy(connection: Connection, copy_sql: str, buffer: io.StringIO):
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+        else:
+            # psycopg(3)
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def generate(bind: Engine = engine, user_num: int = 1000000, admin_num: int = 10, exam_schedule_num: int = 2000,
+             reservation_num: int = 10000000, zipf_exponent: float = 1.1, confirmed_ratio: float = 0.3,
+             past_days: int = 30, future_days: int = 90, batch_size: int = 10000, seed: int = 0,
+             reset: bool = False, now: Optional[datetime.datetime] = None) -> Dict[str, int]:
+    """
+    데이터를 만들어 저장하고, 테이블별로 저장한 row 수를 반환합니다. 같은 `seed`면 같은 유저, 시험 일정, 예약 조합을 만듭니다.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+    if reset:
+        Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+
+    exam_schedules = generate_exam_schedules(exam_schedule_num, now, past_days, future_days, rng)
+    counts = reservation_counts(exam_schedule_num, reservation_num, user_num, zipf_exponent, rng)
+
+    with Session(bind=bind) as session:
+        for exam_schedule in exam_schedules:
+            create_reservation_partition(session, exam_schedule['id'])
+        session.commit()
+
+    loaded = {}
+    with bind.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            connection.exec_driver_sql('PRAGMA synchronous = OFF')
+
+        for table_name, rows in ((models.User.__tablename__, generate_users(user_num, admin_num)),
+                                 (models.ExamSchedule.__tablename__, exam_schedules),
+                                 (models.Reservation.__tablename__,
+                                  generate_reservations(exam_schedules, counts, user_num, confirmed_ratio, rng))):
+            loaded[table_name] = bulk_load(connection, table_name, rows, batch_size)
+            connection.commit()
+            print(f'---inserted {loaded[table_name]} rows into {table_name}---')
+
+        if connection.dialect.name == 'postgresql':
+            # id를 직접 지정해 저장했으므로, 이후 생성되는 row가 같은 id를 받지 않도록 sequence를 맞춥니다
+            for table_name in (models.User.__tablename__, models.ExamSchedule.__tablename__):
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table_name}', 'id'), "
+                    f"(SELECT COALESCE(max(id), 0) + 1 FROM {table_name}), false)"
+                ))
+            connection.commit()
+
+        connection.execute(text('ANALYZE'))
+        connection.commit()
+
+    return loaded
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='성능 테스트를 위한 대량의 유저, 시험 일정, 예약 신청 데이터를 만듭니다.')
+    parser.add_argument('--users', type=int, default=1000000, help='고객 유저 수')
+    parser.add_argument('--admins', type=int, default=10, help='어드민 유저 수')
+    parser.add_argument('--exam-schedules', type=int, default=2000, help='시험 일정 수')
+    parser.add_argument('--reservations', type=int, default=10000000,
+                        help='전체 예약 신청 수. 시험 일정의 예약 수가 유저 수를 넘는 만큼은 만들지 않습니다')
+    parser.add_argument('--zipf-exponent', type=float, default=1.1,
+                        help='클수록 예약이 소수의 인기 시험에 몰립니다. 0이면 고르게 분포합니다')
+    parser.add_argument('--confirmed-ratio', type=float, default=0.3, help='확정된 예약 신청의 비율')
+    parser.add_argument('--past-days', type=int, default=30, help='현재보다 며칠 전까지 시험 일정을 만들지')
+    parser.add_argument('--future-days', type=int, default=90, help='현재보다 며칠 후까지 시험 일정을 만들지')
+    parser.add_argument('--batch-size', type=int, default=10000, help='한 번에 저장하는 row 수')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reset', action='store_true', help='모든 테이블을 지우고 다시 만든 뒤 저장합니다')
+    args = parser.parse_args()
+
+    generate(user_num=args.users, admin_num=args.admins, exam_schedule_num=args.exam_schedules,
+             reservation_num=args.reservations, zipf_exponent=args.zipf_exponent,
+             confirmed_ratio=args.confirmed_ratio, past_days=args.past_days, future_days=args.future_days,
+             batch_size=args.batch_size, seed=args.seed, reset=args.reset)
@@ -1,27 +1,151 @@
 """
 DB에 연결하는 코드입니다.
+`SQLALCHEMY_REPLICA_URLS`가 설정되어 있다면, 읽기 전용 API는 `get_read_db`를 통해 replica DB를 사용합니다.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base
+import functools
+import itertools
+import threading
+import time
+from typing import Callable, List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import declarative_base, Session
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 import os
 
+from cache.ttl_cache import TTLCache
+from util import get_user_id_from_request
+
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.environ.get('SQLALCHEMY_DATABASE_URL')
+# 쉼표로 구분된 replica DB 주소들
+SQLALCHEMY_REPLICA_URLS = [url.strip() for url in os.environ.get('SQLALCHEMY_REPLICA_URLS', '').split(',') if url.strip()]
+# 복제 지연이 이 시간(초)보다 큰 replica는 사용하지 않습니다
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = float(os.environ.get('REPLICA_LAG_CHECK_INTERVAL_SECONDS', 1))
+# 예약을 변경한 유저의 읽기 요청은 이 시간(초) 동안 primary DB로 보냅니다
+READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 10))
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+replica_engines = [create_engine(url) for url in SQLALCHEMY_REPLICA_URLS]
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# repository는 commit 후 객체를 다시 조회하지 않고 RETURNING 결과를 사용하므로, commit 시 객체를 expire하지 않습니다
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# bind는 session을 만들 때 `ReplicaRouter`가 선택한 engine으로 지정합니다
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
 
+def measure_replication_lag(replica_engine: Engine) -> float:
+    """
+    replica의 복제 지연 시간(초)을 반환합니다. postgres가 아닌 DB는 지연이 없다고 가정합니다.
+    """
+    if replica_engine.dialect.name != 'postgresql':
+        return 0.0
+
+    with replica_engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )).scalar()
+
+
+class ReplicaRouter:
+    """
+    읽기 전용 session에 사용할 engine을 선택합니다.
+    replica들을 round-robin으로 사용하며, 복제 지연이 크거나 연결할 수 없는 replica는 건너뛰고,
+    사용할 수 있는 replica가 없다면 primary를 사용합니다.
+    최근에 예약을 변경한 유저의 요청은 변경 내용이 바로 보이도록 primary를 사용합니다.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], max_lag: float = REPLICA_MAX_LAG_SECONDS,
+                 lag_check_interval: float = REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+                 read_your_writes_seconds: float = READ_YOUR_WRITES_SECONDS,
+                 lag_measurer: Callable[[Engine], float] = measure_replication_lag,
+                 timer: Callable[[], float] = time.monotonic):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag_measurer = lag_measurer
+        self.timer = timer
+        self._replica_cycle = itertools.cycle(range(len(replicas)))
+        self._lock = threading.Lock()
+        # replica index -> (확인한 시간, 지연 시간)
+        self._replica_lags = {}
+        self._recent_writers = TTLCache(maxsize=100000, ttl=read_your_writes_seconds, timer=timer)
+
+    def mark_write(self, user_id: int):
+        self._recent_writers.set(int(user_id), True)
+
+    def handle_invalidation(self, invalidation_event):
+        """
+        다른 worker에서 예약이 변경된 유저도 이 worker에서 primary DB를 사용하게 합니다.
+        """
+        if invalidation_event.user_id is not None:
+            self.mark_write(invalidation_event.user_id)
+
+    def get_engine(self, user_id: Optional[int] = None) -> Engine:
+        if not self.replicas:
+            return self.primary
+
+        if user_id is not None and self._recent_writers.get(int(user_id)):
+            return self.primary
+
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                index = next(self._replica_cycle)
+            if self._get_replica_lag(index) <= self.max_lag:
+                return self.replicas[index]
+
+        return self.primary
+
+    def _get_replica_lag(self, index: int) -> float:
+        now = self.timer()
+        checked_at, lag = self._replica_lags.get(index, (None, None))
+        if checked_at is not None and now - checked_at < self.lag_check_interval:
+            return lag
+
+        try:
+            lag = self.lag_measurer(self.replicas[index])
+        except Exception:
+            lag = float('inf')
+
+        self._replica_lags[index] = (now, lag)
+        return lag
+
+
+replica_router = ReplicaRouter(engine, replica_engines)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """
+    읽기 전용 API에서 사용하는 session 입니다. 이 session으로는 쓰기 작업을 하면 안 됩니다.
+    """
+    db = ReadSessionLocal(bind=replica_router.get_engine(get_user_id_from_request(request)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_session_factory(request: Request) -> Callable[[], Session]:
+    """
+    streaming 응답처럼 응답을 보내는 동안 DB를 읽는 API에서 사용합니다.
+    dependency의 session은 응답을 보내기 전에 닫히므로, 응답을 만드는 쪽에서 session을 직접 열고 닫습니다.
+    """
+    return functools.partial(ReadSessionLocal, bind=replica_router.get_engine(get_user_id_from_request(request)))
@@ -0,0 +1,17 @@
+-- reservations.confirmed 단일 컬럼 index를 확정/미확정 예약에 대한 부분 index로 교체합니다.
+-- 서비스 중단 없이 적용할 수 있도록 CONCURRENTLY를 사용하므로, transaction 밖에서 실행해야 합니다.
+--   psql "$SQLALCHEMY_DATABASE_URL" -f db/migrations/0001_reservation_partial_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reservations_exam_schedule_id_user_id
+    ON reservations (exam_schedule_id, user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reservations_confirmed_exam_schedule_id
+    ON reservations (exam_schedule_id, user_id) WHERE confirmed = true;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reservations_pending_exam_schedule_id
+    ON reservations (exam_schedule_id, user_id) WHERE confirmed = false;
+
+DROP INDEX CONCURRENTLY IF EXISTS ix_reservations_confirmed;
+DROP INDEX CONCURRENTLY IF EXISTS ix_reservations_exam_schedule_id_confirmed;
+
+ANALYZE reservations;
@@ -0,0 +1,14 @@
+-- reservations.id를 String(30)에서 native uuid 타입으로 변경합니다.
+-- 기존에는 모든 row가 같은 id를 가지고 있었으므로, 기존 row에는 새로운 uuid를 부여합니다.
+-- 이후 생성되는 row는 애플리케이션에서 시간순으로 정렬되는 UUID v7을 생성합니다.
+--   psql "$SQLALCHEMY_DATABASE_URL" -f db/migrations/0002_reservation_uuid_id.sql
+
+BEGIN;
+
+DROP INDEX IF EXISTS ix_reservations_id;
+
+ALTER TABLE reservations ALTER COLUMN id TYPE uuid USING gen_random_uuid();
+
+CREATE UNIQUE INDEX ix_reservations_id ON reservations (id);
+
+COMMIT;
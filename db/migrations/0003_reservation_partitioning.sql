@@ -0,0 +1,51 @@
+-- reservations 테이블을 exam_schedule_id 기준 LIST partition 테이블로 변경합니다.
+-- 시험 일정마다 reservations_p{id} partition을 만들고, 기존 예약을 옮긴 뒤 기존 테이블을 삭제합니다.
+-- 데이터를 옮기는 동안 reservations 테이블에 쓰기가 막히므로 서비스 점검 시간에 실행합니다.
+--   psql "$SQLALCHEMY_DATABASE_URL" -f db/migrations/0003_reservation_partitioning.sql
+
+BEGIN;
+
+ALTER TABLE reservations RENAME TO reservations_unpartitioned;
+ALTER TABLE reservations_unpartitioned RENAME CONSTRAINT reservations_pkey TO reservations_unpartitioned_pkey;
+DROP INDEX IF EXISTS ix_reservations_id;
+DROP INDEX IF EXISTS ix_reservations_exam_schedule_id_user_id;
+DROP INDEX IF EXISTS ix_reservations_confirmed_exam_schedule_id;
+DROP INDEX IF EXISTS ix_reservations_pending_exam_schedule_id;
+
+CREATE TABLE reservations (
+    id uuid NOT NULL,
+    user_id integer NOT NULL REFERENCES users (id),
+    exam_schedule_id integer NOT NULL REFERENCES exam_schedules (id),
+    comment text NOT NULL,
+    confirmed boolean NOT NULL,
+    PRIMARY KEY (user_id, exam_schedule_id)
+) PARTITION BY LIST (exam_schedule_id);
+
+CREATE TABLE reservations_default PARTITION OF reservations DEFAULT;
+
+DO $$
+DECLARE
+    schedule_id integer;
+BEGIN
+    FOR schedule_id IN SELECT id FROM exam_schedules LOOP
+        EXECUTE format('CREATE TABLE reservations_p%s PARTITION OF reservations FOR VALUES IN (%s)',
+                       schedule_id, schedule_id);
+    END LOOP;
+END $$;
+
+-- partition된 테이블의 index는 모든 partition에 만들어집니다
+CREATE INDEX ix_reservations_id ON reservations (id);
+CREATE INDEX ix_reservations_exam_schedule_id_user_id ON reservations (exam_schedule_id, user_id);
+CREATE INDEX ix_reservations_confirmed_exam_schedule_id ON reservations (exam_schedule_id, user_id)
+    WHERE confirmed = true;
+CREATE INDEX ix_reservations_pending_exam_schedule_id ON reservations (exam_schedule_id, user_id)
+    WHERE confirmed = false;
+
+INSERT INTO reservations (id, user_id, exam_schedule_id, comment, confirmed)
+SELECT id, user_id, exam_schedule_id, comment, confirmed FROM reservations_unpartitioned;
+
+DROP TABLE reservations_unpartitioned;
+
+COMMIT;
+
+ANALYZE reservations;
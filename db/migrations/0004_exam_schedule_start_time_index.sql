@@ -0,0 +1,8 @@
+-- 예약 가능한 시험 일정 조회(start_time 범위 조회)를 위한 index를 추가합니다.
+-- 서비스 중단 없이 적용할 수 있도록 CONCURRENTLY를 사용하므로, transaction 밖에서 실행해야 합니다.
+--   psql "$SQLALCHEMY_DATABASE_URL" -f db/migrations/0004_exam_schedule_start_time_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_exam_schedules_start_time
+    ON exam_schedules (start_time);
+
+ANALYZE exam_schedules;
@@ -0,0 +1,21 @@
+-- 예약 변경 event를 저장하는 transactional outbox 테이블을 추가합니다.
+--   psql "$SQLALCHEMY_DATABASE_URL" -f db/migrations/0005_reservation_outbox.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS reservation_outbox (
+    id bigserial PRIMARY KEY,
+    event_type varchar(16) NOT NULL,
+    reservation_id uuid NOT NULL,
+    user_id integer NOT NULL,
+    exam_schedule_id integer NOT NULL,
+    comment text NOT NULL,
+    confirmed boolean NOT NULL,
+    created_at timestamp NOT NULL,
+    position bigint UNIQUE,
+    published_at timestamp
+);
+
+CREATE INDEX IF NOT EXISTS ix_reservation_outbox_unpublished ON reservation_outbox (id) WHERE position IS NULL;
+
+COMMIT;
@@ -0,0 +1,40 @@
+-- 예약 id의 중복을 막고, id로 예약을 조회할 때 하나의 partition만 읽도록 id -> 시험 일정 테이블을 추가합니다.
+--   psql "$SQLALCHEMY_DATABASE_URL" -f db/migrations/0006_reservation_ids.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS reservation_ids (
+    id uuid PRIMARY KEY,
+    exam_schedule_id integer NOT NULL
+);
+
+-- trigger를 만드는 동안 새 예약이 빠지지 않도록 예약 테이블을 잠급니다
+LOCK TABLE reservations IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO reservation_ids (id, exam_schedule_id)
+SELECT id, exam_schedule_id FROM reservations
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION reservation_ids_insert() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO reservation_ids (id, exam_schedule_id) SELECT id, exam_schedule_id FROM inserted;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reservation_ids_delete() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM reservation_ids WHERE id IN (SELECT id FROM deleted);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS reservations_insert_ids ON reservations;
+CREATE TRIGGER reservations_insert_ids AFTER INSERT ON reservations REFERENCING NEW TABLE AS inserted
+    FOR EACH STATEMENT EXECUTE FUNCTION reservation_ids_insert();
+
+DROP TRIGGER IF EXISTS reservations_delete_ids ON reservations;
+CREATE TRIGGER reservations_delete_ids AFTER DELETE ON reservations REFERENCING OLD TABLE AS deleted
+    FOR EACH STATEMENT EXECUTE FUNCTION reservation_ids_delete();
+
+COMMIT;
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, ForeignKey, Text, Uuid, LargeBinary, \
+    true, false, event, DDL
 from sqlalchemy.orm import relationship
 from sqlalchemy.schema import PrimaryKeyConstraint, Index
 
 from db.database import Base
-import uuid
+from util import generate_uuid7
 
 
 class User(Base):
@@ -32,7 +33,8 @@ class ExamSchedule(Base):
 
     id = Column(Integer, primary_key=True, nullable=False, index=True)
     name = Column(String, nullable=False, unique=True)
-    start_time = Column(DateTime, nullable=False)
+    # 예약 가능한 시험 일정을 시작 시간 범위로 조회하므로 index를 둡니다
+    start_time = Column(DateTime, nullable=False, index=True)
     end_time = Column(DateTime, nullable=False)
 
     reservations = relationship('Reservation', back_populates='schedule')
@@ -41,18 +43,150 @@ class ExamSchedule(Base):
 class Reservation(Base):
     """
     시험 일정 예약 신청을 나타내는 클래스입니다. 예약의 확정 여부는 `confirmed` 필드로 구분합니다.
+    postgres에서는 `exam_schedule_id`로 LIST partitioning 되어, 시험 일정마다 별도의 partition에 저장됩니다.
     """
     __tablename__ = 'reservations'
 
-    id = Column(String(30), primary_key=True, nullable=False, index=True, default=str(uuid.uuid4()))
+    # 예약 수정/삭제 API에서 사용하는 id. postgres에서는 native uuid 타입으로 저장됩니다.
+    id = Column(Uuid, nullable=False, default=generate_uuid7)
     user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)
     user = relationship('User', back_populates='reservations')
     exam_schedule_id = Column(Integer, ForeignKey('exam_schedules.id'), primary_key=True)
     schedule = relationship('ExamSchedule', back_populates='reservations')
     comment = Column(Text, nullable=False, default='')
-    confirmed = Column(Boolean, nullable=False, default=False, index=True)
+    confirmed = Column(Boolean, nullable=False, default=False)
 
     # composite primary key
     __table_args__ = (
         PrimaryKeyConstraint('user_id', 'exam_schedule_id'),
+        # partition된 테이블의 unique index는 partition key를 포함해야 하므로 id index는 unique가 아닙니다.
+        # id의 중복은 `reservation_ids` 테이블의 primary key가 막습니다.
+        Index('ix_reservations_id', 'id'),
+        # 시험 일정별 예약 조회(keyset pagination)를 위한 index
+        Index('ix_reservations_exam_schedule_id_user_id', 'exam_schedule_id', 'user_id'),
+        # 확정 여부는 boolean이라 단일 컬럼 index로는 선택도가 낮으므로, 확정/미확정 예약 각각에 대한 부분 index를 둡니다.
+        # 남은 슬롯 계산(확정 예약 COUNT)과 확정 대기 예약 조회가 해당하는 row만 읽게 됩니다.
+        # 쿼리의 조건도 index와 같은 `Reservation.confirmed == true()` / `== false()` 형태로 작성해야 index가 사용됩니다.
+        Index('ix_reservations_confirmed_exam_schedule_id', 'exam_schedule_id', 'user_id',
+              postgresql_where=confirmed == true(), sqlite_where=confirmed == true()),
+        Index('ix_reservations_pending_exam_schedule_id', 'exam_schedule_id', 'user_id',
+              postgresql_where=confirmed == false(), sqlite_where=confirmed == false()),
+        {'postgresql_partition_by': 'LIST (exam_schedule_id)'},
     )
+
+
+# 시험 일정의 partition이 아직 없는 예약을 저장하는 default partition. 시험 일정별 partition은 시험 일정 생성 시 만들어집니다.
+event.listen(Reservation.__table__, 'after_create',
+             DDL('CREATE TABLE IF NOT EXISTS reservations_default PARTITION OF reservations DEFAULT')
+             .execute_if(dialect='postgresql'))
+
+
+class ReservationId(Base):
+    """
+    예약 id가 속한 시험 일정을 저장하는 클래스입니다.
+    partition된 `reservations`에는 id만의 unique 제약을 둘 수 없으므로, 이 테이블의 primary key로 id의 중복을 막습니다.
+    id로 예약을 조회할 때 먼저 시험 일정을 찾아 하나의 partition만 읽습니다.
+    `reservations`의 trigger가 예약의 추가/삭제를 같은 transaction에서 반영합니다.
+    """
+    __tablename__ = 'reservation_ids'
+
+    id = Column(Uuid, primary_key=True, nullable=False)
+    exam_schedule_id = Column(Integer, nullable=False)
+
+
+# postgres에서는 statement 단위 trigger가 추가/삭제된 row를 한 번에 반영해 COPY나 bulk INSERT를 느리게 만들지 않습니다
+for _ddl in (
+        DDL('''
+            CREATE OR REPLACE FUNCTION reservation_ids_insert() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO reservation_ids (id, exam_schedule_id) SELECT id, exam_schedule_id FROM inserted;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql'''),
+        DDL('''
+            CREATE OR REPLACE FUNCTION reservation_ids_delete() RETURNS trigger AS $$
+            BEGIN
+                DELETE FROM reservation_ids WHERE id IN (SELECT id FROM deleted);
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql'''),
+        DDL('DROP TRIGGER IF EXISTS reservations_insert_ids ON reservations'),
+        DDL('CREATE TRIGGER reservations_insert_ids AFTER INSERT ON reservations REFERENCING NEW TABLE AS inserted '
+            'FOR EACH STATEMENT EXECUTE FUNCTION reservation_ids_insert()'),
+        DDL('DROP TRIGGER IF EXISTS reservations_delete_ids ON reservations'),
+        DDL('CREATE TRIGGER reservations_delete_ids AFTER DELETE ON reservations REFERENCING OLD TABLE AS deleted '
+            'FOR EACH STATEMENT EXECUTE FUNCTION reservation_ids_delete()'),
+):
+    event.listen(Reservation.__table__, 'after_create', _ddl.execute_if(dialect='postgresql'))
+
+for _ddl in (
+        DDL('CREATE TRIGGER IF NOT EXISTS reservations_insert_ids AFTER INSERT ON reservations BEGIN '
+            'INSERT INTO reservation_ids (id, exam_schedule_id) VALUES (NEW.id, NEW.exam_schedule_id); END'),
+        DDL('CREATE TRIGGER IF NOT EXISTS reservations_delete_ids AFTER DELETE ON reservations BEGIN '
+            'DELETE FROM reservation_ids WHERE id = OLD.id; END'),
+):
+    event.listen(Reservation.__table__, 'after_create', _ddl.execute_if(dialect='sqlite'))
+
+
+class ReservationArchive(Base):
+    """
+    종료된 시험의 예약 신청을 보관하는 클래스입니다. `reservations`와 같은 컬럼에 보관된 시각을 더해 저장합니다.
+    자주 사용되는 `reservations` 테이블과 index를 작게 유지하기 위해 `jobs/archive_reservations.py`가 예약을 옮겨옵니다.
+    """
+    __tablename__ = 'reservations_archive'
+
+    id = Column(Uuid, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    exam_schedule_id = Column(Integer, nullable=False)
+    comment = Column(Text, nullable=False, default='')
+    confirmed = Column(Boolean, nullable=False, default=False)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint('user_id', 'exam_schedule_id'),
+        Index('ix_reservations_archive_exam_schedule_id_user_id', 'exam_schedule_id', 'user_id'),
+    )
+
+
+class ReservationOutbox(Base):
+    """
+    예약의 생성/수정/확정/삭제 event를 저장하는 transactional outbox 클래스입니다.
+    예약 변경과 같은 transaction에서 저장되므로, commit된 변경만 event로 남습니다.
+    `jobs/outbox_relay.py`가 발행하지 않은 event를 순서대로 발행하면서 `position`을 부여하고,
+    change feed API(`GET /changes`)는 `position`을 cursor로 사용합니다.
+    """
+    __tablename__ = 'reservation_outbox'
+
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'), primary_key=True, autoincrement=True)
+    # created / updated / confirmed / deleted
+    event_type = Column(String(16), nullable=False)
+    reservation_id = Column(Uuid, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    exam_schedule_id = Column(Integer, nullable=False)
+    comment = Column(Text, nullable=False, default='')
+    confirmed = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False)
+    # 발행된 순서. 발행 전에는 null
+    position = Column(BigInteger, nullable=True, unique=True)
+    published_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # relay가 발행하지 않은 event만 읽도록 하는 부분 index
+        Index('ix_reservation_outbox_unpublished', 'id',
+              postgresql_where=position.is_(None), sqlite_where=position.is_(None)),
+    )
+
+
+class IdempotencyKey(Base):
+    """
+    `Idempotency-Key` 헤더와 함께 요청된 쓰기 API의 응답을 저장하는 클래스입니다.
+    `status_code`가 없는 row는 아직 처리 중인 요청을 나타냅니다.
+    """
+    __tablename__ = 'idempotency_keys'
+
+    key = Column(String(64), primary_key=True, nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    media_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
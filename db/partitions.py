@@ -0,0 +1,25 @@
+"""
+postgres에서 `reservations` 테이블의 시험 일정별 partition을 관리합니다. 다른 DB에서는 아무것도 하지 않습니다.
+"""
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+def reservation_partition_name(exam_schedule_id: int) -> str:
+    return f'reservations_p{int(exam_schedule_id)}'
+
+
+def create_reservation_partition(session: Session, exam_schedule_id: int):
+    """
+    시험 일정의 예약을 저장할 partition을 만듭니다. 호출한 쪽의 transaction 안에서 실행되므로 commit은 호출한 쪽에서 합니다.
+    partition을 만드는 동안 `reservations`에 잠시 lock이 걸리므로, 예약이 없는 새 시험 일정에 대해서만 호출합니다.
+    """
+    if session.get_bind().dialect.name != 'postgresql':
+        return
+
+    exam_schedule_id = int(exam_schedule_id)
+    session.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {reservation_partition_name(exam_schedule_id)} '
+        f'PARTITION OF reservations FOR VALUES IN ({exam_schedule_id})'
+    ))
@@ -0,0 +1,104 @@
+"""
+종료된 시험의 예약 신청을 `reservations`에서 `reservations_archive`로 옮기는 작업입니다.
+`ARCHIVE_ENABLED`가 true면 서버 실행 중 `ARCHIVE_INTERVAL_SECONDS`마다 실행되고, 아래 명령어로 직접 실행할 수도 있습니다.
+    python -m jobs.archive_reservations --chunk-size 1000
+모든 worker에서 실행되더라도 postgres advisory lock으로 한 번에 하나의 작업만 예약을 옮깁니다.
+"""
+
+import argparse
+import asyncio
+import datetime
+import logging
+import os
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from cache.invalidation_bus import invalidation_bus, RESERVATION
+from db.database import SessionLocal
+from repository.reservation_archive_repository import ReservationArchiveRepository
+from service.me_dashboard_version import me_dashboard_versions
+from service.reservation_bitmap_index import reservation_bitmap_index
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'false').lower() == 'true'
+ARCHIVE_INTERVAL_SECONDS = float(os.environ.get('ARCHIVE_INTERVAL_SECONDS', 3600))
+# 한 transaction에서 옮기는 예약 수. 작을수록 lock을 잡는 시간이 짧아집니다
+ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE', 1000))
+
+
+def archive_finished_reservations(session_factory: Callable[[], Session] = SessionLocal,
+                                  chunk_size: int = ARCHIVE_CHUNK_SIZE,
+                                  now: Optional[datetime.datetime] = None) -> int:
+    """
+    종료된 시험의 예약을 `chunk_size`개씩 옮기고, 옮긴 예약 수를 반환합니다. 다른 worker가 실행 중이라면 그만둡니다.
+    비워진 시험 일정의 partition은 삭제하지 않습니다. partition을 삭제하거나 분리하려면 `reservations`에 ACCESS EXCLUSIVE lock이
+    필요해, 모든 partition을 읽는 쿼리와 deadlock이 생기거나 모든 예약 요청이 lock을 기다리게 되기 때문입니다.
+    (default partition이 있으므로 `DETACH PARTITION ... CONCURRENTLY`도 사용할 수 없습니다)
+    """
+    now = now or datetime.datetime.now(datetime.UTC)
+    archived_num = 0
+
+    session = session_factory()
+    try:
+        repository = ReservationArchiveRepository(session)
+        for exam_schedule_id in repository.get_finished_exam_schedule_ids(now):
+            exam_archived_num = _archive_exam_schedule(session, repository, exam_schedule_id, chunk_size, now)
+            if exam_archived_num is None:
+                break
+
+            archived_num += exam_archived_num
+            reservation_bitmap_index.invalidate(exam_schedule_id)
+            # 어떤 유저의 예약이 보관되었는지 알 수 없으므로 모든 유저의 대시보드를 다시 조회하게 합니다
+            me_dashboard_versions.reset()
+    finally:
+        session.rollback()
+        session.close()
+
+    return archived_num
+
+
+def _archive_exam_schedule(session: Session, repository: ReservationArchiveRepository, exam_schedule_id: int,
+                           chunk_size: int, now: datetime.datetime) -> Optional[int]:
+    """
+    시험 일정의 예약을 모두 옮깁니다. 다른 worker가 보관 작업 중이라면 None을 반환합니다.
+    """
+    archived_num = 0
+    while True:
+        if not repository.lock_archive():
+            session.rollback()
+            return None
+
+        chunk_num = repository.archive_chunk(exam_schedule_id, chunk_size, now)
+        if chunk_num:
+            # 다른 worker들도 시험 일정의 cache(bitmap, slot inventory, 대시보드 ETag)를 지우도록 같은 transaction에서 발행합니다.
+            # 어떤 유저의 예약이 옮겨졌는지는 알리지 않으므로, 받은 worker는 시험 일정의 cache를 모두 지웁니다
+            invalidation_bus.publish(session, RESERVATION, exam_schedule_id=exam_schedule_id)
+        session.commit()
+        archived_num += chunk_num
+        if chunk_num < chunk_size:
+            return archived_num
+
+
+async def run_archive_periodically(interval: float = ARCHIVE_INTERVAL_SECONDS):
+    while True:
+        try:
+            archived_num = await asyncio.to_thread(archive_finished_reservations)
+            logger.info('archived %s reservations', archived_num)
+        except Exception:
+            logger.exception('failed to archive reservations')
+
+        await asyncio.sleep(interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='종료된 시험의 예약 신청을 보관 테이블로 옮깁니다.')
+    parser.add_argument('--chunk-size', type=int, default=ARCHIVE_CHUNK_SIZE,
+                        help='한 transaction에서 옮기는 예약 수')
+    args = parser.parse_args()
+
+    print(f'---archived {archive_finished_reservations(chunk_size=args.chunk_size)} reservations---')
@@ -0,0 +1,109 @@
+"""
+`reservation_outbox`에 저장된 예약 변경 event를 발행하는 relay 입니다.
+발행하지 않은 event를 저장된 순서대로 `OUTBOX_RELAY_BATCH_SIZE`개씩 읽어 발행하고, change feed에서 사용할 `position`을 부여합니다.
+`OUTBOX_RELAY_ENABLED`가 true면 서버 실행 중 `OUTBOX_RELAY_INTERVAL_SECONDS`마다 실행되고, 아래 명령어로 직접 실행할 수도 있습니다.
+    python -m jobs.outbox_relay --batch-size 500
+
+event는 발행한 뒤 commit 하므로, commit 전에 실패하면 다음 실행에서 다시 발행됩니다. (at-least-once)
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import urllib.request
+from typing import Callable, List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from repository.reservation_outbox_repository import ReservationOutboxRepository
+from schemas.reservation import ReservationChange
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_RELAY_ENABLED = os.environ.get('OUTBOX_RELAY_ENABLED', 'false').lower() == 'true'
+OUTBOX_RELAY_INTERVAL_SECONDS = float(os.environ.get('OUTBOX_RELAY_INTERVAL_SECONDS', 1))
+OUTBOX_RELAY_BATCH_SIZE = int(os.environ.get('OUTBOX_RELAY_BATCH_SIZE', 500))
+# 설정되어 있다면 event 목록을 JSON으로 POST 합니다. 설정되어 있지 않다면 log로 남깁니다
+OUTBOX_WEBHOOK_URL = os.environ.get('OUTBOX_WEBHOOK_URL', '')
+OUTBOX_WEBHOOK_TIMEOUT_SECONDS = float(os.environ.get('OUTBOX_WEBHOOK_TIMEOUT_SECONDS', 5))
+
+OutboxPublisher = Callable[[List[ReservationChange]], None]
+
+
+def log_changes(changes: List[ReservationChange]):
+    for change in changes:
+        logger.info('reservation %s %s', change.event_type, change.model_dump_json())
+
+
+def post_changes(changes: List[ReservationChange]):
+    body = json.dumps([change.model_dump(mode='json') for change in changes]).encode('utf-8')
+    request = urllib.request.Request(OUTBOX_WEBHOOK_URL, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=OUTBOX_WEBHOOK_TIMEOUT_SECONDS) as response:
+        response.read()
+
+
+def default_publisher() -> OutboxPublisher:
+    return post_changes if OUTBOX_WEBHOOK_URL else log_changes
+
+
+def relay_outbox(session_factory: Callable[[], Session] = SessionLocal, publisher: Optional[OutboxPublisher] = None,
+                 batch_size: int = OUTBOX_RELAY_BATCH_SIZE) -> int:
+    """
+    발행하지 않은 event를 모두 발행하고, 발행한 event 수를 반환합니다.
+    다른 relay가 실행 중이라면 아무것도 하지 않습니다.
+    """
+    publisher = publisher or default_publisher()
+    published_num = 0
+
+    session = session_factory()
+    try:
+        repository = ReservationOutboxRepository(session)
+        while True:
+            if not repository.lock_relay():
+                break
+
+            changes = repository.get_unpublished(batch_size)
+            if not changes:
+                break
+
+            changes = repository.mark_published(changes, datetime.datetime.now(datetime.UTC))
+            publisher(changes)
+            session.commit()
+
+            published_num += len(changes)
+            if len(changes) < batch_size:
+                break
+    finally:
+        session.rollback()
+        session.close()
+
+    return published_num
+
+
+async def run_outbox_relay_periodically(interval: float = OUTBOX_RELAY_INTERVAL_SECONDS):
+    while True:
+        try:
+            published_num = await asyncio.to_thread(relay_outbox)
+            if published_num:
+                logger.info('published %s reservation changes', published_num)
+        except Exception:
+            logger.exception('failed to relay reservation outbox')
+
+        await asyncio.sleep(interval)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='저장된 예약 변경 event를 발행합니다.')
+    parser.add_argument('--batch-size', type=int, default=OUTBOX_RELAY_BATCH_SIZE,
+                        help='한 transaction에서 발행하는 event 수')
+    args = parser.parse_args()
+
+    print(f'---published {relay_outbox(batch_size=args.batch_size)} reservation changes---')
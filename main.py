@@ -1,10 +1,23 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
-from db.database import engine
+from cache.invalidation_bus import invalidation_bus
+from db.database import engine, replica_engines, replica_router, SessionLocal
 from db import models
 from db.db_uploader import insert_user_data
+from jobs.archive_reservations import ARCHIVE_ENABLED, run_archive_periodically
+from jobs.outbox_relay import OUTBOX_RELAY_ENABLED, run_outbox_relay_periodically
+from repository.exam_schedule_repository import ExamScheduleRepository
 from routers import api
+from service.me_dashboard_version import me_dashboard_versions
+from service.reservation_batch_writer import reservation_batch_writer
+from service.reservation_bitmap_index import reservation_bitmap_index
+from service.slot_inventory import slot_inventory
+from service.waiting_room import waiting_room
+from telemetry.profiler import PROFILER_PERIODIC_ENABLED, run_profiler_periodically
+from telemetry.slow_query_log import setup_slow_query_log
+from telemetry.tracing import setup_tracing
 import uvicorn
 
 
@@ -22,8 +35,10 @@ description = """
 * **시험 일정 조회**
 * **시험 일정 생성**
 * **시험 일정 예약신청**
+* **예약 대기표 발급 / 대기 상태 조회**
 * **내 예약 신청 조회**
 * **예약 신청 조회**
+* **시험 일정별 예약 신청 조회**
 * **예약 신청 확정**
 * **예약 신청 수정**
 * **예약 신청 삭제**
@@ -44,7 +59,26 @@ tags_metadata = [
 async def lifespan(_app: FastAPI):
     models.Base.metadata.create_all(bind=engine)
     insert_user_data()
+    with SessionLocal() as session:
+        ExamScheduleRepository(session).load_cache()
+    reservation_bitmap_index.start()
+    reservation_batch_writer.start()
+    waiting_room.start(engine)
+    invalidation_bus.start()
+    background_tasks = []
+    if ARCHIVE_ENABLED:
+        background_tasks.append(asyncio.create_task(run_archive_periodically()))
+    if OUTBOX_RELAY_ENABLED:
+        background_tasks.append(asyncio.create_task(run_outbox_relay_periodically()))
+    if PROFILER_PERIODIC_ENABLED:
+        background_tasks.append(asyncio.create_task(run_profiler_periodically()))
     yield
+    for task in background_tasks:
+        task.cancel()
+    invalidation_bus.stop()
+    waiting_room.stop()
+    # 이미 받은 예약을 저장한 뒤 종료합니다
+    reservation_batch_writer.stop()
 
 app = FastAPI(
     title='BE 개발자 과제 API 문서',
@@ -56,6 +90,13 @@ app = FastAPI(
 
 app.include_router(api.router)
 
+# 다른 worker에서 변경된 내용을 이 worker의 cache에 반영합니다
+for cache_owner in (reservation_bitmap_index, slot_inventory, replica_router, me_dashboard_versions):
+    invalidation_bus.subscribe(cache_owner.handle_invalidation)
+
+setup_tracing([engine, *replica_engines])
+setup_slow_query_log([engine, *replica_engines])
+
 
 @app.get('/', name="Hello World!")
 def read_root():
@@ -1,11 +1,34 @@
-from sqlalchemy import func
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, select, exists, true, false, bindparam
 from sqlalchemy.orm import Session
 from typing import List, Optional, Type
+from cache.invalidation_bus import invalidation_bus, EXAM_SCHEDULE
+from cache.ttl_cache import TTLCache
 from db.models import ExamSchedule, Reservation
-from schemas.exam_schedule import ExamScheduleBase, CreateExamSchedule
+from db.partitions import create_reservation_partition
+from schemas.exam_schedule import ExamScheduleBase, CreateExamSchedule, ExamScheduleStats
 import datetime
+from telemetry.tracing import trace_methods
+
+load_dotenv()
+
+# 현재 시각부터 이 기간(일) 안에 시작하는 시험 일정만 예약할 수 있습니다
+BOOKING_WINDOW_DAYS = float(os.environ.get('BOOKING_WINDOW_DAYS', 3))
+
+# 예약 신청마다 실행되므로 미리 만들어 두고 parameter만 바꿔 실행합니다
+_GET_BY_ID = select(ExamSchedule).where(ExamSchedule.id == bindparam('id')).limit(1)
+
+# 시험 일정은 생성된 뒤 변경되지 않으므로, 예약 신청 시 확인하는 시험 일정 정보를 프로세스 메모리에 cache 합니다.
+# 최대 `EXAM_SCHEDULE_CACHE_MAXSIZE`개를 저장하고, 다른 worker가 만든 시험 일정은 처음 조회할 때 DB에서 읽습니다
+EXAM_SCHEDULE_CACHE_MAXSIZE = int(os.environ.get('EXAM_SCHEDULE_CACHE_MAXSIZE', 10000))
+EXAM_SCHEDULE_CACHE_TTL_SECONDS = float(os.environ.get('EXAM_SCHEDULE_CACHE_TTL_SECONDS', 3600))
+
+exam_schedule_cache = TTLCache(maxsize=EXAM_SCHEDULE_CACHE_MAXSIZE, ttl=EXAM_SCHEDULE_CACHE_TTL_SECONDS)
 
 
+@trace_methods
 class ExamScheduleRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -15,30 +38,95 @@ class ExamScheduleRepository:
         return [ExamScheduleBase(**exam_schedule.__dict__) for exam_schedule in exam_schedules]
 
     def get_by_id(self, _id) -> Optional[ExamScheduleBase]:
-        exam_schedule = self.session.query(ExamSchedule).filter_by(id=_id).first()
+        return self.session.execute(_GET_BY_ID, {'id': _id}).scalars().first()
+
+    def get_cached_by_id(self, _id: int) -> Optional[ExamScheduleBase]:
+        """
+        cache에 없는 시험 일정만 DB에서 조회해 cache에 저장합니다. 없는 시험 일정은 cache하지 않습니다.
+        """
+        exam_schedule = exam_schedule_cache.get(int(_id))
+        if exam_schedule is None:
+            row = self.get_by_id(_id)
+            if row is None:
+                return None
+
+            exam_schedule = ExamScheduleBase(**row.__dict__)
+            exam_schedule_cache.set(exam_schedule.id, exam_schedule)
+
         return exam_schedule
 
-    def get_available_schedules(self, current_user_id: int) -> List[Optional[ExamScheduleBase]]:
-        date_range_start = datetime.datetime.now(datetime.UTC)
-        date_range_end = date_range_start + datetime.timedelta(days=3)
-        exam_schedules = self.session.query(ExamSchedule) \
-            .filter(ExamSchedule.start_time.between(date_range_start, date_range_end),
-                    ~ExamSchedule.reservations.any(Reservation.user_id == current_user_id)).all()
+    def load_cache(self) -> int:
+        """
+        아직 끝나지 않은 시험 일정을 시작 시간 순서대로 cache의 최대 크기만큼 cache에 저장하고, 저장한 수를 반환합니다.
+        """
+        exam_schedules = self.session.execute(
+            select(ExamSchedule)
+            .where(ExamSchedule.end_time > datetime.datetime.now(datetime.UTC).replace(tzinfo=None))
+            .order_by(ExamSchedule.start_time)
+            .limit(EXAM_SCHEDULE_CACHE_MAXSIZE)
+        ).scalars().all()
+
+        for exam_schedule in exam_schedules:
+            exam_schedule_cache.set(exam_schedule.id, ExamScheduleBase(**exam_schedule.__dict__))
 
+        return len(exam_schedules)
+
+    def get_stats(self) -> List[ExamScheduleStats]:
+        """
+        모든 시험 일정의 확정/확정 대기 예약 신청 수를 하나의 집계 쿼리로 조회합니다.
+        """
+        rows = self.session.execute(
+            select(ExamSchedule.id, ExamSchedule.name, ExamSchedule.start_time, ExamSchedule.end_time,
+                   func.count(Reservation.user_id).filter(Reservation.confirmed == false()).label('pending_num'),
+                   func.count(Reservation.user_id).filter(Reservation.confirmed == true()).label('confirmed_num'))
+            .outerjoin(Reservation, Reservation.exam_schedule_id == ExamSchedule.id)
+            .group_by(ExamSchedule.id)
+            .order_by(ExamSchedule.start_time)
+        ).all()
+        return [ExamScheduleStats(**row._mapping) for row in rows]
+
+    def get_available_schedules(self, current_user_id: int,
+                                booking_window_days: float = BOOKING_WINDOW_DAYS) -> List[Optional[ExamScheduleBase]]:
+        # start_time index로 기간 안의 시험 일정만 읽고, 각 일정마다 (user_id, exam_schedule_id) primary key로
+        # 유저의 예약 여부를 확인하는 anti-join(NOT EXISTS) 입니다
+        already_reserved = exists(
+            select(Reservation.user_id)
+            .where(Reservation.user_id == current_user_id, Reservation.exam_schedule_id == ExamSchedule.id)
+        )
+        exam_schedules = self._booking_window_query(booking_window_days).filter(~already_reserved).all()
+
+        return [ExamScheduleBase(**exam_schedule.__dict__) for exam_schedule in exam_schedules]
+
+    def get_in_booking_window(self, booking_window_days: float = BOOKING_WINDOW_DAYS) -> List[Optional[ExamScheduleBase]]:
+        """
+        유저의 예약 여부와 상관없이 예약 가능한 기간 안에 시작하는 시험 일정을 조회합니다.
+        """
+        exam_schedules = self._booking_window_query(booking_window_days).all()
         return [ExamScheduleBase(**exam_schedule.__dict__) for exam_schedule in exam_schedules]
 
+    def _booking_window_query(self, booking_window_days: float):
+        date_range_start = datetime.datetime.now(datetime.UTC)
+        date_range_end = date_range_start + datetime.timedelta(days=booking_window_days)
+        return self.session.query(ExamSchedule) \
+            .filter(ExamSchedule.start_time.between(date_range_start, date_range_end)) \
+            .order_by(ExamSchedule.start_time)
+
     def create(self, data: CreateExamSchedule) -> ExamScheduleBase:
-        exam_schedule = ExamSchedule(**data.model_dump(exclude_none=True))
-        self.session.add(exam_schedule)
+        # INSERT ... RETURNING으로 생성된 row를 바로 받아, commit 후 refresh를 위한 SELECT를 하지 않습니다
+        exam_schedule = self.session.execute(
+            insert(ExamSchedule)
+            .values(**data.model_dump(exclude_none=True))
+            .returning(ExamSchedule.id, ExamSchedule.name, ExamSchedule.start_time, ExamSchedule.end_time)
+        ).one()
+        # 시험 일정과 같은 transaction에서 예약 partition을 만들어, 시험 일정이 생기면 partition도 항상 존재하게 합니다
+        create_reservation_partition(self.session, exam_schedule.id)
+        invalidation_bus.publish(self.session, EXAM_SCHEDULE, exam_schedule_id=exam_schedule.id)
         self.session.commit()
-        self.session.refresh(exam_schedule)
 
-        return ExamScheduleBase(
-            id=exam_schedule.id,
-            name=exam_schedule.name,
-            start_time=exam_schedule.start_time,
-            end_time=exam_schedule.end_time
-        )
+        created_exam_schedule = ExamScheduleBase(**exam_schedule._mapping)
+        exam_schedule_cache.set(created_exam_schedule.id, created_exam_schedule)
+
+        return created_exam_schedule
 
     def exam_schedule_exist_by_name(self, name: str) -> bool:
         exam_schedule = self.session.query(ExamSchedule).filter_by(name=name).first()
@@ -0,0 +1,68 @@
+import datetime
+from typing import List
+
+from sqlalchemy import select, insert, delete, literal, exists, text
+from sqlalchemy.orm import Session
+
+from db.models import ExamSchedule, Reservation, ReservationArchive
+from telemetry.tracing import trace_methods
+
+# 여러 worker의 보관 작업 중 하나만 실행되도록 하는 postgres advisory lock의 key
+_ARCHIVE_LOCK_KEY = 4405
+
+
+@trace_methods
+class ReservationArchiveRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def lock_archive(self) -> bool:
+        """
+        transaction이 끝날 때까지 보관 작업 lock을 잡습니다. 다른 보관 작업이 실행 중이라면 False를 반환합니다.
+        """
+        if self.session.get_bind().dialect.name != 'postgresql':
+            return True
+
+        return self.session.execute(text('SELECT pg_try_advisory_xact_lock(:key)'),
+                                    {'key': _ARCHIVE_LOCK_KEY}).scalar()
+
+    def get_finished_exam_schedule_ids(self, now: datetime.datetime) -> List[int]:
+        """
+        종료되었지만 아직 보관되지 않은 예약이 남아있는 시험 일정들의 id를 조회합니다.
+        """
+        return self.session.execute(
+            select(ExamSchedule.id)
+            .where(ExamSchedule.end_time < now,
+                   exists().where(Reservation.exam_schedule_id == ExamSchedule.id))
+            .order_by(ExamSchedule.id)
+        ).scalars().all()
+
+    def archive_chunk(self, exam_schedule_id: int, chunk_size: int, archived_at: datetime.datetime) -> int:
+        """
+        시험 일정의 예약을 최대 `chunk_size`개 보관 테이블로 옮기고, 옮긴 예약 수를 반환합니다.
+        복사와 삭제를 같은 transaction에서 실행하므로, 중간에 실패해도 예약이 중복되거나 사라지지 않습니다. commit은 호출한 쪽에서 합니다.
+        """
+        user_ids = self.session.execute(
+            select(Reservation.user_id)
+            .where(Reservation.exam_schedule_id == exam_schedule_id)
+            .order_by(Reservation.user_id)
+            .limit(chunk_size)
+        ).scalars().all()
+
+        if not user_ids:
+            return 0
+
+        self.session.execute(
+            insert(ReservationArchive).from_select(
+                ['id', 'user_id', 'exam_schedule_id', 'comment', 'confirmed', 'archived_at'],
+                select(Reservation.id, Reservation.user_id, Reservation.exam_schedule_id, Reservation.comment,
+                       Reservation.confirmed, literal(archived_at, ReservationArchive.archived_at.type))
+                .where(Reservation.exam_schedule_id == exam_schedule_id, Reservation.user_id.in_(user_ids))
+            )
+        )
+        self.session.execute(
+            delete(Reservation)
+            .where(Reservation.exam_schedule_id == exam_schedule_id, Reservation.user_id.in_(user_ids))
+        )
+
+        return len(user_ids)
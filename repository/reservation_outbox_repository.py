@@ -0,0 +1,85 @@
+import datetime
+import os
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+# event 종류(CREATED, UPDATED, CONFIRMED, DELETED)는 invalidation bus의 변경 종류와 같은 값을 사용합니다
+from cache.invalidation_bus import CREATED, UPDATED, CONFIRMED, DELETED
+from db.models import ReservationOutbox
+from schemas.reservation import ReservationChange
+from telemetry.tracing import trace_methods
+
+load_dotenv()
+
+OUTBOX_ENABLED = os.environ.get('OUTBOX_ENABLED', 'false').lower() == 'true'
+
+# 여러 worker의 relay 중 하나만 `position`을 부여하도록 하는 postgres advisory lock의 key
+_RELAY_LOCK_KEY = 4404
+
+
+@trace_methods
+class ReservationOutboxRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, event_type: str, reservations: List[dict]):
+        """
+        예약 변경 event를 저장합니다. 예약을 변경하는 transaction 안에서 commit 전에 호출합니다.
+        """
+        if not OUTBOX_ENABLED or not reservations:
+            return
+
+        created_at = datetime.datetime.now(datetime.UTC)
+        self.session.execute(insert(ReservationOutbox), [
+            {'event_type': event_type, 'reservation_id': reservation['id'], 'user_id': reservation['user_id'],
+             'exam_schedule_id': reservation['exam_schedule_id'], 'comment': reservation['comment'],
+             'confirmed': reservation['confirmed'], 'created_at': created_at}
+            for reservation in reservations
+        ])
+
+    def lock_relay(self) -> bool:
+        """
+        transaction이 끝날 때까지 relay lock을 잡습니다. 다른 relay가 실행 중이라면 False를 반환합니다.
+        """
+        if self.session.get_bind().dialect.name != 'postgresql':
+            return True
+
+        return self.session.execute(text('SELECT pg_try_advisory_xact_lock(:key)'), {'key': _RELAY_LOCK_KEY}).scalar()
+
+    def get_unpublished(self, limit: int) -> List[ReservationChange]:
+        rows = self.session.execute(
+            self._select_changes()
+            .where(ReservationOutbox.position.is_(None))
+            .order_by(ReservationOutbox.id)
+            .limit(limit)
+        ).all()
+        return [ReservationChange(**row._mapping) for row in rows]
+
+    def mark_published(self, changes: List[ReservationChange], published_at: datetime.datetime) -> List[ReservationChange]:
+        """
+        마지막으로 발행된 event 다음부터 순서대로 `position`을 부여하고, `position`이 채워진 event들을 반환합니다.
+        """
+        last_position = self.session.execute(select(func.max(ReservationOutbox.position))).scalar() or 0
+        published_changes = [change.model_copy(update={'position': last_position + index})
+                             for index, change in enumerate(changes, start=1)]
+        self.session.execute(update(ReservationOutbox), [
+            {'id': change.id, 'position': change.position, 'published_at': published_at} for change in published_changes
+        ])
+        return published_changes
+
+    def get_changes(self, after: Optional[int], limit: int) -> List[ReservationChange]:
+        query = self._select_changes().where(ReservationOutbox.position.is_not(None))
+        if after is not None:
+            query = query.where(ReservationOutbox.position > after)
+
+        rows = self.session.execute(query.order_by(ReservationOutbox.position).limit(limit)).all()
+        return [ReservationChange(**row._mapping) for row in rows]
+
+    @staticmethod
+    def _select_changes():
+        return select(ReservationOutbox.id, ReservationOutbox.position, ReservationOutbox.event_type,
+                      ReservationOutbox.reservation_id, ReservationOutbox.user_id, ReservationOutbox.exam_schedule_id,
+                      ReservationOutbox.comment, ReservationOutbox.confirmed, ReservationOutbox.created_at)
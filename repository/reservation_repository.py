@@ -1,60 +1,260 @@
-from sqlalchemy import func
+import uuid
+
+from sqlalchemy import func, true, false, insert, update, tuple_, select, union_all, bindparam, literal
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from db.models import Reservation
-from typing import List, Optional, Type
+from cache.invalidation_bus import invalidation_bus, RESERVATION
+from db.models import Reservation, ReservationId, ReservationArchive, User
+from repository.reservation_outbox_repository import ReservationOutboxRepository, CREATED, UPDATED, CONFIRMED, \
+    DELETED
+from typing import Dict, Iterator, List, Optional, Set, Type, Tuple
 
 from schemas.reservation import MakeEditReservationOutput, ReservationBase, MakeEditReservationInput
+from telemetry.tracing import trace_methods
+
+# 자주 실행되는 쿼리는 미리 만들어 두고 parameter만 바꿔 실행합니다.
+# 매번 쿼리 객체를 만들고 compile cache key를 계산하지 않아도 되므로, 호출마다의 Python 부하가 줄어듭니다
+_GET_EXAM_SCHEDULE_ID_BY_ID = select(ReservationId.exam_schedule_id).where(ReservationId.id == bindparam('id'))
+_GET_BY_ID = select(Reservation) \
+    .where(Reservation.exam_schedule_id == bindparam('exam_schedule_id'), Reservation.id == bindparam('id')) \
+    .limit(1)
+_EXIST_BY_USER_ID_EXAM_ID = select(Reservation.user_id) \
+    .where(Reservation.user_id == bindparam('user_id'), Reservation.exam_schedule_id == bindparam('exam_schedule_id')) \
+    .limit(1)
+_COUNT_CONFIRMED = select(func.count(Reservation.user_id)) \
+    .where(Reservation.exam_schedule_id == bindparam('exam_schedule_id'), Reservation.confirmed == true())
+
+
+def _is_unique_violation(error: IntegrityError) -> bool:
+    # postgres는 SQLSTATE(unique_violation: 23505)로, sqlite는 에러 메시지로 구분합니다
+    sqlstate = getattr(error.orig, 'pgcode', None) or getattr(error.orig, 'sqlstate', None)
+    if sqlstate is not None:
+        return sqlstate == '23505'
 
+    return 'UNIQUE constraint failed' in str(error.orig)
 
+
+@trace_methods
 class ReservationRepository:
+    """
+    postgres에서 `reservations`는 `exam_schedule_id`로 partition 되어 있으므로,
+    시험 일정을 알고 있는 쿼리는 항상 `exam_schedule_id` 조건을 포함해 해당 partition만 읽도록 합니다.
+    """
+
     def __init__(self, session: Session):
         self.session = session
+        self.outbox_repository = ReservationOutboxRepository(session)
 
-    def get_by_id(self, _id: str) -> Type[Reservation]:
-        reservation = self.session.query(Reservation).filter_by(id=_id).first()
+    def get_by_id(self, _id: str) -> Optional[Type[Reservation]]:
+        try:
+            reservation_id = uuid.UUID(_id)
+        except ValueError:
+            return None
 
-        return reservation
+        # 시험 일정을 먼저 찾아 해당 시험 일정의 partition만 조회합니다
+        exam_schedule_id = self.session.execute(_GET_EXAM_SCHEDULE_ID_BY_ID, {'id': reservation_id}).scalar()
+        if exam_schedule_id is None:
+            return None
+
+        return self.session.execute(_GET_BY_ID, {'id': reservation_id, 'exam_schedule_id': exam_schedule_id}) \
+            .scalars().first()
+
+    def get_by_user_id(self, user_id: int, include_archive: bool = False) -> List[Optional[ReservationBase]]:
+        """
+        `include_archive`면 종료된 시험의 보관된 예약도 함께 조회합니다.
+        """
+        if include_archive:
+            rows = self.session.execute(union_all(
+                *(self._select_columns(table).where(table.user_id == user_id)
+                  for table in (Reservation, ReservationArchive))
+            )).all()
+            return [ReservationBase(**row._mapping) for row in rows]
 
-    def get_by_user_id(self, user_id: int) -> List[Optional[ReservationBase]]:
         reservations = self.session.query(Reservation).filter_by(user_id=user_id).all()
         return [ReservationBase(**reservation.__dict__) for reservation in reservations]
 
+    def get_by_exam_schedule_id(self, exam_schedule_id: int, confirmed: Optional[bool], after_user_id: Optional[int],
+                                limit: int, include_archive: bool = False) -> List[Optional[ReservationBase]]:
+        # (exam_schedule_id, user_id) 기준 keyset pagination. offset 없이 index range scan으로 한 페이지만 읽습니다.
+        tables = (Reservation, ReservationArchive) if include_archive else (Reservation,)
+
+        queries = []
+        for table in tables:
+            query = self._select_columns(table).where(table.exam_schedule_id == exam_schedule_id)
+            if confirmed is not None:
+                query = query.where(table.confirmed == (true() if confirmed else false()))
+            if after_user_id is not None:
+                query = query.where(table.user_id > after_user_id)
+            queries.append(query)
+
+        if include_archive:
+            reservations = union_all(*queries).subquery()
+            query = select(reservations).order_by(reservations.c.user_id)
+        else:
+            query = queries[0].order_by(Reservation.user_id)
+
+        rows = self.session.execute(query.limit(limit)).all()
+        return [ReservationBase(**row._mapping) for row in rows]
+
+    def stream_by_exam_schedule_id(self, exam_schedule_id: int, batch_size: int = 1000) -> Iterator[tuple]:
+        """
+        시험 일정의 예약과 보관된 예약을 유저의 로그인 id, 보관 여부와 함께 유저 `id` 순서로 읽습니다.
+        하나의 쿼리로 읽으므로, 읽는 도중 예약이 보관 테이블로 옮겨져도 빠지거나 중복되는 예약이 없습니다.
+        server-side cursor로 `batch_size`개씩 가져오므로, 예약 수와 상관없이 일정한 메모리를 사용합니다.
+        """
+        reservations = union_all(*(
+            select(table.id, table.user_id, table.comment, table.confirmed, literal(archived).label('archived'))
+            .where(table.exam_schedule_id == exam_schedule_id)
+            for table, archived in ((Reservation, False), (ReservationArchive, True))
+        )).subquery()
+        return self.session.execute(
+            select(reservations.c.id, reservations.c.user_id, User.user_id.label('login_id'), reservations.c.comment,
+                   reservations.c.confirmed, reservations.c.archived)
+            .join(User, User.id == reservations.c.user_id)
+            .order_by(reservations.c.user_id, reservations.c.archived)
+            .execution_options(yield_per=batch_size)
+        ).tuples()
+
+    @staticmethod
+    def _select_columns(table):
+        return select(table.id, table.user_id, table.exam_schedule_id, table.comment, table.confirmed)
+
     def get_by_user_id_exam_id(self, exam_schedule_id: int, user_id: int) -> Type[Reservation]:
         reservation = self.session.query(Reservation).filter_by(user_id=user_id,
                                                                 exam_schedule_id=exam_schedule_id).first()
         return reservation
 
     def exist_by_user_id_exam_id(self, exam_schedule_id: int, user_id: int) -> bool:
-        reservation = self.session.query(Reservation).filter_by(user_id=user_id, exam_schedule_id=exam_schedule_id).first()
-        return reservation is not None
+        return self.session.execute(_EXIST_BY_USER_ID_EXAM_ID,
+                                    {'user_id': user_id, 'exam_schedule_id': exam_schedule_id}).first() is not None
 
     def get_confirmed_schedule_num(self, exam_schedule_id) -> int:
-        return self.session.query(func.count(Reservation.user_id)) \
-            .filter(Reservation.exam_schedule_id == exam_schedule_id,
-                    Reservation.confirmed.is_(True)) \
-            .scalar() or 0
+        return self.session.execute(_COUNT_CONFIRMED, {'exam_schedule_id': exam_schedule_id}).scalar() or 0
+
+    def get_confirmed_schedule_nums(self, exam_schedule_ids: List[int]) -> Dict[int, int]:
+        rows = self.session.query(Reservation.exam_schedule_id, func.count(Reservation.user_id)) \
+            .filter(Reservation.exam_schedule_id.in_(exam_schedule_ids),
+                    Reservation.confirmed == true()) \
+            .group_by(Reservation.exam_schedule_id).all()
+
+        return {exam_schedule_id: count for exam_schedule_id, count in rows}
+
+    def get_existing_keys(self, keys: List[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+        """
+        `(user_id, exam_schedule_id)` 목록 중 이미 예약이 있는 것들을 primary key로 한 번에 조회합니다.
+        """
+        # row 비교 조건으로는 partition pruning이 되지 않으므로 `exam_schedule_id` 조건을 함께 사용합니다
+        rows = self.session.query(Reservation.user_id, Reservation.exam_schedule_id) \
+            .filter(Reservation.exam_schedule_id.in_({exam_schedule_id for _, exam_schedule_id in keys}),
+                    tuple_(Reservation.user_id, Reservation.exam_schedule_id).in_(keys)).all()
+
+        return {(row.user_id, row.exam_schedule_id) for row in rows}
+
+    def get_slot_state(self, exam_schedule_id: int) -> Tuple[List[int], int]:
+        """
+        시험 일정에 예약한 유저 id 목록과 확정된 예약 수를 한 번의 쿼리로 조회합니다.
+        """
+        rows = self.session.query(Reservation.user_id, Reservation.confirmed) \
+            .filter(Reservation.exam_schedule_id == exam_schedule_id).all()
+
+        return [row.user_id for row in rows], sum(1 for row in rows if row.confirmed)
+
+    def get_user_ids_by_exam_schedule_id(self, exam_schedule_id: int) -> List[int]:
+        return self.session.scalars(
+            select(Reservation.user_id).where(Reservation.exam_schedule_id == exam_schedule_id)
+        ).all()
+
+    def iter_keys(self, batch_size: int = 10000) -> Iterator[Tuple[int, int]]:
+        """
+        모든 예약의 `(exam_schedule_id, user_id)`를 `batch_size`개씩 나눠 읽습니다.
+        """
+        return self.session.execute(
+            select(Reservation.exam_schedule_id, Reservation.user_id).execution_options(yield_per=batch_size)
+        ).tuples()
+
+    def create_many(self, values: List[dict]) -> List[dict]:
+        """
+        여러 예약을 하나의 transaction으로 저장하고, 이미 존재해서 저장하지 못한 예약들을 반환합니다.
+        충돌이 있는 경우에만 savepoint를 사용해 한 건씩 다시 저장합니다. unique 제약 조건 외의 위반은 아무것도 저장하지 않고 raise 합니다.
+        """
+        if not values:
+            return []
+
+        try:
+            self.session.execute(insert(Reservation), values)
+            self.outbox_repository.add(CREATED, values)
+            self._publish_created(values)
+            self.session.commit()
+            return []
+        except IntegrityError as e:
+            self.session.rollback()
+            if not _is_unique_violation(e):
+                raise
+
+        conflicts = []
+        for value in values:
+            try:
+                with self.session.begin_nested():
+                    self.session.execute(insert(Reservation), [value])
+            except IntegrityError as e:
+                # 이미 존재하는 예약만 충돌로 처리하고, 다른 제약 조건 위반(ex. foreign key)은 그대로 실패시킵니다
+                if not _is_unique_violation(e):
+                    self.session.rollback()
+                    raise
+                conflicts.append(value)
+        created = [value for value in values if value not in conflicts]
+        self.outbox_repository.add(CREATED, created)
+        self._publish_created(created)
+        self.session.commit()
+
+        return conflicts
+
+    def _publish_created(self, values: List[dict]):
+        # 다른 worker가 시험 일정의 cache를 지우고 DB에서 다시 만들지 않도록, 예약마다 유저를 알려 해당 유저만 반영하게 합니다
+        invalidation_bus.publish_many(self.session, RESERVATION,
+                                      [(value['exam_schedule_id'], value['user_id'], CREATED) for value in values])
 
     def create(self, data: ReservationBase) -> MakeEditReservationOutput:
-        reservation = Reservation(**data.model_dump(exclude_none=True))
-        self.session.add(reservation)
+        # INSERT ... RETURNING으로 생성된 row를 바로 받아, commit 후 refresh를 위한 SELECT를 하지 않습니다
+        created_reservation = self.session.execute(
+            insert(Reservation)
+            .values(**data.model_dump(exclude_none=True))
+            .returning(Reservation.id, Reservation.exam_schedule_id, Reservation.comment, Reservation.confirmed)
+        ).one()
+        self.outbox_repository.add(CREATED, [{**created_reservation._mapping, 'user_id': data.user_id}])
+        invalidation_bus.publish(self.session, RESERVATION, exam_schedule_id=data.exam_schedule_id,
+                                 user_id=data.user_id, operation=CREATED)
         self.session.commit()
-        self.session.refresh(reservation)
 
-        return MakeEditReservationOutput(
-            exam_schedule_id=reservation.exam_schedule_id,
-            comment=reservation.comment,
-            confirmed=reservation.confirmed
-        )
+        return MakeEditReservationOutput(**created_reservation._mapping)
 
-    def update(self, reservation: Type[Reservation], data: MakeEditReservationInput):
+    def update(self, reservation: Type[Reservation], data: MakeEditReservationInput) -> ReservationBase:
         data_dict = data.dict()
+        values = {'comment': data_dict['comment']}
         if 'confirmed' in data_dict:
-            reservation.confirmed = data_dict['confirmed']
+            values['confirmed'] = data_dict['confirmed']
+        event_type = CONFIRMED if values.get('confirmed') and not reservation.confirmed else UPDATED
 
-        reservation.comment = data_dict['comment']
+        updated_reservation = self.session.execute(
+            update(Reservation)
+            .where(Reservation.user_id == reservation.user_id,
+                   Reservation.exam_schedule_id == reservation.exam_schedule_id)
+            .values(**values)
+            .returning(Reservation.id, Reservation.user_id, Reservation.exam_schedule_id, Reservation.comment,
+                       Reservation.confirmed)
+        ).one()
+        self.outbox_repository.add(event_type, [updated_reservation._mapping])
+        invalidation_bus.publish(self.session, RESERVATION, exam_schedule_id=reservation.exam_schedule_id,
+                                 user_id=reservation.user_id, operation=event_type)
         self.session.commit()
-        self.session.refresh(reservation)
+
+        return ReservationBase(**updated_reservation._mapping)
 
     def delete(self, reservation: Type[Reservation]):
+        self.outbox_repository.add(DELETED, [{'id': reservation.id, 'user_id': reservation.user_id,
+                                              'exam_schedule_id': reservation.exam_schedule_id,
+                                              'comment': reservation.comment, 'confirmed': reservation.confirmed}])
         self.session.delete(reservation)
+        invalidation_bus.publish(self.session, RESERVATION, exam_schedule_id=reservation.exam_schedule_id,
+                                 user_id=reservation.user_id, operation=DELETED)
         self.session.commit()
@@ -1,9 +1,17 @@
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 from db.models import User
 from schemas.user import UserBase, LoginUser
 from typing import List, Optional, Type
+from telemetry.tracing import trace_methods
 
+# 로그인마다 실행되므로 미리 만들어 두고 parameter만 바꿔 실행합니다
+_GET_BY_USER_ID_PASSWORD = select(User) \
+    .where(User.user_id == bindparam('user_id'), User.password == bindparam('password')) \
+    .limit(1)
 
+
+@trace_methods
 class UserRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -20,8 +28,8 @@ class UserRepository:
         return [UserBase(**user.__dict__) for user in users]
 
     def get_by_user_id_password(self, user_id, password) -> Optional[UserBase]:
-        user = self.session.query(User).filter_by(user_id=user_id, password=password).first()
-        return user
+        return self.session.execute(_GET_BY_USER_ID_PASSWORD,
+                                    {'user_id': user_id, 'password': password}).scalars().first()
 
     def exist_by_id(self, _id: int) -> bool:
         user = self.session.query(User).filter_by(id=_id).first()
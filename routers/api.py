@@ -1,7 +1,10 @@
 from fastapi import APIRouter
+from routers.v1.change_router import change_router
 from routers.v1.exam_router import exam_router
+from routers.v1.me_router import me_router
 from routers.v1.reservation_router import reservation_router
 from routers.v1.user_router import user_router
+from routers.v1.waiting_room_router import waiting_room_router
 
 router = APIRouter(
     prefix='/api/v1'
@@ -9,4 +12,7 @@ router = APIRouter(
 
 router.include_router(user_router)
 router.include_router(exam_router)
-router.include_router(reservation_router)
\ No newline at end of file
+router.include_router(reservation_router)
+router.include_router(waiting_room_router)
+router.include_router(change_router)
+router.include_router(me_router)
\ No newline at end of file
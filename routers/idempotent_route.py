@@ -0,0 +1,105 @@
+"""
+`Idempotency-Key` 헤더를 지원하는 route 입니다.
+헤더와 함께 요청된 쓰기 API의 응답을 저장해두고, 같은 key로 재시도된 요청에는 endpoint를 실행하지 않고 저장된 응답을 반환합니다.
+"""
+
+import hashlib
+from typing import Annotated, Callable, Coroutine, Any
+
+from fastapi import HTTPException, Header, Request, Response
+from fastapi.responses import JSONResponse
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from cache.idempotency_store import IdempotencyStore, StoredResponse, idempotency_store
+from routers.instrumented_route import InstrumentedRoute
+
+IDEMPOTENCY_KEY_HEADER = 'Idempotency-Key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+IDEMPOTENT_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+# 다시 요청해도 결과가 같은 에러만 저장합니다. 인증 실패나 validation 에러는 저장하지 않습니다.
+STORED_ERROR_STATUS_CODES = {status.HTTP_400_BAD_REQUEST, status.HTTP_404_NOT_FOUND}
+
+
+def idempotency_key_header(idempotency_key: Annotated[
+    str | None,
+    Header(alias=IDEMPOTENCY_KEY_HEADER, max_length=IDEMPOTENCY_KEY_MAX_LENGTH,
+           description='재시도 시 요청이 중복 처리되지 않도록 하는 고유한 값. '
+                       '같은 값으로 다시 요청하면 처음 요청의 응답을 그대로 반환합니다'),
+] = None):
+    """
+    API 문서에 `Idempotency-Key` 헤더를 표시하기 위한 dependency 입니다. 실제 처리는 `IdempotentRoute`에서 합니다.
+    """
+    return idempotency_key
+
+
+class IdempotentRoute(InstrumentedRoute):
+    store: IdempotencyStore = idempotency_store
+
+    def wrap_route_handler(self, original_route_handler: Callable[[Request], Coroutine[Any, Any, Response]]) \
+            -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        async def idempotent_route_handler(request: Request) -> Response:
+            idempotency_key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if not idempotency_key or request.method not in IDEMPOTENT_METHODS:
+                return await original_route_handler(request)
+
+            if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                    detail=f"{IDEMPOTENCY_KEY_HEADER} must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+
+            # 같은 key라도 다른 유저나 다른 endpoint의 요청과는 구분합니다
+            key = _hash(request.method, request.url.path, request.headers.get('Authorization', ''), idempotency_key)
+            fingerprint = _hash(request.url.query, (await request.body()).decode('utf-8', 'replace'))
+
+            stored_response = await run_in_threadpool(self.store.reserve, key, fingerprint)
+            if stored_response is not None:
+                return _replay(stored_response, fingerprint)
+
+            try:
+                response = await original_route_handler(request)
+            except HTTPException as e:
+                if e.status_code in STORED_ERROR_STATUS_CODES:
+                    error_response = JSONResponse({'detail': e.detail}, status_code=e.status_code)
+                    await run_in_threadpool(self.store.save, key, StoredResponse(
+                        fingerprint=fingerprint,
+                        status_code=e.status_code,
+                        media_type=error_response.media_type,
+                        body=error_response.body
+                    ))
+                else:
+                    await run_in_threadpool(self.store.release, key)
+                raise
+            except Exception:
+                await run_in_threadpool(self.store.release, key)
+                raise
+
+            if status.HTTP_200_OK <= response.status_code < status.HTTP_300_MULTIPLE_CHOICES:
+                await run_in_threadpool(self.store.save, key, StoredResponse(
+                    fingerprint=fingerprint,
+                    status_code=response.status_code,
+                    media_type=response.media_type,
+                    body=response.body
+                ))
+            else:
+                await run_in_threadpool(self.store.release, key)
+
+            return response
+
+        return idempotent_route_handler
+
+
+def _hash(*values: str) -> str:
+    return hashlib.sha256('\n'.join(values).encode('utf-8')).hexdigest()
+
+
+def _replay(stored_response: StoredResponse, fingerprint: str) -> Response:
+    if stored_response.fingerprint != fingerprint:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"{IDEMPOTENCY_KEY_HEADER} was already used with a different request")
+
+    if stored_response.status_code is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still being processed")
+
+    return Response(content=stored_response.body, status_code=stored_response.status_code,
+                    media_type=stored_response.media_type, headers={'Idempotent-Replayed': 'true'})
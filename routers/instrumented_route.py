@@ -0,0 +1,111 @@
+"""
+API 요청 처리를 OpenTelemetry span으로 기록하는 route 입니다.
+인증(`JWTBearer`) 등의 dependency와 service, repository의 span은 이 span의 하위 span으로 기록됩니다.
+요청을 처리하는 동안 `current_route`에 현재 API를 설정해, slow query log 등에서 쿼리를 실행한 API를 알 수 있게 합니다.
+어드민이 profiling을 요청한 경우 요청을 처리하는 thread들의 stack을 수집해 speedscope 파일로 저장합니다.
+"""
+
+import functools
+import inspect
+import threading
+from typing import Callable, Coroutine, Any, Optional
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from starlette import status
+from starlette.concurrency import run_in_threadpool
+
+from telemetry.profiler import Profile, current_profile, stack_sampler, profile_requested, PROFILE_PATH_HEADER, \
+    PROFILER_INTERVAL_SECONDS
+from telemetry.request_context import current_route
+from telemetry.tracing import start_request_span, set_span_status_code
+from util import get_token_payload_from_request
+
+
+class InstrumentedRoute(APIRoute):
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        # sync endpoint는 threadpool에서 실행되므로, 실행하는 thread를 profile에 등록하도록 감쌉니다
+        self.dependant.call = _register_profiled_thread(self.dependant.call)
+        route_handler = self.wrap_route_handler(super().get_route_handler())
+        method = next(iter(self.methods)) if len(self.methods) == 1 else ','.join(sorted(self.methods))
+        span_name = f'{method} {self.path_format}'
+
+        async def instrumented_route_handler(request: Request) -> Response:
+            route_token = current_route.set(span_name)
+            profile = _start_profile(request, span_name)
+            profile_token = current_profile.set(profile)
+            try:
+                response = await self._handle_in_span(route_handler, request, span_name)
+            finally:
+                current_profile.reset(profile_token)
+                current_route.reset(route_token)
+                if profile is not None:
+                    stack_sampler.stop(profile)
+
+            if profile is not None:
+                response.headers[PROFILE_PATH_HEADER] = await run_in_threadpool(profile.save)
+            return response
+
+        return instrumented_route_handler
+
+    async def _handle_in_span(self, route_handler: Callable[[Request], Coroutine[Any, Any, Response]],
+                              request: Request, span_name: str) -> Response:
+        span = start_request_span(span_name, request.method, self.path_format)
+        if span is None:
+            return await route_handler(request)
+
+        with span:
+            try:
+                response = await route_handler(request)
+            except HTTPException as e:
+                set_span_status_code(e.status_code)
+                raise
+            except Exception:
+                set_span_status_code(status.HTTP_500_INTERNAL_SERVER_ERROR)
+                raise
+            set_span_status_code(response.status_code)
+            return response
+
+    def wrap_route_handler(self, route_handler: Callable[[Request], Coroutine[Any, Any, Response]]) \
+            -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """
+        span 안에서 실행될 handler를 감쌀 때 override 합니다.
+        """
+        return route_handler
+
+
+def _start_profile(request: Request, name: str) -> Optional[Profile]:
+    """
+    어드민이 profiling을 요청했다면 event loop thread의 stack 수집을 시작합니다.
+    """
+    if not profile_requested(request.headers, request.query_params):
+        return None
+
+    payload = get_token_payload_from_request(request)
+    if not payload or payload.get('role') != 'admin':
+        return None
+
+    profile = Profile(name, PROFILER_INTERVAL_SECONDS, {threading.get_ident()})
+    stack_sampler.start(profile)
+    return profile
+
+
+def _register_profiled_thread(call: Callable) -> Callable:
+    if getattr(call, '__profiled__', False) or inspect.iscoroutinefunction(call):
+        return call
+
+    @functools.wraps(call)
+    def profiled_call(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+
+        thread_id = threading.get_ident()
+        profile.add_thread(thread_id)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profile.remove_thread(thread_id)
+
+    profiled_call.__profiled__ = True
+    return profiled_call
@@ -0,0 +1,47 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from auth.auth_bearer import JWTBearer
+from db.database import get_read_db
+from routers.instrumented_route import InstrumentedRoute
+from schemas import reservation, user
+from service.reservation_service import ReservationService
+from util import get_current_user
+
+change_router = APIRouter(
+    prefix='/changes',
+    tags=['시험 일정'],
+    route_class=InstrumentedRoute
+)
+
+
+@change_router.get('',
+                   dependencies=[Depends(JWTBearer())],
+                   response_model=reservation.ReservationChangePageOutput,
+                   name='예약 변경 내역 조회',
+                   responses={
+                       403: {
+                           "description": "현재 유저가 client인 경우",
+                           "content": {
+                               "application/json": {
+                                   "example": {"detail": "Only admins can view reservation changes"}
+                               }
+                           }
+                       }
+                   })
+def get_changes(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                db: Session = Depends(get_read_db),
+                after: Annotated[
+                    int | None,
+                    Query(description='이전 응답의 `next_cursor` 값. 해당 `position` 이후의 변경부터 반환합니다'),
+                ] = None,
+                limit: Annotated[int, Query(ge=1, le=1000, description='최대 변경 수')] = 100):
+    """
+    예약의 생성/수정/확정/삭제 내역을 발행된 순서대로 반환합니다.
+    응답의 `next_cursor`를 `after`로 전달해 이후의 변경을 이어서 조회합니다.
+    어드민 전용 API 입니다.
+    """
+    reservation_service = ReservationService(db)
+    return reservation_service.get_changes(current_user, after, limit)
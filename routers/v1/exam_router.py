@@ -5,8 +5,10 @@ from sqlalchemy.orm import Session
 
 from starlette import status
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 from auth.auth_bearer import JWTBearer
+from auth.rate_limiter import get_exam_schedules_rate_limiter
+from routers.instrumented_route import InstrumentedRoute
 from schemas import exam_schedule, user
 from service.exam_schedule_service import ExamScheduleService
 from util import get_current_user
@@ -15,13 +17,24 @@ MAX_RESERVATION_NUM = 50000
 
 exam_router = APIRouter(
     prefix='/exam_schedule',
-    tags=['시험 일정']
+    tags=['시험 일정'],
+    route_class=InstrumentedRoute
 )
 
 
-@exam_router.get('/', dependencies=[Depends(JWTBearer())], response_model=List[exam_schedule.GetExamSchedule],
-                 name='시험 일정 조회')
-def get_exam_schedules(current_user: Annotated[user.TokenPayload, Depends(get_current_user)], db: Session = Depends(get_db)):
+@exam_router.get('/', dependencies=[Depends(get_exam_schedules_rate_limiter), Depends(JWTBearer())],
+                 response_model=List[exam_schedule.GetExamSchedule], name='시험 일정 조회', responses={
+        429: {
+            "description": "짧은 시간에 너무 많이 요청한 경우. `Retry-After` 헤더의 시간(초) 이후 다시 요청합니다",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Too many requests"}
+                }
+            }
+        }
+    })
+def get_exam_schedules(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                       db: Session = Depends(get_read_db)):
     """
     시험 일정들과 각 일정들의 남아있는 예약 슬롯을 반환합니다.
     고객의 경우, 예약이 가능한 시험 일정만을 반환합니다. 이미 예약한 시험이거나 시험 시간이 지난 경우 결과에서 제외됩니다.
@@ -31,6 +44,28 @@ def get_exam_schedules(current_user: Annotated[user.TokenPayload, Depends(get_cu
     return exam_schedule_service.get_schedules(current_user)
 
 
+@exam_router.get('/dashboard', dependencies=[Depends(JWTBearer())], response_model=exam_schedule.ExamScheduleDashboard,
+                 name='시험 일정 대시보드', responses={
+        403: {
+            "description": "현재 유저가 client인 경우",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Only admin can view the dashboard"}
+                }
+            }
+        }
+    })
+def get_exam_schedule_dashboard(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                                db: Session = Depends(get_read_db)):
+    """
+    모든 시험 일정의 확정/확정 대기 예약 신청 수, 확정 비율, 시작까지 남은 시간을 반환합니다.
+    예약 신청 수는 하나의 집계 쿼리로 계산하고 짧은 시간 동안 cache 합니다.
+    어드민 전용 API 입니다.
+    """
+    exam_schedule_service = ExamScheduleService(db)
+    return exam_schedule_service.get_dashboard(current_user)
+
+
 @exam_router.post('/', name='시험 일정 생성', dependencies=[Depends(JWTBearer())], status_code=status.HTTP_201_CREATED,
                   response_model=exam_schedule.ExamScheduleBase, responses={
         400: {
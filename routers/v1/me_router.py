@@ -0,0 +1,67 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, Response
+from sqlalchemy.orm import Session
+from starlette import status
+
+from auth.auth_bearer import JWTBearer
+from db.database import get_read_db
+from routers.instrumented_route import InstrumentedRoute
+from schemas import me, user
+from service.me_service import MeService
+from util import get_current_user
+
+me_router = APIRouter(
+    prefix='/me',
+    tags=['시험 일정'],
+    route_class=InstrumentedRoute
+)
+
+
+@me_router.get('/dashboard',
+               dependencies=[Depends(JWTBearer())],
+               response_model=me.MeDashboardOutput,
+               name='내 대시보드 조회',
+               responses={
+                   304: {
+                       "description": "`If-None-Match`의 ETag 이후 응답이 바뀌지 않은 경우. "
+                                      "`CACHE_INVALIDATION_ENABLED`가 true일 때만 ETag를 발급합니다",
+                   },
+                   403: {
+                       "description": "현재 유저가 admin인 경우",
+                       "content": {
+                           "application/json": {
+                               "example": {"detail": "Only clients can view their dashboard"}
+                           }
+                       }
+                   }
+               })
+def get_my_dashboard(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                     response: Response,
+                     db: Session = Depends(get_read_db),
+                     if_none_match: Annotated[Optional[str], Header(description='이전 응답의 `ETag` 값')] = None):
+    """
+    예약할 수 있는 시험 일정(남은 슬롯 포함)과 내 예약 신청을 한 번에 반환합니다.
+    응답의 `ETag`를 `If-None-Match`로 전달하면, 그 사이 바뀐 내용이 없는 경우 DB 조회 없이 304를 반환합니다.
+    worker 간 cache invalidation이 꺼져 있다면 다른 worker의 변경을 알 수 없으므로 `ETag`를 발급하지 않습니다.
+    고객 전용 API 입니다.
+    """
+    me_service = MeService(db)
+    etag = me_service.get_dashboard_etag(current_user)
+    headers = {'Cache-Control': 'private, no-cache'}
+    if etag is not None:
+        headers['ETag'] = etag
+        if _matches_etag(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return me_service.get_dashboard(current_user)
+
+
+def _matches_etag(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    # weak 비교를 사용합니다
+    candidates = {candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')}
+    return '*' in candidates or etag.removeprefix('W/') in candidates
@@ -1,24 +1,31 @@
-from typing import Annotated, List
+from typing import Annotated, Callable, List, Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from fastapi.params import Path
 from sqlalchemy.orm import Session
 from starlette import status
 
 from auth.auth_bearer import JWTBearer
-from db.database import get_db
+from auth.rate_limiter import make_reservation_rate_limiter
+from db.database import get_db, get_read_db, get_read_session_factory
+from routers.idempotent_route import IdempotentRoute, idempotency_key_header
+from routers.v1.waiting_room_router import require_waiting_room_admission
 from schemas import reservation, user, base
+from service.reservation_export import EXPORT_MEDIA_TYPES, export_filename
 from service.reservation_service import ReservationService
 from util import get_current_user
 
 reservation_router = APIRouter(
     prefix='/reservation',
-    tags=['시험 일정']
+    tags=['시험 일정'],
+    route_class=IdempotentRoute
 )
 
 
 @reservation_router.post('/make_reservation/{exam_schedule_id}',
-                         dependencies=[Depends(JWTBearer())],
+                         dependencies=[Depends(make_reservation_rate_limiter), Depends(require_waiting_room_admission),
+                                       Depends(JWTBearer()), Depends(idempotency_key_header)],
                          status_code=status.HTTP_201_CREATED,
                          response_model=reservation.MakeEditReservationOutput ,
                          name='시험 일정 예약신청',
@@ -32,7 +39,7 @@ reservation_router = APIRouter(
                                  }
                              },
                              400: {
-                                 "description": "해당 유저가 이미 예약 신청을 했거나 남은 슬롯이 없는 경우",
+                                 "description": "해당 유저가 이미 예약 신청을 했거나, 남은 슬롯이 없거나, 이미 시작한 시험인 경우",
                                  "content": {
                                      "application/json": {
                                          "example": {"detail": "User already has a reservation for this exam schedule"}
@@ -46,6 +53,24 @@ reservation_router = APIRouter(
                                          "example": {"detail": "Only clients can make reservations"}
                                      }
                                  }
+                             },
+                             429: {
+                                 "description": "짧은 시간에 너무 많이 요청했거나, 대기열이 켜져 있는데 아직 입장하지 않은 경우. "
+                                                "`Retry-After` 헤더의 시간(초) 이후 다시 요청합니다",
+                                 "content": {
+                                     "application/json": {
+                                         "example": {"detail": "Too many requests"}
+                                     }
+                                 }
+                             },
+                             503: {
+                                 "description": "서버가 종료 중이거나, 예약 저장이 제한 시간 안에 끝나지 않은 경우. "
+                                                "예약이 늦게 저장되었을 수 있으므로 다시 요청하면 중복 예약으로 거절될 수 있습니다",
+                                 "content": {
+                                     "application/json": {
+                                         "example": {"detail": "Reservation could not be saved in time. Please try again"}
+                                     }
+                                 }
                              }
                          }
                          )
@@ -76,7 +101,7 @@ def make_reservation(current_user: Annotated[user.TokenPayload, Depends(get_curr
                             }
                         })
 def get_my_reservations(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
-                        db: Session = Depends(get_db)):
+                        db: Session = Depends(get_read_db)):
     reservation_service = ReservationService(db)
     return reservation_service.get_my_reservation(current_user)
 
@@ -104,14 +129,115 @@ def get_my_reservations(current_user: Annotated[user.TokenPayload, Depends(get_c
                             }
                         })
 def get_user_reservations(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
-                          db: Session = Depends(get_db),
+                          db: Session = Depends(get_read_db),
                           user_id: int = Path(..., description='예약 신청 목록을 조회할 유저의 `id`')):
+    """
+    특정 유저의 예약 신청들을 반환합니다. 종료된 시험의 보관된 예약 신청도 함께 반환합니다.
+    어드민 전용 API 입니다.
+    """
     reservation_service = ReservationService(db)
     return reservation_service.get_user_reservation(current_user, user_id)
 
 
-@reservation_router.put('/confirm_reservation',
+@reservation_router.get('/by_schedule/{exam_schedule_id}',
                         dependencies=[Depends(JWTBearer())],
+                        response_model=reservation.ReservationPageOutput,
+                        name='시험 일정별 예약 신청 조회',
+                        responses={
+                            404: {
+                                "description": "`exam_schedule_id`값을 가진 시험 일정이 없는 경우",
+                                "content": {
+                                    "application/json": {
+                                        "example": {"detail": "Exam schedule not found"}
+                                    }
+                                }
+                            },
+                            403: {
+                                "description": "현재 유저가 client인 경우",
+                                "content": {
+                                    "application/json": {
+                                        "example": {"detail": "Only admins can view exam schedule reservations"}
+                                    }
+                                }
+                            }
+                        })
+def get_schedule_reservations(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                              db: Session = Depends(get_read_db),
+                              exam_schedule_id: int = Path(..., description='예약 신청 목록을 조회할 시험 일정의 `id`'),
+                              confirmed: Annotated[
+                                  bool | None,
+                                  Query(description='확정 여부로 필터링합니다. 주어지지 않으면 모든 예약 신청을 반환합니다'),
+                              ] = None,
+                              after: Annotated[
+                                  int | None,
+                                  Query(description='이전 페이지 응답의 `next_cursor` 값. 해당 유저 `id` 이후의 예약 신청부터 반환합니다'),
+                              ] = None,
+                              limit: Annotated[int, Query(ge=1, le=1000, description='페이지 크기')] = 100):
+    """
+    특정 시험 일정의 예약 신청들을 유저 `id` 순서로 페이지 단위로 반환합니다.
+    다음 페이지는 응답의 `next_cursor`를 `after`로 전달해 조회합니다.
+    종료되어 보관된 시험 일정의 예약 신청도 조회할 수 있습니다.
+    어드민 전용 API 입니다.
+    """
+    reservation_service = ReservationService(db)
+    return reservation_service.get_schedule_reservation(current_user, exam_schedule_id, confirmed, after, limit)
+
+
+@reservation_router.get('/export/{exam_schedule_id}',
+                        dependencies=[Depends(JWTBearer())],
+                        response_class=StreamingResponse,
+                        name='시험 일정별 예약 신청 내보내기',
+                        responses={
+                            200: {
+                                "content": {
+                                    "text/csv": {
+                                        "example": "reservation_id,user_id,login_id,comment,confirmed,archived\n"
+                                                   "0190f5e4-7b5c-7000-8000-000000000001,1,user 1,코멘트,False,False\n"
+                                    },
+                                    "application/x-ndjson": {}
+                                }
+                            },
+                            404: {
+                                "description": "`exam_schedule_id`값을 가진 시험 일정이 없는 경우",
+                                "content": {
+                                    "application/json": {
+                                        "example": {"detail": "Exam schedule not found"}
+                                    }
+                                }
+                            },
+                            403: {
+                                "description": "현재 유저가 client인 경우",
+                                "content": {
+                                    "application/json": {
+                                        "example": {"detail": "Only admins can export exam schedule reservations"}
+                                    }
+                                }
+                            }
+                        })
+def export_schedule_reservations(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                                 db: Session = Depends(get_read_db),
+                                 session_factory: Callable[[], Session] = Depends(get_read_session_factory),
+                                 exam_schedule_id: int = Path(..., description='예약 신청을 내보낼 시험 일정의 `id`'),
+                                 export_format: Annotated[
+                                     Literal['csv', 'ndjson'],
+                                     Query(alias='format', description='파일 형식'),
+                                 ] = 'csv',
+                                 gzip: Annotated[bool, Query(description='gzip으로 압축한 파일로 받습니다')] = False):
+    """
+    특정 시험 일정의 모든 예약 신청을 유저의 로그인 id와 함께 파일로 내려받습니다.
+    예약 신청 수와 상관없이 일정한 메모리로 조금씩 읽어 보내며, 종료되어 보관된 예약 신청도 포함합니다.
+    어드민 전용 API 입니다.
+    """
+    reservation_service = ReservationService(db)
+    content = reservation_service.export_schedule_reservation(current_user, exam_schedule_id, session_factory,
+                                                              export_format, gzip)
+    filename = export_filename(exam_schedule_id, export_format, gzip)
+    return StreamingResponse(content, media_type='application/gzip' if gzip else EXPORT_MEDIA_TYPES[export_format],
+                             headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
+@reservation_router.put('/confirm_reservation',
+                        dependencies=[Depends(JWTBearer()), Depends(idempotency_key_header)],
                         name='예약 신청 확정',
                         response_model=base.MessageOutputBase,
                         responses={
@@ -155,7 +281,7 @@ def confirm_reservation(current_user: Annotated[user.TokenPayload, Depends(get_c
     return reservation_service.confirm_reservation(current_user, confirm_reservation_request)
 
 
-@reservation_router.put('/edit_my_reservation', dependencies=[Depends(JWTBearer())], name='예약 신청 수정', responses={
+@reservation_router.put('/edit_my_reservation', dependencies=[Depends(JWTBearer()), Depends(idempotency_key_header)], name='예약 신청 수정', responses={
     200: {
         "content": {
             "application/json": {
@@ -198,7 +324,7 @@ def edit_my_reservation(current_user: Annotated[user.TokenPayload, Depends(get_c
                                                 edit_reservation_request.comment)
 
 
-@reservation_router.put('/edit_reservation/{reservation_id}', dependencies=[Depends(JWTBearer())], name='예약 신청 수정',
+@reservation_router.put('/edit_reservation/{reservation_id}', dependencies=[Depends(JWTBearer()), Depends(idempotency_key_header)], name='예약 신청 수정',
                         responses={
                             200: {
                                 "content": {
@@ -242,7 +368,7 @@ def edit_reservation(current_user: Annotated[user.TokenPayload, Depends(get_curr
                                                 edit_reservation_request.comment)
 
 
-@reservation_router.delete('/delete_reservation/{reservation_id}', dependencies=[Depends(JWTBearer())], name='예약 신청 삭제',
+@reservation_router.delete('/delete_reservation/{reservation_id}', dependencies=[Depends(JWTBearer()), Depends(idempotency_key_header)], name='예약 신청 삭제',
                            responses={
                                200: {
                                    "content": {
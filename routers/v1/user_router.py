@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, Query
-from db.database import get_db
+from auth.rate_limiter import login_rate_limiter
+from db.database import get_db, get_read_db
+from routers.instrumented_route import InstrumentedRoute
 from typing import List, Annotated
 from schemas import user
 from sqlalchemy.orm import Session
@@ -8,12 +10,13 @@ from service.user_service import UserService
 
 user_router = APIRouter(
     prefix='/users',
-    tags=['유저']
+    tags=['유저'],
+    route_class=InstrumentedRoute
 )
 
 
 @user_router.get('/', response_model=List[user.UserBase], name='유저 검색')
-def get_users(db: Session = Depends(get_db), user_id:
+def get_users(db: Session = Depends(get_read_db), user_id:
 Annotated[
     str | None,
     Query(
@@ -37,7 +40,7 @@ Annotated[
     return user_service.search_users(user_id, role)
 
 
-@user_router.post('/login', name='로그인', responses={
+@user_router.post('/login', name='로그인', dependencies=[Depends(login_rate_limiter)], responses={
     200: {
         "description": "JWT token",
         "content": {
@@ -53,6 +56,14 @@ Annotated[
                 "example": {"detail": "The id or password is not right"}
             }
         }
+    },
+    429: {
+        "description": "같은 ip에서 짧은 시간에 너무 많이 요청한 경우. `Retry-After` 헤더의 시간(초) 이후 다시 요청합니다",
+        "content": {
+            "application/json": {
+                "example": {"detail": "Too many requests"}
+            }
+        }
     }
 })
 def login(login_user: user.LoginUser, db: Session = Depends(get_db)):
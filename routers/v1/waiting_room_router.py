@@ -0,0 +1,110 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.params import Path
+from starlette import status
+
+from auth.auth_bearer import JWTBearer
+from routers.instrumented_route import InstrumentedRoute
+from schemas import user
+from schemas.waiting_room import WaitingRoomStatus
+from service.waiting_room import waiting_room
+from util import get_current_user, get_user_id_from_request
+
+waiting_room_router = APIRouter(
+    prefix='/waiting_room',
+    tags=['시험 일정'],
+    route_class=InstrumentedRoute
+)
+
+
+async def require_waiting_room_admission(request: Request,
+                                         exam_schedule_id: int = Path(..., description='예약을 신청할 시험 일정의 `id`')):
+    """
+    대기열이 켜져 있다면, 대기열에서 입장한 유저만 예약 신청 API를 사용할 수 있게 합니다.
+    DB를 사용하지 않으므로 예약 신청 API의 다른 dependency보다 먼저 실행됩니다.
+    """
+    if not waiting_room.enabled:
+        return
+
+    user_id = get_user_id_from_request(request)
+    if user_id is None:
+        # 인증 실패는 JWTBearer에서 처리합니다
+        return
+
+    waiting_status = waiting_room.get_status(exam_schedule_id, user_id)
+    if waiting_status is None:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Waiting room ticket is required to make a reservation")
+
+    if not waiting_status.admitted:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Not admitted from the waiting room yet",
+                            headers={'Retry-After': str(max(1, waiting_status.estimated_wait_seconds))})
+
+
+def _check_client(current_user: user.TokenPayload):
+    if current_user['role'] != 'client':
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only clients can use the waiting room")
+
+
+@waiting_room_router.post('/{exam_schedule_id}',
+                          dependencies=[Depends(JWTBearer())],
+                          response_model=WaitingRoomStatus,
+                          name='예약 대기표 발급',
+                          responses={
+                              403: {
+                                  "description": "현재 유저가 admin인 경우",
+                                  "content": {
+                                      "application/json": {
+                                          "example": {"detail": "Only clients can use the waiting room"}
+                                      }
+                                  }
+                              }
+                          })
+def issue_waiting_room_ticket(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                              exam_schedule_id: int = Path(..., description='예약을 신청할 시험 일정의 `id`')):
+    """
+    시험 일정의 예약 대기표를 발급합니다. 이미 대기표가 있다면 기존 대기표를 반환합니다.
+    대기열이 켜져 있는 경우, `admitted`가 true가 된 후에 예약 신청 API를 사용할 수 있습니다.
+    고객 전용 API 입니다.
+    """
+    _check_client(current_user)
+    return waiting_room.issue_ticket(exam_schedule_id, int(current_user['id']))
+
+
+@waiting_room_router.get('/{exam_schedule_id}',
+                         dependencies=[Depends(JWTBearer())],
+                         response_model=WaitingRoomStatus,
+                         name='예약 대기 상태 조회',
+                         responses={
+                             404: {
+                                 "description": "발급받은 대기표가 없는 경우",
+                                 "content": {
+                                     "application/json": {
+                                         "example": {"detail": "Waiting room ticket not found"}
+                                     }
+                                 }
+                             },
+                             403: {
+                                 "description": "현재 유저가 admin인 경우",
+                                 "content": {
+                                     "application/json": {
+                                         "example": {"detail": "Only clients can use the waiting room"}
+                                     }
+                                 }
+                             }
+                         })
+def get_waiting_room_status(current_user: Annotated[user.TokenPayload, Depends(get_current_user)],
+                            exam_schedule_id: int = Path(..., description='대기 중인 시험 일정의 `id`')):
+    """
+    발급받은 대기표의 순번과 입장 여부를 반환합니다. DB를 사용하지 않으므로 대기 중에 주기적으로 호출할 수 있습니다.
+    고객 전용 API 입니다.
+    """
+    _check_client(current_user)
+
+    waiting_status = waiting_room.get_status(exam_schedule_id, int(current_user['id']))
+    if waiting_status is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Waiting room ticket not found")
+
+    return waiting_status
@@ -1,4 +1,5 @@
 import datetime
+from typing import List
 
 from pydantic import BaseModel, ConfigDict, FutureDatetime, Field, field_validator, model_validator
 from pydantic_core.core_schema import FieldValidationInfo
@@ -49,3 +50,27 @@ class GetExamSchedule(BaseModel):
     start_time: datetime.datetime
     end_time: datetime.datetime
     remain_slot: int
+
+
+class ExamScheduleStats(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    id: int
+    name: str
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    pending_num: int = Field(description='확정 대기 중인 예약 신청 수')
+    confirmed_num: int = Field(description='확정된 예약 신청 수')
+
+
+class ExamScheduleDashboardItem(ExamScheduleStats):
+    remain_slot: int
+    fill_rate: float = Field(description='최대 예약 수 대비 확정된 예약 신청의 비율 (0 ~ 1)')
+    seconds_to_start: float = Field(description='시험 시작까지 남은 시간(초). 이미 시작한 시험은 음수')
+
+
+class ExamScheduleDashboard(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    exam_schedules: List[ExamScheduleDashboardItem]
+    aggregated_at: datetime.datetime = Field(description='예약 신청 수를 집계한 시각. 짧은 시간 동안 cache된 값일 수 있습니다')
@@ -0,0 +1,13 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict
+
+from schemas.exam_schedule import GetExamSchedule
+from schemas.reservation import ReservationBase
+
+
+class MeDashboardOutput(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    exam_schedules: List[GetExamSchedule]
+    reservations: List[ReservationBase]
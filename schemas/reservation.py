@@ -1,9 +1,14 @@
+import datetime
+import uuid
+from typing import List, Optional
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
 class ReservationBase(BaseModel):
     model_config = ConfigDict(extra='ignore')
 
+    id: Optional[uuid.UUID] = None
     user_id: int
     exam_schedule_id: int
     comment: str
@@ -23,6 +28,7 @@ class EditReservationClientInput(MakeEditReservationInput):
 class MakeEditReservationOutput(BaseModel):
     model_config = ConfigDict(extra='ignore')
 
+    id: uuid.UUID
     exam_schedule_id: int
     comment: str
     confirmed: bool
@@ -34,3 +40,32 @@ class ConfirmReservationRequest(BaseModel):
     user_id: int
     exam_schedule_id: int
 
+
+class ReservationPageOutput(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    reservations: List[ReservationBase]
+    next_cursor: Optional[int] = Field(default=None,
+                                       description='다음 페이지를 조회할 때 `after`로 전달할 값. 마지막 페이지인 경우 null')
+
+
+class ReservationChange(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    id: int = Field(exclude=True)
+    position: Optional[int] = Field(default=None, description='변경 순서. 다음 조회 시 `after`로 사용합니다')
+    event_type: str = Field(description='created / updated / confirmed / deleted')
+    reservation_id: uuid.UUID
+    user_id: int
+    exam_schedule_id: int
+    comment: str
+    confirmed: bool
+    created_at: datetime.datetime
+
+
+class ReservationChangePageOutput(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    changes: List[ReservationChange]
+    next_cursor: Optional[int] = Field(default=None,
+                                       description='다음 조회 시 `after`로 전달할 값. 새 변경이 없다면 요청한 `after`와 같습니다')
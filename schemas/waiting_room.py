@@ -0,0 +1,11 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class WaitingRoomStatus(BaseModel):
+    model_config = ConfigDict(extra='ignore')
+
+    exam_schedule_id: int
+    ticket: int = Field(description='대기표 번호')
+    admitted: bool = Field(description='예약 신청 API를 사용할 수 있는지 여부')
+    position: int = Field(description='남은 대기 순번. 입장한 경우 0')
+    estimated_wait_seconds: int = Field(description='입장까지 예상되는 대기 시간(초)')
@@ -1,40 +1,91 @@
+import datetime
+import os
+
+from dotenv import load_dotenv
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from starlette import status
 from repository.exam_schedule_repository import ExamScheduleRepository
 from typing import List, Optional
 
+from cache.ttl_cache import TTLCache
+
 from repository.reservation_repository import ReservationRepository
-from schemas.exam_schedule import ExamScheduleBase, CreateExamSchedule, GetExamSchedule
+from schemas.exam_schedule import ExamScheduleBase, CreateExamSchedule, GetExamSchedule, ExamScheduleDashboard, \
+    ExamScheduleDashboardItem
 from schemas.user import TokenPayload
+from service.me_dashboard_version import me_dashboard_versions
+from service.reservation_bitmap_index import reservation_bitmap_index
+from telemetry.tracing import trace_methods
+from util import as_utc
+
+load_dotenv()
 
 MAX_RESERVATION_NUM = 50000
+# 어드민 대시보드의 집계 결과를 cache하는 시간(초)
+ADMIN_DASHBOARD_CACHE_TTL_SECONDS = float(os.environ.get('ADMIN_DASHBOARD_CACHE_TTL_SECONDS', 5))
+
+_DASHBOARD_CACHE_KEY = 'exam_schedule_stats'
+# (시험 일정별 예약 신청 수, 집계한 시각)
+dashboard_cache = TTLCache(maxsize=1, ttl=ADMIN_DASHBOARD_CACHE_TTL_SECONDS)
 
 
+@trace_methods
 class ExamScheduleService:
     def __init__(self, session: Session):
+        self.session = session
         self.repository = ExamScheduleRepository(session)
         self.reservation_repository = ReservationRepository(session)
 
     def get_schedules(self, current_user: TokenPayload) -> List[Optional[GetExamSchedule]]:
         if current_user['role'] == 'admin':
             exam_schedules = self.repository.get_all()
+        elif reservation_bitmap_index.active:
+            exam_schedules = self.repository.get_in_booking_window()
+            available_ids = set(reservation_bitmap_index.filter_unreserved(
+                self.session, [exam_schedule.id for exam_schedule in exam_schedules], int(current_user['id'])))
+            exam_schedules = [exam_schedule for exam_schedule in exam_schedules if exam_schedule.id in available_ids]
         else:
             exam_schedules = self.repository.get_available_schedules(current_user['id'])
 
-        schedules_with_remain_slot = []
+        if not exam_schedules:
+            return []
 
-        for exam_schedule in exam_schedules:
-            confirmed_schedule_num = self.reservation_repository.get_confirmed_schedule_num(exam_schedule.id)
+        # 시험 일정마다 조회하지 않고 확정된 예약 수를 한 번에 조회합니다
+        confirmed_schedule_nums = self.reservation_repository.get_confirmed_schedule_nums(
+            [exam_schedule.id for exam_schedule in exam_schedules])
 
-            schedules_with_remain_slot.append(GetExamSchedule(
+        return [
+            GetExamSchedule(
                 name=exam_schedule.name,
                 start_time=exam_schedule.start_time,
                 end_time=exam_schedule.end_time,
-                remain_slot=MAX_RESERVATION_NUM - confirmed_schedule_num
-            ))
+                remain_slot=MAX_RESERVATION_NUM - confirmed_schedule_nums.get(exam_schedule.id, 0)
+            )
+            for exam_schedule in exam_schedules
+        ]
 
-        return schedules_with_remain_slot
+    def get_dashboard(self, current_user: TokenPayload) -> ExamScheduleDashboard:
+        if current_user['role'] != 'admin':
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admin can view the dashboard")
+
+        cached = dashboard_cache.get(_DASHBOARD_CACHE_KEY)
+        if cached is None:
+            cached = (self.repository.get_stats(), datetime.datetime.now(datetime.UTC))
+            dashboard_cache.set(_DASHBOARD_CACHE_KEY, cached)
+        stats, aggregated_at = cached
+
+        # 시작까지 남은 시간은 cache된 값이 아니라 응답하는 시각 기준으로 계산합니다
+        now = datetime.datetime.now(datetime.UTC)
+        return ExamScheduleDashboard(aggregated_at=aggregated_at, exam_schedules=[
+            ExamScheduleDashboardItem(
+                **stat.model_dump(),
+                remain_slot=MAX_RESERVATION_NUM - stat.confirmed_num,
+                fill_rate=stat.confirmed_num / MAX_RESERVATION_NUM,
+                seconds_to_start=(as_utc(stat.start_time) - now).total_seconds(),
+            )
+            for stat in stats
+        ])
 
     def create_schedule(self, current_user: TokenPayload, new_schedule: CreateExamSchedule) -> ExamScheduleBase:
         if current_user['role'] != 'admin':
@@ -44,4 +95,8 @@ class ExamScheduleService:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail="Exam schedule's name must be unique. Please use other name.")
 
-        return self.repository.create(new_schedule)
+        created_schedule = self.repository.create(new_schedule)
+        dashboard_cache.delete(_DASHBOARD_CACHE_KEY)
+        me_dashboard_versions.bump_exam_schedules()
+
+        return created_schedule
@@ -0,0 +1,84 @@
+"""
+`/me/dashboard` 응답의 version을 유저별로 관리합니다. version은 응답의 ETag로 사용되며,
+클라이언트가 같은 ETag로 다시 요청하면 DB 조회 없이 304 Not Modified를 응답합니다.
+
+- 유저의 예약이 변경되면 해당 유저의 version을 새로 발급합니다
+- 시험 일정이 추가되거나 예약이 확정되어 남은 슬롯이 바뀌면, 모든 유저가 공유하는 시험 일정 version을 새로 발급합니다
+
+시간이 지나면 예약할 수 있는 시험 일정이 바뀌므로,
+version은 `ME_DASHBOARD_VERSION_TTL_SECONDS`초가 지나면 새로 발급해 그 이상 오래된 응답을 재사용하지 않습니다.
+
+version은 worker마다 따로 관리되므로, 다른 worker의 변경을 전달받을 수 있도록 invalidation bus가 켜져 있을 때만 ETag를 발급합니다.
+"""
+
+import itertools
+import os
+import threading
+import uuid
+from typing import Hashable, Optional
+
+from dotenv import load_dotenv
+
+from cache.invalidation_bus import InvalidationEvent, EXAM_SCHEDULE, RESERVATION, RESET, CONFIRMED, invalidation_bus
+from cache.ttl_cache import TTLCache
+
+load_dotenv()
+
+ME_DASHBOARD_VERSION_TTL_SECONDS = float(os.environ.get('ME_DASHBOARD_VERSION_TTL_SECONDS', 30))
+ME_DASHBOARD_VERSION_MAXSIZE = int(os.environ.get('ME_DASHBOARD_VERSION_MAXSIZE', 100000))
+
+_EXAM_SCHEDULES_KEY = 'exam_schedules'
+
+
+class MeDashboardVersions:
+    def __init__(self, maxsize: int = ME_DASHBOARD_VERSION_MAXSIZE, ttl: float = ME_DASHBOARD_VERSION_TTL_SECONDS):
+        self._versions = TTLCache(maxsize=maxsize, ttl=ttl)
+        # worker마다 다른 version을 발급해, 다른 worker가 발급한 ETag와 우연히 같아지지 않게 합니다
+        self._prefix = uuid.uuid4().hex[:8]
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def etag(self, user_id: int) -> Optional[str]:
+        """
+        DB를 조회하기 전에 호출합니다. 조회하는 동안 변경이 생기면 version이 바뀌므로 다음 요청에서 다시 조회합니다.
+        invalidation bus가 꺼져 있다면 다른 worker의 변경을 알 수 없으므로 None을 반환합니다.
+        """
+        if not invalidation_bus.enabled:
+            return None
+
+        return f'W/"{self._get(_EXAM_SCHEDULES_KEY)}.{self._get(int(user_id))}"'
+
+    def bump_user(self, user_id: int):
+        self._versions.delete(int(user_id))
+
+    def bump_exam_schedules(self):
+        self._versions.delete(_EXAM_SCHEDULES_KEY)
+
+    def reset(self):
+        self._versions.clear()
+
+    def handle_invalidation(self, invalidation_event: InvalidationEvent):
+        """
+        다른 worker에서 변경된 유저나 시험 일정의 version을 새로 발급합니다.
+        여러 유저의 예약이 함께 변경되었다면 어떤 유저인지 알 수 없으므로 모든 version을 새로 발급합니다.
+        """
+        if invalidation_event.kind == EXAM_SCHEDULE:
+            self.bump_exam_schedules()
+        elif invalidation_event.kind == RESERVATION and invalidation_event.user_id is not None:
+            self.bump_user(invalidation_event.user_id)
+            if invalidation_event.operation == CONFIRMED:
+                self.bump_exam_schedules()
+        elif invalidation_event.kind in (RESERVATION, RESET):
+            self.reset()
+
+    def _get(self, key: Hashable) -> str:
+        with self._lock:
+            version = self._versions.get(key)
+            if version is None:
+                version = f'{self._prefix}-{next(self._counter)}'
+                self._versions.set(key, version)
+
+            return version
+
+
+me_dashboard_versions = MeDashboardVersions()
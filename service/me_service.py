@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from starlette import status
+
+from schemas.me import MeDashboardOutput
+from schemas.user import TokenPayload
+from service.exam_schedule_service import ExamScheduleService
+from service.me_dashboard_version import me_dashboard_versions
+from service.reservation_service import ReservationService
+from telemetry.tracing import trace_methods
+
+
+@trace_methods
+class MeService:
+    def __init__(self, session: Session):
+        self.session = session
+        self.exam_schedule_service = ExamScheduleService(session)
+        self.reservation_service = ReservationService(session)
+
+    def get_dashboard_etag(self, current_user: TokenPayload) -> Optional[str]:
+        self._check_client(current_user)
+        return me_dashboard_versions.etag(current_user['id'])
+
+    def get_dashboard(self, current_user: TokenPayload) -> MeDashboardOutput:
+        """
+        예약할 수 있는 시험 일정과 내 예약 신청을 같은 session에서 조회합니다.
+        """
+        self._check_client(current_user)
+        return MeDashboardOutput(exam_schedules=self.exam_schedule_service.get_schedules(current_user),
+                                 reservations=self.reservation_service.get_my_reservation(current_user))
+
+    @staticmethod
+    def _check_client(current_user: TokenPayload):
+        if current_user['role'] != 'client':
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only clients can view their dashboard")
@@ -0,0 +1,204 @@
+"""
+동시에 들어온 예약 신청을 모아 하나의 transaction으로 저장하는 writer 입니다(group commit).
+요청마다 commit을 기다리는 대신 짧은 시간 동안 모인 예약들을 한 번의 INSERT와 commit으로 처리하므로,
+동시 요청이 많을수록 commit 한 번에 저장되는 예약이 많아집니다.
+각 요청은 `Future`로 자신의 예약 결과(예약 완료, 중복 예약, 남은 슬롯 없음)를 받습니다.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from db.database import SessionLocal
+from repository.reservation_repository import ReservationRepository
+from schemas.reservation import MakeEditReservationOutput
+from service.slot_inventory import BookResult
+from util import generate_uuid7
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RESERVATION_BATCH_WRITER_ENABLED = os.environ.get('RESERVATION_BATCH_WRITER_ENABLED', 'false').lower() == 'true'
+# 첫 예약이 들어온 뒤 다른 예약을 기다리는 시간(ms)
+RESERVATION_BATCH_WINDOW_MS = float(os.environ.get('RESERVATION_BATCH_WINDOW_MS', 2))
+RESERVATION_BATCH_MAX_SIZE = int(os.environ.get('RESERVATION_BATCH_MAX_SIZE', 500))
+# 예약 요청이 batch의 commit을 기다리는 최대 시간(초)
+RESERVATION_BATCH_RESULT_TIMEOUT_SECONDS = float(os.environ.get('RESERVATION_BATCH_RESULT_TIMEOUT_SECONDS', 10))
+
+BatchResult = Tuple[BookResult, Optional[MakeEditReservationOutput]]
+
+
+class ReservationBatchWriterStopped(RuntimeError):
+    """
+    종료 중인 writer에 예약이 추가된 경우
+    """
+
+
+class _PendingReservation:
+    def __init__(self, values: dict, capacity: int):
+        self.values = values
+        self.capacity = capacity
+        self.future: Future = Future()
+
+    @property
+    def key(self) -> Tuple[int, int]:
+        return self.values['user_id'], self.values['exam_schedule_id']
+
+
+class ReservationBatchWriter:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 enabled: bool = RESERVATION_BATCH_WRITER_ENABLED, window_ms: float = RESERVATION_BATCH_WINDOW_MS,
+                 max_batch_size: int = RESERVATION_BATCH_MAX_SIZE):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def submit(self, user_id: int, exam_schedule_id: int, comment: str, capacity: int) -> 'Future[BatchResult]':
+        """
+        예약을 다음 batch에 추가합니다. batch가 commit된 뒤 반환된 `Future`에 결과가 설정됩니다.
+        writer가 종료 중이라면 `ReservationBatchWriterStopped`가 설정된 `Future`를 반환합니다.
+        """
+        pending = _PendingReservation({'id': generate_uuid7(), 'user_id': user_id,
+                                       'exam_schedule_id': exam_schedule_id, 'comment': comment,
+                                       'confirmed': False}, capacity)
+
+        # 종료 요청 이후에는 queue에 넣지 않아야, 종료 신호 뒤에 남아 결과를 받지 못하는 예약이 생기지 않습니다
+        with self._lock:
+            if self._stopping:
+                pending.future.set_exception(ReservationBatchWriterStopped('reservation batch writer is stopped'))
+                return pending.future
+
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='reservation-batch-writer', daemon=True)
+                self._worker.start()
+            self._queue.put(pending)
+
+        return pending.future
+
+    def start(self):
+        """
+        `stop` 이후 다시 예약을 받습니다. worker thread는 첫 예약이 들어올 때 시작됩니다.
+        """
+        with self._lock:
+            self._stopping = False
+
+    def stop(self):
+        """
+        새 예약을 거절하고, 이미 받은 예약을 모두 저장한 뒤 종료합니다.
+        """
+        with self._lock:
+            self._stopping = True
+            worker, self._worker = self._worker, None
+            if worker is not None:
+                self._queue.put(None)
+
+        if worker is not None:
+            worker.join()
+
+        self._drain()
+
+    def _drain(self):
+        # worker가 비정상 종료된 경우에도 기다리는 요청이 없도록 남은 예약에 실패를 알립니다
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+            if pending is not None:
+                pending.future.set_exception(ReservationBatchWriterStopped('reservation batch writer is stopped'))
+
+    def write_batch(self, batch: List[_PendingReservation]):
+        """
+        batch의 중복 예약과 남은 슬롯을 한 번에 조회하고, 예약 가능한 것들만 하나의 transaction으로 저장합니다.
+        """
+        try:
+            results, conflicts = self._write(batch)
+        except Exception as e:
+            logger.exception('failed to write reservation batch')
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        # 조회 이후 다른 프로세스가 먼저 저장한 예약
+        conflict_ids = {conflict['id'] for conflict in conflicts}
+        for pending in batch:
+            result = results[id(pending)]
+            if result == BookResult.BOOKED and pending.values['id'] in conflict_ids:
+                result = BookResult.DUPLICATE
+
+            pending.future.set_result(
+                (result, MakeEditReservationOutput(**pending.values) if result == BookResult.BOOKED else None))
+
+    def _write(self, batch: List[_PendingReservation]) -> Tuple[dict, List[dict]]:
+        session = self.session_factory()
+        try:
+            repository = ReservationRepository(session)
+            existing_keys = repository.get_existing_keys([pending.key for pending in batch])
+            confirmed_nums = repository.get_confirmed_schedule_nums(
+                list({pending.values['exam_schedule_id'] for pending in batch}))
+
+            results = {}
+            accepted = []
+            for pending in batch:
+                if pending.key in existing_keys:
+                    results[id(pending)] = BookResult.DUPLICATE
+                elif confirmed_nums.get(pending.values['exam_schedule_id'], 0) >= pending.capacity:
+                    results[id(pending)] = BookResult.FULL
+                else:
+                    # 같은 batch 안의 중복 예약은 먼저 들어온 것만 저장합니다
+                    existing_keys.add(pending.key)
+                    accepted.append(pending)
+                    results[id(pending)] = BookResult.BOOKED
+
+            return results, repository.create_many([pending.values for pending in accepted])
+        finally:
+            session.close()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stopped = self._collect(batch)
+            self.write_batch(batch)
+
+            if stopped:
+                return
+
+    def _collect(self, batch: List[_PendingReservation]) -> bool:
+        """
+        첫 예약이 들어온 뒤 `window_ms` 동안, 최대 `max_batch_size`개까지 예약을 모읍니다.
+        종료 요청을 받았다면 True를 반환합니다.
+        """
+        deadline = time.monotonic() + self.window_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                pending = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if pending is None:
+                return True
+            batch.append(pending)
+
+        return False
+
+
+reservation_batch_writer = ReservationBatchWriter()
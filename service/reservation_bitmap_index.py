@@ -0,0 +1,174 @@
+"""
+시험 일정마다 예약한 유저 id를 roaring bitmap으로 프로세스 메모리에 저장해,
+"유저가 이 시험을 이미 예약했는지"와 "유저가 예약할 수 있는 시험 일정"을 DB 조회 없이 확인합니다.
+서버 시작 시 `reservations` 테이블로 만들고, 예약 생성/삭제 시 갱신합니다.
+시작 이후 만들어진 시험 일정처럼 아직 bitmap이 없는 시험 일정은 처음 조회될 때 DB에서 읽어 만듭니다.
+다른 worker의 예약 변경은 invalidation bus로만 반영되므로, `CACHE_INVALIDATION_ENABLED`가 꺼져 있다면 bitmap을 사용하지 않습니다.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from cache.invalidation_bus import invalidation_bus, InvalidationEvent, RESERVATION, RESET, CREATED, DELETED
+from cache.roaring_bitmap import RoaringBitmap
+from db.database import SessionLocal
+from repository.reservation_repository import ReservationRepository
+
+load_dotenv()
+
+RESERVATION_BITMAP_ENABLED = os.environ.get('RESERVATION_BITMAP_ENABLED', 'false').lower() == 'true'
+
+
+class ReservationBitmapIndex:
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal,
+                 enabled: bool = RESERVATION_BITMAP_ENABLED):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self._bitmaps: Dict[int, RoaringBitmap] = {}
+        # DB에서 bitmap을 만드는 동안 생성/삭제된 예약. 읽은 DB 상태에 반영되지 않았을 수 있으므로 만든 뒤 다시 적용합니다
+        self._recorders: List[List[Tuple[int, int, bool]]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """
+        bitmap으로 예약 여부를 확인할 수 있는지 반환합니다.
+        invalidation bus가 꺼져 있다면 다른 worker에서 생성/삭제된 예약을 알 수 없으므로 DB에서 확인해야 합니다.
+        """
+        return self.enabled and invalidation_bus.enabled
+
+    def start(self):
+        """
+        모든 시험 일정의 bitmap을 한 번에 만듭니다.
+        """
+        if not self.active:
+            return
+
+        session = self.session_factory()
+        try:
+            self._load(lambda: ReservationRepository(session).iter_keys())
+        finally:
+            session.close()
+
+    def contains(self, session: Session, exam_schedule_id: int, user_id: int) -> bool:
+        bitmap = self._ensure_loaded(session, [exam_schedule_id])[exam_schedule_id]
+        with self._lock:
+            return user_id in bitmap
+
+    def filter_unreserved(self, session: Session, exam_schedule_ids: List[int], user_id: int) -> List[int]:
+        """
+        시험 일정 중 유저가 예약하지 않은 것들을 반환합니다.
+        """
+        bitmaps = self._ensure_loaded(session, exam_schedule_ids)
+        with self._lock:
+            return [exam_schedule_id for exam_schedule_id in exam_schedule_ids
+                    if user_id not in bitmaps[exam_schedule_id]]
+
+    def add(self, exam_schedule_id: int, user_id: int):
+        self._apply(exam_schedule_id, user_id, True)
+
+    def discard(self, exam_schedule_id: int, user_id: int):
+        self._apply(exam_schedule_id, user_id, False)
+
+    def invalidate(self, exam_schedule_id: int):
+        """
+        시험 일정의 bitmap을 지웁니다. 다음 조회 때 DB에서 다시 만듭니다.
+        """
+        with self._lock:
+            self._bitmaps.pop(exam_schedule_id, None)
+
+    def reset(self):
+        with self._lock:
+            self._bitmaps.clear()
+
+    def handle_invalidation(self, invalidation_event: InvalidationEvent):
+        """
+        다른 worker가 유저 한 명의 예약을 생성/삭제했다면 bitmap에 반영합니다.
+        어떤 유저의 예약이 변경되었는지 알 수 없는 경우에만 해당 시험 일정의 bitmap을 지웁니다.
+        """
+        if invalidation_event.kind == RESET:
+            self.reset()
+        elif invalidation_event.kind != RESERVATION or invalidation_event.exam_schedule_id is None:
+            return
+        elif invalidation_event.user_id is None:
+            self.invalidate(invalidation_event.exam_schedule_id)
+        elif invalidation_event.operation == CREATED:
+            self.add(invalidation_event.exam_schedule_id, invalidation_event.user_id)
+        elif invalidation_event.operation == DELETED:
+            self.discard(invalidation_event.exam_schedule_id, invalidation_event.user_id)
+
+    def _apply(self, exam_schedule_id: int, user_id: int, added: bool):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            for recorder in self._recorders:
+                recorder.append((exam_schedule_id, user_id, added))
+
+            bitmap = self._bitmaps.get(exam_schedule_id)
+            if bitmap is not None:
+                _apply_to_bitmap(bitmap, user_id, added)
+
+    def _ensure_loaded(self, session: Session, exam_schedule_ids: Iterable[int]) -> Dict[int, RoaringBitmap]:
+        """
+        시험 일정들의 bitmap을 반환합니다. 반환한 뒤 다른 thread가 bitmap을 지우더라도(`invalidate`, `reset`) 반환한 bitmap으로 확인합니다.
+        """
+        with self._lock:
+            bitmaps = {exam_schedule_id: self._bitmaps.get(exam_schedule_id) for exam_schedule_id in exam_schedule_ids}
+        missing_ids = [exam_schedule_id for exam_schedule_id, bitmap in bitmaps.items() if bitmap is None]
+        if not missing_ids:
+            return bitmaps
+
+        repository = ReservationRepository(session)
+
+        def read_keys():
+            for exam_schedule_id in missing_ids:
+                for user_id in repository.get_user_ids_by_exam_schedule_id(exam_schedule_id):
+                    yield exam_schedule_id, user_id
+
+        bitmaps.update(self._load(read_keys, missing_ids))
+        return bitmaps
+
+    def _load(self, read_keys: Callable[[], Iterable[Tuple[int, int]]],
+              exam_schedule_ids: Iterable[int] = ()) -> Dict[int, RoaringBitmap]:
+        """
+        DB에서 읽은 예약으로 bitmap을 만들어 저장하고, 저장된 bitmap들을 반환합니다.
+        """
+        recorder: List[Tuple[int, int, bool]] = []
+        with self._lock:
+            self._recorders.append(recorder)
+
+        try:
+            user_ids: Dict[int, List[int]] = {exam_schedule_id: [] for exam_schedule_id in exam_schedule_ids}
+            for exam_schedule_id, user_id in read_keys():
+                user_ids.setdefault(exam_schedule_id, []).append(user_id)
+            bitmaps = {exam_schedule_id: RoaringBitmap(ids) for exam_schedule_id, ids in user_ids.items()}
+        except Exception:
+            with self._lock:
+                self._recorders.remove(recorder)
+            raise
+
+        with self._lock:
+            self._recorders.remove(recorder)
+            for exam_schedule_id, user_id, added in recorder:
+                bitmap = bitmaps.get(exam_schedule_id)
+                if bitmap is not None:
+                    _apply_to_bitmap(bitmap, user_id, added)
+
+            # 다른 thread가 먼저 만든 bitmap은 이후 변경이 모두 반영되어 있으므로 그대로 둡니다
+            return {exam_schedule_id: self._bitmaps.setdefault(exam_schedule_id, bitmap)
+                    for exam_schedule_id, bitmap in bitmaps.items()}
+
+
+def _apply_to_bitmap(bitmap: RoaringBitmap, user_id: int, added: bool):
+    if added:
+        bitmap.add(user_id)
+    else:
+        bitmap.discard(user_id)
+
+
+reservation_bitmap_index = ReservationBitmapIndex()
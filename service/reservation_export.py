@@ -0,0 +1,92 @@
+"""
+시험 일정의 예약 신청 전체를 CSV 또는 NDJSON으로 내보냅니다.
+DB에서 server-side cursor로 조금씩 읽어 바로 응답으로 보내므로, 예약 수와 상관없이 일정한 메모리를 사용합니다.
+종료되어 보관된 예약 신청도 함께 내보냅니다.
+"""
+
+import csv
+import io
+import json
+import os
+import zlib
+from typing import Callable, Iterator
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from repository.reservation_repository import ReservationRepository
+
+load_dotenv()
+
+# DB에서 한 번에 가져오는 row 수
+RESERVATION_EXPORT_BATCH_SIZE = int(os.environ.get('RESERVATION_EXPORT_BATCH_SIZE', 1000))
+
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+EXPORT_COLUMNS = ('reservation_id', 'user_id', 'login_id', 'comment', 'confirmed', 'archived')
+
+# 이 크기(문자 수)만큼 모아서 응답으로 보냅니다
+_CHUNK_SIZE = 64 * 1024
+# 스프레드시트가 수식으로 실행하는 값의 시작 문자
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_filename(exam_schedule_id: int, export_format: str, compress: bool) -> str:
+    return f"reservations_{exam_schedule_id}.{export_format}{'.gz' if compress else ''}"
+
+
+def escape_csv_formula(value: str) -> str:
+    """
+    유저가 입력한 값이 스프레드시트에서 수식으로 실행되지 않도록, 수식 시작 문자로 시작하면 앞에 `'`를 붙입니다.
+    """
+    return f"'{value}" if value.startswith(_FORMULA_PREFIXES) else value
+
+
+def stream_reservations(session_factory: Callable[[], Session], exam_schedule_id: int, export_format: str = 'csv',
+                        compress: bool = False, batch_size: int = RESERVATION_EXPORT_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    응답을 보내는 동안 사용할 session을 직접 열고, 모두 보낸 뒤 닫습니다.
+    `compress`면 gzip 파일 형식으로 압축합니다.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n') if export_format == 'csv' else None
+
+    def take_chunk() -> bytes:
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+
+    session = session_factory()
+    try:
+        repository = ReservationRepository(session)
+        for reservation_id, user_id, login_id, comment, confirmed, archived in \
+                repository.stream_by_exam_schedule_id(exam_schedule_id, batch_size):
+            if writer:
+                writer.writerow((reservation_id, user_id, escape_csv_formula(login_id), escape_csv_formula(comment),
+                                 confirmed, archived))
+            else:
+                buffer.write(json.dumps({
+                    'reservation_id': str(reservation_id), 'user_id': user_id, 'login_id': login_id,
+                    'comment': comment, 'confirmed': confirmed, 'archived': archived,
+                }, ensure_ascii=False))
+                buffer.write('\n')
+
+            if buffer.tell() >= _CHUNK_SIZE:
+                chunk = take_chunk()
+                if chunk:
+                    yield chunk
+    finally:
+        session.close()
+
+    chunk = take_chunk()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
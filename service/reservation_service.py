@@ -1,8 +1,14 @@
+import datetime
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from db.database import replica_router
 
 from repository.exam_schedule_repository import ExamScheduleRepository
+from repository.reservation_outbox_repository import ReservationOutboxRepository
 from repository.reservation_repository import ReservationRepository
 from starlette import status
 
@@ -10,12 +16,23 @@ from repository.user_repository import UserRepository
 from schemas.user import TokenPayload
 from schemas.base import MessageOutputBase
 from schemas.reservation import MakeEditReservationOutput, MakeEditReservationInput, ReservationBase, \
-    ConfirmReservationRequest
+    ConfirmReservationRequest, ReservationPageOutput, ReservationChangePageOutput
 from service.exam_schedule_service import MAX_RESERVATION_NUM
+from service.me_dashboard_version import me_dashboard_versions
+from service.reservation_batch_writer import reservation_batch_writer, ReservationBatchWriterStopped, \
+    RESERVATION_BATCH_RESULT_TIMEOUT_SECONDS
+from service.reservation_bitmap_index import reservation_bitmap_index
+from service.reservation_export import stream_reservations
+from service.slot_inventory import slot_inventory, BookResult
+from service.waiting_room import waiting_room
+from telemetry.tracing import trace_methods
+from util import as_utc
 
 
+@trace_methods
 class ReservationService:
     def __init__(self, session: Session):
+        self.session = session
         self.user_repository = UserRepository(session)
         self.reservation_repository = ReservationRepository(session)
         self.exam_schedule_repository = ExamScheduleRepository(session)
@@ -25,10 +42,32 @@ class ReservationService:
         if current_user['role'] != 'client':
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only clients can make reservations")
 
-        if not self.exam_schedule_repository.get_by_id(exam_schedule_id):
+        exam_schedule = self.exam_schedule_repository.get_cached_by_id(exam_schedule_id)
+        if not exam_schedule:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam schedule not found")
 
-        if self.reservation_repository.get_by_user_id(current_user['id']):
+        if as_utc(exam_schedule.start_time) <= datetime.datetime.now(datetime.UTC):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exam schedule has already started")
+
+        if slot_inventory.enabled:
+            created_reservation = self._book_from_slot_inventory(int(current_user['id']), exam_schedule_id,
+                                                                 new_reservation.comment)
+        elif reservation_batch_writer.enabled:
+            created_reservation = self._create_reservation_in_batch(int(current_user['id']), exam_schedule_id,
+                                                                    new_reservation.comment)
+        else:
+            created_reservation = self._create_reservation(current_user, exam_schedule_id, new_reservation.comment)
+
+        reservation_bitmap_index.add(exam_schedule_id, int(current_user['id']))
+        replica_router.mark_write(current_user['id'])
+        me_dashboard_versions.bump_user(current_user['id'])
+        waiting_room.complete(exam_schedule_id, int(current_user['id']))
+
+        return created_reservation
+
+    def _create_reservation(self, current_user: TokenPayload, exam_schedule_id: int,
+                            comment: str) -> MakeEditReservationOutput:
+        if self._is_reserved(exam_schedule_id, int(current_user['id'])):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail="User already has a reservation for this exam schedule")
 
@@ -39,10 +78,68 @@ class ReservationService:
         return self.reservation_repository.create(ReservationBase(
             user_id=current_user['id'],
             exam_schedule_id=exam_schedule_id,
-            comment=new_reservation.comment,
+            comment=comment,
             confirmed=False,
         ))
 
+    def _is_reserved(self, exam_schedule_id: int, user_id: int) -> bool:
+        if reservation_bitmap_index.active:
+            return reservation_bitmap_index.contains(self.session, exam_schedule_id, user_id)
+
+        return self.reservation_repository.exist_by_user_id_exam_id(exam_schedule_id=exam_schedule_id, user_id=user_id)
+
+    def _book_from_slot_inventory(self, user_id: int, exam_schedule_id: int,
+                                  comment: str) -> MakeEditReservationOutput:
+        """
+        중복 예약과 남은 슬롯을 메모리에서 먼저 확인해, 거절될 예약은 DB를 사용하지 않고 거절합니다.
+        통과한 예약은 batch writer로 저장하고, commit된 뒤에 응답합니다.
+        """
+        result = slot_inventory.try_book(self.session, exam_schedule_id, user_id, MAX_RESERVATION_NUM)
+        self._check_book_result(result, None)
+
+        booked = False
+        try:
+            result, created_reservation = self._submit_to_batch_writer(user_id, exam_schedule_id, comment)
+            # 다른 worker가 먼저 저장한 중복 예약이라면 메모리의 상태가 DB와 같으므로 그대로 둡니다
+            booked = result != BookResult.FULL
+        finally:
+            if not booked:
+                slot_inventory.release(exam_schedule_id, user_id, confirmed=False)
+
+        return self._check_book_result(result, created_reservation)
+
+    def _create_reservation_in_batch(self, user_id: int, exam_schedule_id: int,
+                                     comment: str) -> MakeEditReservationOutput:
+        """
+        동시에 들어온 다른 예약들과 함께 하나의 transaction으로 저장하고, 저장이 끝날 때까지 기다립니다.
+        """
+        return self._check_book_result(*self._submit_to_batch_writer(user_id, exam_schedule_id, comment))
+
+    def _submit_to_batch_writer(self, user_id: int, exam_schedule_id: int,
+                                comment: str) -> Tuple[BookResult, Optional[MakeEditReservationOutput]]:
+        # 시험 일정 조회로 시작된 transaction이 batch의 INSERT를 막지 않도록 먼저 종료합니다
+        self.session.commit()
+
+        future = reservation_batch_writer.submit(user_id, exam_schedule_id, comment, MAX_RESERVATION_NUM)
+        try:
+            return future.result(timeout=RESERVATION_BATCH_RESULT_TIMEOUT_SECONDS)
+        except (FutureTimeoutError, ReservationBatchWriterStopped):
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Reservation could not be saved in time. Please try again")
+
+    @staticmethod
+    def _check_book_result(result: BookResult,
+                           created_reservation: Optional[MakeEditReservationOutput]) -> MakeEditReservationOutput:
+        if result == BookResult.DUPLICATE:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="User already has a reservation for this exam schedule")
+
+        if result == BookResult.FULL:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Exam schedule has reached maximum reservations")
+
+        return created_reservation
+
     def get_my_reservation(self, current_user: TokenPayload) -> List[Optional[ReservationBase]]:
         if current_user['role'] != 'client':
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
@@ -57,7 +154,49 @@ class ReservationService:
         if not self.user_repository.exist_by_id(user_id):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"User with {user_id} not found")
 
-        return self.reservation_repository.get_by_user_id(user_id)
+        return self.reservation_repository.get_by_user_id(user_id, include_archive=True)
+
+    def get_schedule_reservation(self, current_user: TokenPayload, exam_schedule_id: int, confirmed: Optional[bool],
+                                 after: Optional[int], limit: int) -> ReservationPageOutput:
+        if current_user['role'] != 'admin':
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail="Only admins can view exam schedule reservations")
+
+        if not self.exam_schedule_repository.get_cached_by_id(exam_schedule_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam schedule not found")
+
+        # 다음 페이지 존재 여부를 알기 위해 하나를 더 조회합니다
+        reservations = self.reservation_repository.get_by_exam_schedule_id(exam_schedule_id, confirmed, after, limit + 1,
+                                                                           include_archive=True)
+        next_cursor = None
+        if len(reservations) > limit:
+            reservations = reservations[:limit]
+            next_cursor = reservations[-1].user_id
+
+        return ReservationPageOutput(reservations=reservations, next_cursor=next_cursor)
+
+    def export_schedule_reservation(self, current_user: TokenPayload, exam_schedule_id: int,
+                                    session_factory: Callable[[], Session], export_format: str,
+                                    compress: bool) -> Iterator[bytes]:
+        """
+        권한과 시험 일정을 먼저 확인하고, 예약 신청을 내보내는 iterator를 반환합니다.
+        """
+        if current_user['role'] != 'admin':
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail="Only admins can export exam schedule reservations")
+
+        if not self.exam_schedule_repository.get_cached_by_id(exam_schedule_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exam schedule not found")
+
+        return stream_reservations(session_factory, exam_schedule_id, export_format, compress)
+
+    def get_changes(self, current_user: TokenPayload, after: Optional[int], limit: int) -> ReservationChangePageOutput:
+        if current_user['role'] != 'admin':
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail="Only admins can view reservation changes")
+
+        changes = ReservationOutboxRepository(self.session).get_changes(after, limit)
+        return ReservationChangePageOutput(changes=changes, next_cursor=changes[-1].position if changes else after)
 
     def confirm_reservation(self, current_user: TokenPayload,
                             confirm_reservation_request: ConfirmReservationRequest) -> MessageOutputBase:
@@ -75,6 +214,9 @@ class ReservationService:
 
         self.reservation_repository.update(reservation,
                                            MakeEditReservationInput(comment=reservation.comment, confirmed=True))
+        slot_inventory.confirm(reservation.exam_schedule_id)
+        me_dashboard_versions.bump_exam_schedules()
+        self._mark_write(current_user, reservation.user_id)
 
         return MessageOutputBase(message="Reservation confirmed successfully")
 
@@ -92,6 +234,7 @@ class ReservationService:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot edit other users' reservations")
 
         self.reservation_repository.update(reservation, MakeEditReservationInput(comment=comment))
+        self._mark_write(current_user, reservation.user_id)
 
         return MessageOutputBase(message="Reservation comment updated successfully")
 
@@ -108,6 +251,20 @@ class ReservationService:
             if reservation.confirmed:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot delete confirmed reservation")
 
+        reservation_user_id, exam_schedule_id = reservation.user_id, reservation.exam_schedule_id
         self.reservation_repository.delete(reservation)
+        slot_inventory.release(exam_schedule_id, reservation_user_id, confirmed=False)
+        reservation_bitmap_index.discard(exam_schedule_id, reservation_user_id)
+        self._mark_write(current_user, reservation_user_id)
+
+        return MessageOutputBase(message="Reservation deleted successfully")
 
-        return MessageOutputBase(message="Reservation deleted successfully")
\ No newline at end of file
+    @staticmethod
+    def _mark_write(current_user: TokenPayload, reservation_user_id: int):
+        """
+        예약을 변경한 유저와 예약의 주인이 이후 읽기 요청에서 변경된 내용을 바로 볼 수 있도록 primary DB를 사용하게 하고,
+        예약의 주인이 대시보드를 다시 조회하게 합니다.
+        """
+        replica_router.mark_write(current_user['id'])
+        replica_router.mark_write(reservation_user_id)
+        me_dashboard_versions.bump_user(reservation_user_id)
@@ -0,0 +1,233 @@
+"""
+예약 신청 시 남은 슬롯과 중복 예약 여부를 DB보다 먼저 프로세스 메모리에서 확인하는 slot inventory 입니다.
+거절될 예약은 DB를 사용하지 않고 바로 거절하고, 통과한 예약만 `ReservationBatchWriter`로 저장합니다.
+메모리 상태는 DB의 앞에 둔 filter일 뿐이므로, 최종 중복 예약/남은 슬롯 확인과 저장은 항상 DB에서 commit된 뒤에 응답합니다.
+메모리 상태는 시험 일정별로 처음 사용될 때 `reservations` 테이블에서 다시 만들기 때문에,
+프로세스가 재시작되어도 DB에 저장된 예약을 기준으로 복구됩니다.
+"""
+
+import abc
+import enum
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from cache.invalidation_bus import InvalidationEvent, RESERVATION, RESET, CREATED, CONFIRMED, DELETED
+from repository.reservation_repository import ReservationRepository
+
+load_dotenv()
+
+SLOT_INVENTORY_ENABLED = os.environ.get('SLOT_INVENTORY_ENABLED', 'false').lower() == 'true'
+
+
+class BookResult(enum.Enum):
+    BOOKED = 'booked'
+    DUPLICATE = 'duplicate'
+    FULL = 'full'
+
+
+class SlotInventoryBackend(abc.ABC):
+    """
+    시험 일정별 예약한 유저와 확정된 예약 수를 저장하는 저장소입니다.
+    여러 프로세스가 같은 inventory를 공유해야 한다면 redis 등을 사용하는 구현체를 `SlotInventory`에 전달합니다.
+    """
+
+    @abc.abstractmethod
+    def is_loaded(self, exam_schedule_id: int) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def load(self, exam_schedule_id: int, user_ids: List[int], confirmed_num: int):
+        """
+        DB에서 읽은 상태로 시험 일정의 inventory를 만듭니다. 이미 만들어져 있다면 아무것도 하지 않습니다.
+        """
+
+    @abc.abstractmethod
+    def try_book(self, exam_schedule_id: int, user_id: int, capacity: int) -> Optional[BookResult]:
+        """
+        중복 예약과 남은 슬롯을 확인하고, 예약할 수 있다면 예약한 유저로 추가합니다. 확인과 추가는 atomic 해야 합니다.
+        시험 일정의 inventory가 없다면(ex. 확인 전에 `unload`/`reset` 된 경우) None을 반환합니다.
+        """
+
+    @abc.abstractmethod
+    def add(self, exam_schedule_id: int, user_id: int):
+        """
+        다른 worker가 저장한 예약의 유저를 추가합니다. 남은 슬롯은 확인하지 않습니다.
+        """
+
+    @abc.abstractmethod
+    def confirm(self, exam_schedule_id: int):
+        ...
+
+    @abc.abstractmethod
+    def release(self, exam_schedule_id: int, user_id: int, confirmed: bool):
+        ...
+
+    @abc.abstractmethod
+    def unload(self, exam_schedule_id: int):
+        """
+        시험 일정의 inventory를 지웁니다. 다음 예약 때 DB에서 다시 만듭니다.
+        """
+
+    @abc.abstractmethod
+    def reset(self):
+        ...
+
+
+class _ScheduleSlots:
+    def __init__(self, user_ids: List[int], confirmed_num: int):
+        self.user_ids: Set[int] = set(user_ids)
+        self.confirmed_num = confirmed_num
+
+
+class InMemorySlotInventoryBackend(SlotInventoryBackend):
+    def __init__(self):
+        self._schedules: Dict[int, _ScheduleSlots] = {}
+        self._lock = threading.Lock()
+
+    def is_loaded(self, exam_schedule_id: int) -> bool:
+        return exam_schedule_id in self._schedules
+
+    def load(self, exam_schedule_id: int, user_ids: List[int], confirmed_num: int):
+        with self._lock:
+            self._schedules.setdefault(exam_schedule_id, _ScheduleSlots(user_ids, confirmed_num))
+
+    def try_book(self, exam_schedule_id: int, user_id: int, capacity: int) -> Optional[BookResult]:
+        with self._lock:
+            slots = self._schedules.get(exam_schedule_id)
+            if slots is None:
+                return None
+            if user_id in slots.user_ids:
+                return BookResult.DUPLICATE
+            if slots.confirmed_num >= capacity:
+                return BookResult.FULL
+
+            slots.user_ids.add(user_id)
+            return BookResult.BOOKED
+
+    def add(self, exam_schedule_id: int, user_id: int):
+        with self._lock:
+            slots = self._schedules.get(exam_schedule_id)
+            if slots is not None:
+                slots.user_ids.add(user_id)
+
+    def confirm(self, exam_schedule_id: int):
+        with self._lock:
+            slots = self._schedules.get(exam_schedule_id)
+            if slots is not None:
+                slots.confirmed_num += 1
+
+    def release(self, exam_schedule_id: int, user_id: int, confirmed: bool):
+        with self._lock:
+            slots = self._schedules.get(exam_schedule_id)
+            if slots is not None:
+                slots.user_ids.discard(user_id)
+                if confirmed:
+                    slots.confirmed_num -= 1
+
+    def unload(self, exam_schedule_id: int):
+        with self._lock:
+            self._schedules.pop(exam_schedule_id, None)
+
+    def reset(self):
+        with self._lock:
+            self._schedules.clear()
+
+
+class SlotInventory:
+    def __init__(self, backend: Optional[SlotInventoryBackend] = None, enabled: bool = SLOT_INVENTORY_ENABLED):
+        self.backend = backend or InMemorySlotInventoryBackend()
+        self.enabled = enabled
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        # DB에서 inventory를 만드는 동안 다른 worker가 추가/삭제한 유저. 읽은 DB 상태에 반영되지 않았을 수 있으므로 만든 뒤 다시 적용합니다
+        self._recorders: Dict[int, List[Tuple[int, bool]]] = {}
+
+    def try_book(self, session: Session, exam_schedule_id: int, user_id: int, capacity: int) -> BookResult:
+        """
+        메모리에서 예약 가능 여부를 확인하고, 예약할 수 있다면 예약한 유저로 추가합니다.
+        DB에 저장하지 못했다면 호출한 쪽에서 `release`로 되돌립니다.
+        """
+        while True:
+            self._ensure_loaded(session, exam_schedule_id)
+            result = self.backend.try_book(exam_schedule_id, user_id, capacity)
+            # 불러온 뒤 확인하기 전에 다른 worker의 event로 inventory가 지워졌다면 다시 불러옵니다
+            if result is not None:
+                return result
+
+    def confirm(self, exam_schedule_id: int):
+        if self.backend.is_loaded(exam_schedule_id):
+            self.backend.confirm(exam_schedule_id)
+
+    def release(self, exam_schedule_id: int, user_id: int, confirmed: bool):
+        if confirmed:
+            if self.backend.is_loaded(exam_schedule_id):
+                self.backend.release(exam_schedule_id, user_id, confirmed)
+        else:
+            self._apply(exam_schedule_id, user_id, False)
+
+    def reset(self):
+        self.backend.reset()
+
+    def handle_invalidation(self, invalidation_event: InvalidationEvent):
+        """
+        다른 worker가 유저 한 명의 예약을 변경했다면 inventory에 반영합니다.
+        어떤 유저의 예약이 변경되었는지 알 수 없는 경우에만 DB에서 다시 만들도록 시험 일정의 inventory를 지웁니다.
+        """
+        exam_schedule_id, user_id = invalidation_event.exam_schedule_id, invalidation_event.user_id
+        if invalidation_event.kind == RESET:
+            self.backend.reset()
+        elif invalidation_event.kind != RESERVATION or exam_schedule_id is None:
+            return
+        elif user_id is None:
+            self.backend.unload(exam_schedule_id)
+        elif invalidation_event.operation == CREATED:
+            self._apply(exam_schedule_id, user_id, True)
+        elif invalidation_event.operation == DELETED:
+            self._apply(exam_schedule_id, user_id, False)
+        elif invalidation_event.operation == CONFIRMED:
+            self.confirm(exam_schedule_id)
+
+    def _apply(self, exam_schedule_id: int, user_id: int, added: bool):
+        with self._lock:
+            recorder = self._recorders.get(exam_schedule_id)
+            if recorder is not None:
+                recorder.append((user_id, added))
+
+            self._apply_to_backend(exam_schedule_id, user_id, added)
+
+    def _ensure_loaded(self, session: Session, exam_schedule_id: int):
+        if self.backend.is_loaded(exam_schedule_id):
+            return
+
+        with self._load_lock:
+            if self.backend.is_loaded(exam_schedule_id):
+                return
+
+            recorder: List[Tuple[int, bool]] = []
+            with self._lock:
+                self._recorders[exam_schedule_id] = recorder
+            try:
+                user_ids, confirmed_num = ReservationRepository(session).get_slot_state(exam_schedule_id)
+            except Exception:
+                with self._lock:
+                    self._recorders.pop(exam_schedule_id)
+                raise
+
+            with self._lock:
+                self._recorders.pop(exam_schedule_id)
+                self.backend.load(exam_schedule_id, user_ids, confirmed_num)
+                for user_id, added in recorder:
+                    self._apply_to_backend(exam_schedule_id, user_id, added)
+
+    def _apply_to_backend(self, exam_schedule_id: int, user_id: int, added: bool):
+        if added:
+            self.backend.add(exam_schedule_id, user_id)
+        else:
+            self.backend.release(exam_schedule_id, user_id, confirmed=False)
+
+
+slot_inventory = SlotInventory()
@@ -8,6 +8,7 @@ from typing import List, Optional, Type
 from repository.user_repository import UserRepository
 from starlette import status
 
+from telemetry.tracing import trace_methods
 from util import encode_jwt
 
 
@@ -24,6 +25,7 @@ def _encrypt_password(password):
     return encrypted_password
 
 
+@trace_methods
 class UserService:
     def __init__(self, session: Session):
         self.repository = UserRepository(session)
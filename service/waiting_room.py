@@ -0,0 +1,184 @@
+"""
+인기 있는 시험의 예약이 열릴 때 예약 요청이 한꺼번에 DB로 몰리지 않도록 하는 대기열입니다.
+유저는 대기표를 받고, 대기표 순서대로 초당 일정한 수의 유저만 예약 API를 사용할 수 있습니다.
+대기열은 프로세스 메모리에 저장되므로 DB를 사용하지 않습니다.
+
+대기열을 프로세스끼리 공유하지 않으므로, 대기열을 켜면 하나의 프로세스(uvicorn worker)로만 실행해야 합니다.
+postgres를 사용한다면 시작할 때 advisory lock을 잡아, 다른 프로세스가 이미 대기열을 사용 중이면 시작하지 않습니다.
+대기 상태를 `WAITING_ROOM_TICKET_TTL_SECONDS` 동안 조회하지 않은 대기표와, 대기표가 모두 없어진 대기열은 삭제됩니다.
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import Engine
+
+from schemas.waiting_room import WaitingRoomStatus
+
+load_dotenv()
+
+WAITING_ROOM_ENABLED = os.environ.get('WAITING_ROOM_ENABLED', 'false').lower() == 'true'
+# 초당 예약 API를 사용할 수 있게 되는 유저 수
+WAITING_ROOM_ADMIT_PER_SECOND = float(os.environ.get('WAITING_ROOM_ADMIT_PER_SECOND', 100))
+# 대기 없이 바로 입장할 수 있는 유저 수. 요청이 없는 동안에는 이 수 이상 입장 가능 인원이 쌓이지 않습니다
+WAITING_ROOM_BURST = int(os.environ.get('WAITING_ROOM_BURST', 100))
+# 대기 상태를 조회하지 않은 대기표가 유지되는 시간(초)
+WAITING_ROOM_TICKET_TTL_SECONDS = float(os.environ.get('WAITING_ROOM_TICKET_TTL_SECONDS', 600))
+
+# 대기열을 사용하는 프로세스가 하나뿐인지 확인하는 postgres advisory lock의 key
+_SINGLE_PROCESS_LOCK_KEY = 4406
+# 만료된 대기표를 정리하는 주기(초)
+_PRUNE_INTERVAL_SECONDS = 10
+
+
+class _WaitingQueue:
+    def __init__(self, burst: int, now: float):
+        self.issued = 0
+        self.admitted = float(burst)
+        self.updated_at = now
+        # user id -> 대기표 번호
+        self.tickets: Dict[int, int] = {}
+        # user id -> 마지막으로 대기표를 발급받거나 대기 상태를 조회한 시각
+        self.seen_at: Dict[int, float] = {}
+
+
+class WaitingRoom:
+    def __init__(self, admit_per_second: float = WAITING_ROOM_ADMIT_PER_SECOND, burst: int = WAITING_ROOM_BURST,
+                 enabled: bool = WAITING_ROOM_ENABLED, ticket_ttl: float = WAITING_ROOM_TICKET_TTL_SECONDS,
+                 timer: Callable[[], float] = time.monotonic):
+        self.admit_per_second = admit_per_second
+        self.burst = burst
+        self.enabled = enabled
+        self.ticket_ttl = ticket_ttl
+        self.timer = timer
+        self._queues: Dict[int, _WaitingQueue] = {}
+        self._lock = threading.Lock()
+        self._pruned_at = timer()
+        self._lock_connection = None
+
+    def start(self, bind: Engine):
+        """
+        postgres라면 프로세스가 종료될 때까지 advisory lock을 잡습니다.
+        다른 프로세스가 이미 대기열을 사용 중이라면 `RuntimeError`를 발생시킵니다.
+        """
+        if not self.enabled or self._lock_connection is not None or bind.dialect.name != 'postgresql':
+            return
+
+        connection = bind.raw_connection()
+        # lock을 잡은 연결은 pool에 돌려주지 않습니다
+        connection.detach()
+        try:
+            connection.driver_connection.autocommit = True
+            with connection.driver_connection.cursor() as cursor:
+                cursor.execute(f'SELECT pg_try_advisory_lock({_SINGLE_PROCESS_LOCK_KEY})')
+                locked = cursor.fetchone()[0]
+        except Exception:
+            connection.close()
+            raise
+
+        if not locked:
+            connection.close()
+            raise RuntimeError('waiting room is already used by another process. '
+                               'run a single worker when WAITING_ROOM_ENABLED is true')
+        self._lock_connection = connection
+
+    def stop(self):
+        if self._lock_connection is not None:
+            self._lock_connection.close()
+            self._lock_connection = None
+
+    def issue_ticket(self, exam_schedule_id: int, user_id: int) -> WaitingRoomStatus:
+        """
+        유저에게 대기표를 발급합니다. 이미 대기표가 있다면 기존 대기표의 상태를 반환합니다.
+        """
+        with self._lock:
+            self._prune()
+            queue = self._get_queue(exam_schedule_id)
+            ticket = queue.tickets.get(user_id)
+            if ticket is None:
+                queue.issued += 1
+                ticket = queue.issued
+                queue.tickets[user_id] = ticket
+            queue.seen_at[user_id] = self.timer()
+
+            return self._to_status(exam_schedule_id, queue, ticket)
+
+    def get_status(self, exam_schedule_id: int, user_id: int) -> Optional[WaitingRoomStatus]:
+        with self._lock:
+            queue = self._queues.get(exam_schedule_id)
+            if queue is None or user_id not in queue.tickets:
+                return None
+
+            self._advance(queue)
+            queue.seen_at[user_id] = queue.updated_at
+            return self._to_status(exam_schedule_id, queue, queue.tickets[user_id])
+
+    def is_admitted(self, exam_schedule_id: int, user_id: int) -> bool:
+        status = self.get_status(exam_schedule_id, user_id)
+        return status is not None and status.admitted
+
+    def complete(self, exam_schedule_id: int, user_id: int):
+        """
+        예약을 마친 유저의 대기표를 삭제합니다.
+        """
+        with self._lock:
+            queue = self._queues.get(exam_schedule_id)
+            if queue is not None:
+                queue.tickets.pop(user_id, None)
+                queue.seen_at.pop(user_id, None)
+
+    def reset(self):
+        with self._lock:
+            self._queues.clear()
+
+    def _prune(self):
+        """
+        `ticket_ttl` 동안 조회되지 않은 대기표와, 대기표가 없고 `ticket_ttl` 동안 사용되지 않은 대기열을 삭제합니다.
+        """
+        now = self.timer()
+        if now - self._pruned_at < _PRUNE_INTERVAL_SECONDS:
+            return
+
+        self._pruned_at = now
+        expires_before = now - self.ticket_ttl
+        for exam_schedule_id, queue in list(self._queues.items()):
+            for user_id in [user_id for user_id, seen_at in queue.seen_at.items() if seen_at <= expires_before]:
+                del queue.tickets[user_id]
+                del queue.seen_at[user_id]
+
+            if not queue.tickets and queue.updated_at <= expires_before:
+                del self._queues[exam_schedule_id]
+
+    def _get_queue(self, exam_schedule_id: int) -> _WaitingQueue:
+        queue = self._queues.get(exam_schedule_id)
+        if queue is None:
+            queue = _WaitingQueue(self.burst, self.timer())
+            self._queues[exam_schedule_id] = queue
+
+        self._advance(queue)
+        return queue
+
+    def _advance(self, queue: _WaitingQueue):
+        now = self.timer()
+        queue.admitted = min(queue.admitted + (now - queue.updated_at) * self.admit_per_second,
+                             queue.issued + self.burst)
+        queue.updated_at = now
+
+    def _to_status(self, exam_schedule_id: int, queue: _WaitingQueue, ticket: int) -> WaitingRoomStatus:
+        admitted_until = math.floor(queue.admitted)
+        position = max(0, ticket - admitted_until)
+
+        return WaitingRoomStatus(
+            exam_schedule_id=exam_schedule_id,
+            ticket=ticket,
+            admitted=position == 0,
+            position=position,
+            estimated_wait_seconds=math.ceil((ticket - queue.admitted) / self.admit_per_second) if position else 0
+        )
+
+
+waiting_room = WaitingRoom()
@@ -0,0 +1,203 @@
+"""
+요청 처리 중인 thread의 stack을 주기적으로 수집하는 sampling profiler 입니다.
+결과는 speedscope(https://www.speedscope.app) 형식의 JSON 파일로 저장되어 flame graph로 볼 수 있습니다.
+
+- 요청 단위: 어드민이 `X-Profile: true` 헤더 또는 `profile=true` query parameter와 함께 요청하면,
+  해당 요청을 처리하는 thread만 수집하고 응답의 `X-Profile-Path` 헤더로 저장된 파일 경로를 알려줍니다
+- 주기적 수집: `PROFILER_PERIODIC_ENABLED`가 true면 `PROFILER_PERIODIC_INTERVAL_SECONDS`마다
+  `PROFILER_PERIODIC_DURATION_SECONDS` 동안 모든 thread를 낮은 빈도로 수집합니다
+"""
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+PROFILER_DIR = os.environ.get('PROFILER_DIR', 'profiles')
+# 요청 단위 profiling의 stack 수집 간격(초)
+PROFILER_INTERVAL_SECONDS = float(os.environ.get('PROFILER_INTERVAL_SECONDS', 0.001))
+PROFILER_PERIODIC_ENABLED = os.environ.get('PROFILER_PERIODIC_ENABLED', 'false').lower() == 'true'
+PROFILER_PERIODIC_INTERVAL_SECONDS = float(os.environ.get('PROFILER_PERIODIC_INTERVAL_SECONDS', 600))
+PROFILER_PERIODIC_DURATION_SECONDS = float(os.environ.get('PROFILER_PERIODIC_DURATION_SECONDS', 10))
+PROFILER_PERIODIC_SAMPLE_INTERVAL_SECONDS = float(os.environ.get('PROFILER_PERIODIC_SAMPLE_INTERVAL_SECONDS', 0.01))
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_QUERY_PARAMETER = 'profile'
+PROFILE_PATH_HEADER = 'X-Profile-Path'
+
+# (함수 이름, 파일, 함수가 시작하는 줄)
+Frame = Tuple[str, str, int]
+
+
+class Profile:
+    """
+    하나의 profiling 구간에서 수집한 stack들입니다. `thread_ids`가 None이면 모든 thread를 수집합니다.
+    """
+
+    def __init__(self, name: str, interval: float, thread_ids: Optional[Set[int]] = None):
+        self.name = name
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.samples: List[Tuple[Frame, ...]] = []
+        self.started_at = time.perf_counter()
+        self.ended_at: Optional[float] = None
+        self._next_sample_at = self.started_at
+        self._lock = threading.Lock()
+
+    def add_thread(self, thread_id: int):
+        with self._lock:
+            self.thread_ids.add(thread_id)
+
+    def remove_thread(self, thread_id: int):
+        with self._lock:
+            self.thread_ids.discard(thread_id)
+
+    def sample(self, frames: Dict[int, object], now: float, sampler_thread_id: int):
+        if now < self._next_sample_at:
+            return
+        self._next_sample_at = now + self.interval
+
+        with self._lock:
+            thread_ids = list(frames) if self.thread_ids is None else list(self.thread_ids)
+
+        for thread_id in thread_ids:
+            frame = frames.get(thread_id)
+            if frame is not None and thread_id != sampler_thread_id:
+                self.samples.append(_extract_stack(frame))
+
+    def to_speedscope(self) -> dict:
+        frame_indexes: Dict[Frame, int] = {}
+        samples = []
+        for stack in self.samples:
+            samples.append([frame_indexes.setdefault(frame, len(frame_indexes)) for frame in stack])
+
+        duration = (self.ended_at or time.perf_counter()) - self.started_at
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.name,
+            'exporter': 'grepp_be_assignment',
+            'activeProfileIndex': 0,
+            'shared': {
+                'frames': [{'name': name, 'file': file, 'line': line} for name, file, line in frame_indexes]
+            },
+            'profiles': [{
+                'type': 'sampled',
+                'name': self.name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': duration,
+                'samples': samples,
+                'weights': [self.interval] * len(samples),
+            }],
+        }
+
+    def save(self, directory: Optional[str] = None) -> str:
+        directory = directory or PROFILER_DIR
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.datetime.now(datetime.UTC).strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(directory, f"{timestamp}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', self.name)}.speedscope.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_speedscope(), f)
+        return path
+
+
+def _extract_stack(frame) -> Tuple[Frame, ...]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    # speedscope는 root부터 leaf 순서의 stack을 사용합니다
+    stack.reverse()
+    return tuple(stack)
+
+
+class StackSampler:
+    """
+    진행 중인 profile이 있는 동안에만 실행되는 thread에서 `sys._current_frames()`로 stack을 수집합니다.
+    """
+
+    def __init__(self):
+        self._profiles: Set[Profile] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, profile: Profile):
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+
+    def stop(self, profile: Profile):
+        with self._lock:
+            self._profiles.discard(profile)
+        profile.ended_at = time.perf_counter()
+
+    def _run(self):
+        sampler_thread_id = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._profiles:
+                    self._thread = None
+                    return
+                profiles = list(self._profiles)
+                interval = min(profile.interval for profile in profiles)
+
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            for profile in profiles:
+                profile.sample(frames, now, sampler_thread_id)
+            del frames
+
+            time.sleep(interval)
+
+
+stack_sampler = StackSampler()
+
+# 현재 요청의 profile. `InstrumentedRoute`가 요청을 처리하는 thread를 등록할 때 사용합니다
+current_profile: ContextVar[Optional[Profile]] = ContextVar('current_profile', default=None)
+
+
+def profile_requested(headers, query_params) -> bool:
+    return headers.get(PROFILE_HEADER, '').lower() == 'true' \
+        or query_params.get(PROFILE_QUERY_PARAMETER, '').lower() == 'true'
+
+
+def profile_all_threads(duration: float = PROFILER_PERIODIC_DURATION_SECONDS,
+                        interval: float = PROFILER_PERIODIC_SAMPLE_INTERVAL_SECONDS,
+                        directory: Optional[str] = None) -> str:
+    """
+    `duration` 동안 모든 thread의 stack을 수집해 저장하고, 저장한 파일 경로를 반환합니다.
+    """
+    profile = Profile('periodic', interval)
+    stack_sampler.start(profile)
+    try:
+        time.sleep(duration)
+    finally:
+        stack_sampler.stop(profile)
+
+    return profile.save(directory)
+
+
+async def run_profiler_periodically(interval: float = PROFILER_PERIODIC_INTERVAL_SECONDS):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            path = await asyncio.to_thread(profile_all_threads)
+            logger.info('saved periodic profile to %s', path)
+        except Exception:
+            logger.exception('failed to profile')
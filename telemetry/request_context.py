@@ -0,0 +1,10 @@
+"""
+현재 처리 중인 API 요청의 정보를 담는 context variable 입니다.
+`InstrumentedRoute`가 요청마다 설정하며, threadpool에서 실행되는 sync endpoint에도 전달됩니다.
+"""
+
+from contextvars import ContextVar
+from typing import Optional
+
+# ex) `POST /api/v1/reservation/make_reservation/{exam_schedule_id}`
+current_route: ContextVar[Optional[str]] = ContextVar('current_route', default=None)
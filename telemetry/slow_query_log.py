@@ -0,0 +1,221 @@
+"""
+실행 시간이 기준을 넘은 쿼리를 JSONL 파일에 기록하는 slow query log 입니다.
+쿼리와 parameter, 쿼리를 실행한 API, 실행 계획을 함께 기록합니다.
+실행 계획은 요청 처리가 늦어지지 않도록 별도의 thread에서 별도의 connection으로 조회합니다.
+
+- postgres: 읽기 전용 SELECT는 `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)`로 실제 실행 결과를 함께 조회합니다.
+  쿼리가 실제로 실행되므로 항상 rollback 되는 읽기 전용 transaction 안에서 실행합니다.
+  INSERT/UPDATE/DELETE, `FOR UPDATE`, `pg_notify` 등 lock을 잡거나 부수 효과가 있는 쿼리는 실행하지 않고 `EXPLAIN (FORMAT JSON)`만 조회합니다
+- sqlite: `EXPLAIN QUERY PLAN`
+
+같은 쿼리는 `SLOW_QUERY_EXPLAIN_DEDUPE_SECONDS` 동안 한 번만 실행 계획을 조회하고,
+조회 대기열이 `SLOW_QUERY_EXPLAIN_QUEUE_SIZE`만큼 차 있으면 실행 계획 없이 기록해 DB에 부하를 더하지 않습니다.
+"""
+
+import datetime
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from cache.ttl_cache import TTLCache
+from telemetry.request_context import current_route
+
+load_dotenv()
+
+SLOW_QUERY_LOG_ENABLED = os.environ.get('SLOW_QUERY_LOG_ENABLED', 'false').lower() == 'true'
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+SLOW_QUERY_LOG_PATH = os.environ.get('SLOW_QUERY_LOG_PATH', 'slow_queries.jsonl')
+# 파일이 이 크기(byte)를 넘으면 `.1`, `.2` ... 로 옮기고 새 파일에 기록합니다
+SLOW_QUERY_LOG_MAX_BYTES = int(os.environ.get('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024))
+SLOW_QUERY_LOG_BACKUP_COUNT = int(os.environ.get('SLOW_QUERY_LOG_BACKUP_COUNT', 5))
+SLOW_QUERY_EXPLAIN = os.environ.get('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true'
+# 실행 계획을 조회하는 쿼리의 최대 실행 시간(ms)
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.environ.get('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 5000))
+# 같은 쿼리의 실행 계획을 다시 조회하지 않는 시간(초)
+SLOW_QUERY_EXPLAIN_DEDUPE_SECONDS = float(os.environ.get('SLOW_QUERY_EXPLAIN_DEDUPE_SECONDS', 60))
+# 실행 계획 조회를 기다리는 쿼리의 최대 수
+SLOW_QUERY_EXPLAIN_QUEUE_SIZE = int(os.environ.get('SLOW_QUERY_EXPLAIN_QUEUE_SIZE', 100))
+
+# 실행 계획 조회 쿼리가 다시 기록되지 않도록 표시하는 execution option
+_SKIP_OPTION = 'slow_query_log_skip'
+_MAX_PARAMETER_LENGTH = 200
+_MAX_DEDUPE_KEYS = 10000
+# 실행해도 DB 상태를 바꾸거나 lock을 잡지 않는 쿼리만 EXPLAIN ANALYZE로 실행합니다
+_SELECT_PATTERN = re.compile(r'^\s*SELECT\b', re.IGNORECASE)
+_SIDE_EFFECT_PATTERN = re.compile(r'\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)\b'
+                                  r'|\bpg_notify\b|\bpg_\w*advisory\w*\b|\bnextval\b|\bsetval\b', re.IGNORECASE)
+
+
+class SlowQueryLog:
+    def __init__(self, path: str = SLOW_QUERY_LOG_PATH, threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+                 explain: bool = SLOW_QUERY_EXPLAIN, max_bytes: int = SLOW_QUERY_LOG_MAX_BYTES,
+                 backup_count: int = SLOW_QUERY_LOG_BACKUP_COUNT,
+                 dedupe_seconds: float = SLOW_QUERY_EXPLAIN_DEDUPE_SECONDS,
+                 queue_size: int = SLOW_QUERY_EXPLAIN_QUEUE_SIZE):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self._handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8',
+                                            delay=True)
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+        self._logger = logging.Logger(f'slow_query_log.{path}')
+        self._logger.addHandler(self._handler)
+        # 최근에 실행 계획을 조회한 쿼리
+        self._explained = TTLCache(maxsize=_MAX_DEDUPE_KEYS, ttl=dedupe_seconds)
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._explainer = threading.Thread(target=self._run, name='slow-query-explain', daemon=True)
+        self._explainer.start()
+        self._closed = False
+
+    def instrument(self, engine: Engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('slow_query_started_at', []).append(time.perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def record_slow_query(conn, cursor, statement, parameters, context, executemany):
+            started_at = conn.info['slow_query_started_at'].pop()
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            if self._closed or duration_ms < self.threshold_ms or context.execution_options.get(_SKIP_OPTION):
+                return
+
+            record = {
+                'timestamp': datetime.datetime.now(datetime.UTC).isoformat(),
+                'duration_ms': round(duration_ms, 3),
+                'route': current_route.get(),
+                'statement': statement,
+                'parameters': _safe_parameters(parameters),
+                'executemany': executemany,
+            }
+            if self.explain and not executemany:
+                self._submit_explain(engine, statement, parameters, record)
+            else:
+                self.write(record)
+
+        @event.listens_for(engine, 'handle_error')
+        def discard_timer(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get('slow_query_started_at'):
+                conn.info['slow_query_started_at'].pop()
+
+    def write(self, record: dict):
+        self._logger.info(json.dumps(record, ensure_ascii=False, default=str))
+
+    def flush(self):
+        """
+        조회 중인 실행 계획을 모두 기록할 때까지 기다립니다.
+        """
+        self._queue.join()
+        self._handler.flush()
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._explainer.join()
+        self._handler.close()
+
+    def _submit_explain(self, engine: Engine, statement: str, parameters: Any, record: dict):
+        dedupe_key = (id(engine), ' '.join(statement.split()))
+        if not self._explained.add(dedupe_key, True):
+            record['explain_skipped'] = 'explained recently'
+            self.write(record)
+            return
+
+        try:
+            self._queue.put_nowait((engine, statement, parameters, record))
+        except queue.Full:
+            # 다음에 같은 쿼리가 느릴 때 다시 조회할 수 있도록 합니다
+            self._explained.delete(dedupe_key)
+            record['explain_skipped'] = 'explain queue is full'
+            self.write(record)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._explain_and_write(*item)
+            finally:
+                self._queue.task_done()
+
+    def _explain_and_write(self, engine: Engine, statement: str, parameters: Any, record: dict):
+        try:
+            record['plan'] = _explain(engine, statement, parameters)
+        except Exception as e:
+            record['explain_error'] = str(e)
+        self.write(record)
+
+
+def _explain(engine: Engine, statement: str, parameters: Any) -> Optional[Any]:
+    dialect = engine.dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return None
+
+    with engine.connect().execution_options(**{_SKIP_OPTION: True}) as conn:
+        transaction = conn.begin()
+        try:
+            if dialect == 'postgresql':
+                conn.exec_driver_sql('SET TRANSACTION READ ONLY')
+                conn.exec_driver_sql(f'SET LOCAL statement_timeout = {SLOW_QUERY_EXPLAIN_TIMEOUT_MS}')
+                plan = None
+                if _is_read_only(statement):
+                    try:
+                        with conn.begin_nested():
+                            plan = conn.exec_driver_sql(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}',
+                                                        parameters).scalar()
+                    except DBAPIError:
+                        # 읽기 전용 transaction에서 실행할 수 없는 쿼리는 실행 계획만 조회합니다
+                        pass
+                if plan is None:
+                    plan = conn.exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters).scalar()
+                return json.loads(plan) if isinstance(plan, str) else plan
+
+            rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+            return [row[-1] for row in rows]
+        finally:
+            # ANALYZE는 쿼리를 실제로 실행하므로 결과가 남지 않도록 항상 rollback 합니다
+            transaction.rollback()
+
+
+def _is_read_only(statement: str) -> bool:
+    return bool(_SELECT_PATTERN.match(statement)) and not _SIDE_EFFECT_PATTERN.search(statement)
+
+
+def _safe_parameters(parameters: Any) -> Any:
+    """
+    긴 값(ex. 예약 comment)은 잘라서 기록합니다.
+    """
+    if isinstance(parameters, dict):
+        return {key: _safe_parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_safe_parameters(value) for value in parameters]
+    if isinstance(parameters, (str, bytes)) and len(parameters) > _MAX_PARAMETER_LENGTH:
+        return f'{parameters[:_MAX_PARAMETER_LENGTH]!s}...'
+    return parameters
+
+
+_slow_query_log: Optional[SlowQueryLog] = None
+
+
+def setup_slow_query_log(engines):
+    """
+    `SLOW_QUERY_LOG_ENABLED`라면 engine들의 느린 쿼리를 `SLOW_QUERY_LOG_PATH`에 기록합니다.
+    """
+    global _slow_query_log
+    if not SLOW_QUERY_LOG_ENABLED or _slow_query_log is not None:
+        return
+
+    _slow_query_log = SlowQueryLog()
+    for engine in engines:
+        _slow_query_log.instrument(engine)
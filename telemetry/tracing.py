@@ -0,0 +1,186 @@
+"""
+OpenTelemetry로 요청 처리 시간을 router, service, repository, SQL 단위의 span으로 기록합니다.
+`TRACING_ENABLED`가 true이고 opentelemetry 패키지가 설치되어 있을 때만 span을 기록합니다.
+span을 기록하지 않는 동안에는 tracer가 설정되었는지만 확인하므로 overhead가 거의 없습니다.
+
+- router: `InstrumentedRoute`를 `route_class`로 사용한 API
+- service/repository: `trace_methods`를 적용한 클래스의 public method
+- SQL: `instrument_engine`을 적용한 engine에서 실행된 쿼리
+"""
+
+import functools
+import inspect
+import os
+from typing import Callable, Iterable, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+except ImportError:
+    trace = None
+
+load_dotenv()
+
+TRACING_ENABLED = os.environ.get('TRACING_ENABLED', 'false').lower() == 'true' and trace is not None
+# otlp: OTEL_EXPORTER_OTLP_ENDPOINT의 collector로 전송 / file: TRACING_FILE_PATH에 한 줄에 span 하나씩 기록
+TRACING_EXPORTER = os.environ.get('TRACING_EXPORTER', 'otlp')
+TRACING_FILE_PATH = os.environ.get('TRACING_FILE_PATH', 'traces.jsonl')
+# 기록할 요청의 비율. 상위 span이 기록되는 요청은 하위 span도 모두 기록합니다
+TRACING_SAMPLE_RATIO = float(os.environ.get('TRACING_SAMPLE_RATIO', 0.01))
+# span에 기록하는 SQL의 최대 길이
+TRACING_MAX_STATEMENT_LENGTH = 2000
+
+TRACER_NAME = 'grepp_be_assignment'
+
+_tracer = None
+
+
+def get_tracer():
+    return _tracer
+
+
+def set_tracer_provider(tracer_provider: Optional['TracerProvider']):
+    """
+    span을 기록할 provider를 지정합니다. None이면 span을 기록하지 않습니다.
+    """
+    global _tracer
+    _tracer = tracer_provider.get_tracer(TRACER_NAME) if tracer_provider is not None else None
+
+
+def _create_exporter() -> 'SpanExporter':
+    if TRACING_EXPORTER == 'file':
+        out = open(TRACING_FILE_PATH, 'a', encoding='utf-8')
+        return ConsoleSpanExporter(out=out, formatter=lambda span: span.to_json(indent=None) + os.linesep)
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    return OTLPSpanExporter()
+
+
+def setup_tracing(engines: Iterable[Engine]):
+    """
+    `TRACING_ENABLED`라면 exporter와 sampler를 설정하고, engine들의 쿼리를 span으로 기록합니다.
+    """
+    if not TRACING_ENABLED:
+        return
+
+    tracer_provider = TracerProvider(resource=Resource.create({'service.name': TRACER_NAME}),
+                                     sampler=ParentBased(TraceIdRatioBased(TRACING_SAMPLE_RATIO)))
+    tracer_provider.add_span_processor(BatchSpanProcessor(_create_exporter()))
+    trace.set_tracer_provider(tracer_provider)
+    set_tracer_provider(tracer_provider)
+
+    for engine in engines:
+        instrument_engine(engine)
+
+
+def instrument_engine(engine: Engine):
+    """
+    engine에서 실행되는 쿼리마다 현재 span의 하위 span을 만듭니다.
+    """
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_query_span(conn, cursor, statement, parameters, context, executemany):
+        tracer = get_tracer()
+        if tracer is None:
+            return
+
+        span = tracer.start_span(statement.split(None, 1)[0].upper() if statement else 'SQL', kind=SpanKind.CLIENT)
+        if span.is_recording():
+            span.set_attribute('db.system', conn.dialect.name)
+            span.set_attribute('db.statement', statement[:TRACING_MAX_STATEMENT_LENGTH])
+            if executemany:
+                span.set_attribute('db.executemany', True)
+        conn.info.setdefault('tracing_spans', []).append(span)
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def end_query_span(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('tracing_spans')
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, 'handle_error')
+    def end_failed_query_span(exception_context):
+        spans = exception_context.connection.info.get('tracing_spans') if exception_context.connection else None
+        if spans:
+            span = spans.pop()
+            span.record_exception(exception_context.original_exception)
+            span.set_status(Status(StatusCode.ERROR))
+            span.end()
+
+
+def traced(name: str) -> Callable:
+    """
+    함수 실행을 `name` span으로 기록합니다. 비동기 함수에도 사용할 수 있습니다.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                tracer = get_tracer()
+                if tracer is None:
+                    return await func(*args, **kwargs)
+
+                with tracer.start_as_current_span(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if tracer is None:
+                return func(*args, **kwargs)
+
+            with tracer.start_as_current_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(cls: type) -> type:
+    """
+    클래스의 public method 실행을 `클래스 이름.method 이름` span으로 기록합니다.
+    opentelemetry가 설치되어 있지 않다면 클래스를 그대로 반환합니다.
+    """
+    if trace is None:
+        return cls
+
+    for name, member in list(vars(cls).items()):
+        if name.startswith('_') or not inspect.isfunction(member):
+            continue
+        setattr(cls, name, traced(f'{cls.__name__}.{name}')(member))
+
+    return cls
+
+
+def start_request_span(name: str, method: str, route: str):
+    """
+    router에서 API 요청을 처리하는 동안 사용할 span을 만듭니다. tracing이 꺼져 있다면 None을 반환합니다.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return None
+
+    # 예외는 응답 status code로 기록하므로, 4xx 응답이 span의 에러로 기록되지 않도록 합니다
+    return tracer.start_as_current_span(name, kind=SpanKind.SERVER,
+                                        attributes={'http.method': method, 'http.route': route},
+                                        record_exception=False, set_status_on_exception=False)
+
+
+def set_span_status_code(status_code: int):
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attribute('http.status_code', status_code)
+        if status_code >= 500:
+            span.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,99 @@
+import datetime
+
+from cache.invalidation_bus import InvalidationBus, RESERVATION
+
+from db.models import Reservation, ReservationArchive
+from jobs.archive_reservations import archive_finished_reservations
+from repository.reservation_archive_repository import ReservationArchiveRepository
+from tests.test_main import client, test_db_with_users, TestingSessionLocal, UtilTest, engine, \
+    enabled_invalidation_bus
+from util import encode_jwt
+
+
+def _insert_finished_and_upcoming_exam_schedules():
+    now = datetime.datetime.now(datetime.UTC)
+    UtilTest.insert_exam_schedule_data((1, 'finished exam', now - datetime.timedelta(days=2),
+                                        now - datetime.timedelta(days=1)))
+    UtilTest.insert_exam_schedule_data((2, 'upcoming exam', now + datetime.timedelta(days=1),
+                                        now + datetime.timedelta(days=2)))
+
+
+class TestArchiveReservations:
+    def test_archive_should_move_only_finished_exam_reservations_in_chunks(self, test_db_with_users):
+        _insert_finished_and_upcoming_exam_schedules()
+        session = TestingSessionLocal()
+        for user_id in range(1, 6):
+            session.add(Reservation(user_id=user_id, exam_schedule_id=1, confirmed=user_id % 2 == 0))
+        session.add(Reservation(user_id=1, exam_schedule_id=2))
+        session.commit()
+        finished_reservation_ids = {reservation.id for reservation in
+                                    session.query(Reservation).filter_by(exam_schedule_id=1)}
+
+        assert archive_finished_reservations(TestingSessionLocal, chunk_size=2) == 5
+
+        assert session.query(Reservation).filter_by(exam_schedule_id=1).count() == 0
+        assert session.query(Reservation).filter_by(exam_schedule_id=2).count() == 1
+        archived = session.query(ReservationArchive).all()
+        assert {reservation.id for reservation in archived} == finished_reservation_ids
+        assert sum(reservation.confirmed for reservation in archived) == 2
+
+        # 이미 옮긴 예약은 다시 옮기지 않습니다
+        assert archive_finished_reservations(TestingSessionLocal, chunk_size=2) == 0
+
+    def test_archive_should_skip_when_other_worker_is_archiving(self, test_db_with_users, monkeypatch):
+        _insert_finished_and_upcoming_exam_schedules()
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+        monkeypatch.setattr(ReservationArchiveRepository, 'lock_archive', lambda self: False)
+
+        assert archive_finished_reservations(TestingSessionLocal) == 0
+
+        assert session.query(Reservation).filter_by(exam_schedule_id=1).count() == 1
+        assert session.query(ReservationArchive).count() == 0
+
+    def test_archive_should_notify_other_workers(self, test_db_with_users, enabled_invalidation_bus):
+        _insert_finished_and_upcoming_exam_schedules()
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+        other_worker = InvalidationBus(bind=engine, enabled=True)
+        events = []
+        other_worker.subscribe(events.append)
+
+        archive_finished_reservations(TestingSessionLocal)
+
+        # 다른 worker는 보관된 시험 일정의 cache를 모두 지웁니다
+        assert [(event.kind, event.exam_schedule_id, event.user_id) for event in events] == [(RESERVATION, 1, None)]
+
+
+class TestArchivedReservationRead:
+    def test_admin_reads_should_include_archived_reservations(self, test_db_with_users):
+        _insert_finished_and_upcoming_exam_schedules()
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1, comment='finished', confirmed=True))
+        session.add(Reservation(user_id=1, exam_schedule_id=2, comment='upcoming'))
+        session.commit()
+        archive_finished_reservations(TestingSessionLocal)
+        headers = {"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"}
+
+        response = client.get("/api/v1/reservation/user_reservation/1", headers=headers)
+        assert response.status_code == 200, response.text
+        assert sorted(reservation['comment'] for reservation in response.json()) == ['finished', 'upcoming']
+
+        response = client.get("/api/v1/reservation/by_schedule/1", params={'confirmed': True}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert [reservation['comment'] for reservation in response.json()['reservations']] == ['finished']
+
+    def test_client_reads_should_not_include_archived_reservations(self, test_db_with_users):
+        _insert_finished_and_upcoming_exam_schedules()
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1, comment='finished'))
+        session.commit()
+        archive_finished_reservations(TestingSessionLocal)
+
+        response = client.get("/api/v1/reservation/my_reservation",
+                              headers={"Authorization": f"Bearer {encode_jwt('1', 'user 1', 'client')}"})
+
+        assert response.status_code == 200, response.text
+        assert response.json() == []
@@ -0,0 +1,84 @@
+import datetime
+import os
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from db.data_generator import generate
+from db.database import Base
+from db.models import ExamSchedule, Reservation, ReservationId, User
+
+NOW = datetime.datetime(2026, 3, 2, 12, 0)
+
+BENCHMARK_DATABASE_URL = os.environ.get('BENCHMARK_DATABASE_URL', '')
+
+
+@pytest.fixture()
+def sqlite_engine():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    yield engine
+    engine.dispose()
+
+
+def _reservation_keys(engine):
+    with Session(bind=engine) as session:
+        return session.execute(select(Reservation.exam_schedule_id, Reservation.user_id, Reservation.confirmed)
+                               .order_by(Reservation.exam_schedule_id, Reservation.user_id)).all()
+
+
+class TestDataGenerator:
+    def test_should_load_users_exam_schedules_and_reservations(self, sqlite_engine):
+        loaded = generate(sqlite_engine, user_num=10000, admin_num=2, exam_schedule_num=50, reservation_num=5000,
+                          batch_size=700, now=NOW)
+
+        assert (loaded['users'], loaded['exam_schedules']) == (10002, 50)
+        # 시험 일정별 예약 수를 반올림하므로 요청한 수와 조금 다를 수 있습니다
+        assert abs(loaded['reservations'] - 5000) < 50
+        with Session(bind=sqlite_engine) as session:
+            assert session.execute(select(func.count()).select_from(Reservation)).scalar() == loaded['reservations']
+            admin = session.execute(select(User).where(User.id == 10002)).scalar_one()
+            assert (admin.user_id, admin.role, admin.password) == ('admin 2', 'admin', '71b3b26aaa319e0cdf6fdb8429c112b0')
+
+            start_times = session.execute(select(ExamSchedule.start_time).order_by(ExamSchedule.id)).scalars().all()
+            assert start_times == sorted(start_times)
+            assert NOW - datetime.timedelta(days=31) < start_times[0] and start_times[-1] < NOW + datetime.timedelta(days=91)
+
+    def test_reservations_should_be_skewed_to_hot_exams(self, sqlite_engine):
+        generate(sqlite_engine, user_num=1000, admin_num=0, exam_schedule_num=50, reservation_num=5000, now=NOW)
+
+        with Session(bind=sqlite_engine) as session:
+            counts = sorted(session.execute(select(func.count()).select_from(Reservation)
+                                            .group_by(Reservation.exam_schedule_id)).scalars().all(), reverse=True)
+
+        assert counts[0] > 10 * counts[len(counts) // 2]
+        assert counts[0] <= 1000
+
+    def test_same_seed_should_generate_same_data(self, sqlite_engine):
+        other_engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        for engine in (sqlite_engine, other_engine):
+            generate(engine, user_num=300, admin_num=0, exam_schedule_num=10, reservation_num=1000, seed=7, now=NOW)
+
+        assert _reservation_keys(sqlite_engine) == _reservation_keys(other_engine)
+        other_engine.dispose()
+
+    @pytest.mark.skipif(not BENCHMARK_DATABASE_URL.startswith('postgresql'),
+                        reason='BENCHMARK_DATABASE_URL is not a postgres url')
+    def test_should_copy_into_postgres(self):
+        engine = create_engine(BENCHMARK_DATABASE_URL)
+        try:
+            loaded = generate(engine, user_num=300, admin_num=1, exam_schedule_num=10, reservation_num=1000,
+                              batch_size=200, reset=True, now=NOW)
+
+            with Session(bind=engine) as session:
+                assert session.execute(select(func.count()).select_from(Reservation)).scalar() \
+                       == loaded['reservations']
+                # 빈 문자열이 NULL로 저장되지 않아야 합니다
+                assert session.execute(select(func.count()).select_from(Reservation)
+                                       .where(Reservation.comment == '')).scalar() == loaded['reservations']
+                assert session.execute(select(func.count()).select_from(ReservationId)).scalar() \
+                       == loaded['reservations']
+        finally:
+            Base.metadata.drop_all(bind=engine)
+            engine.dispose()
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import create_engine, insert
+
+from db.database import Base, ReplicaRouter, ReadSessionLocal
+from db.models import User
+from repository.user_repository import UserRepository
+
+
+@pytest.fixture()
+def primary_and_replica_engines(tmp_path):
+    engines = [create_engine(f'sqlite:///{tmp_path}/{name}.db') for name in ['primary', 'replica_1', 'replica_2']]
+    for i, engine in enumerate(engines):
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(insert(User).values(id=1, user_id=f'user in db {i}', password='password', role='client'))
+
+    yield engines
+
+    for engine in engines:
+        engine.dispose()
+
+
+class TestReplicaRouter:
+    def test_get_engine_should_return_primary_without_replicas(self, primary_and_replica_engines):
+        primary, _, _ = primary_and_replica_engines
+        router = ReplicaRouter(primary, [])
+
+        assert router.get_engine(1) is primary
+
+    def test_get_engine_should_round_robin_replicas(self, primary_and_replica_engines):
+        primary, replica_1, replica_2 = primary_and_replica_engines
+        router = ReplicaRouter(primary, [replica_1, replica_2])
+
+        assert [router.get_engine() for _ in range(4)] == [replica_1, replica_2, replica_1, replica_2]
+
+    def test_read_session_should_query_replica(self, primary_and_replica_engines):
+        primary, replica_1, _ = primary_and_replica_engines
+        router = ReplicaRouter(primary, [replica_1])
+
+        with ReadSessionLocal(bind=router.get_engine(1)) as session:
+            users = UserRepository(session).get_all()
+
+        assert [user.user_id for user in users] == ['user in db 1']
+
+    def test_get_engine_should_return_primary_after_user_write(self, primary_and_replica_engines):
+        primary, replica_1, _ = primary_and_replica_engines
+        now = [0]
+        router = ReplicaRouter(primary, [replica_1], read_your_writes_seconds=10, timer=lambda: now[0])
+
+        router.mark_write(1)
+
+        assert router.get_engine(1) is primary
+        assert router.get_engine(2) is replica_1
+        assert router.get_engine(None) is replica_1
+
+        now[0] = 10
+        assert router.get_engine(1) is replica_1
+
+    def test_get_engine_should_skip_lagging_replica(self, primary_and_replica_engines):
+        primary, replica_1, replica_2 = primary_and_replica_engines
+        lags = {replica_1: 30.0, replica_2: 0.0}
+        router = ReplicaRouter(primary, [replica_1, replica_2], max_lag=5, lag_measurer=lambda engine: lags[engine])
+
+        assert [router.get_engine() for _ in range(3)] == [replica_2, replica_2, replica_2]
+
+    def test_get_engine_should_fallback_to_primary_when_all_replicas_unavailable(self, primary_and_replica_engines):
+        primary, replica_1, replica_2 = primary_and_replica_engines
+
+        def lag_measurer(engine):
+            if engine is replica_1:
+                raise ConnectionError()
+            return 30.0
+
+        router = ReplicaRouter(primary, [replica_1, replica_2], max_lag=5, lag_measurer=lag_measurer)
+
+        assert router.get_engine() is primary
+
+    def test_lag_should_be_cached_for_check_interval(self, primary_and_replica_engines):
+        primary, replica_1, _ = primary_and_replica_engines
+        now = [0]
+        measured = []
+
+        def lag_measurer(engine):
+            measured.append(engine)
+            return 0.0
+
+        router = ReplicaRouter(primary, [replica_1], lag_check_interval=1, lag_measurer=lag_measurer,
+                               timer=lambda: now[0])
+
+        router.get_engine()
+        router.get_engine()
+        now[0] = 1
+        router.get_engine()
+
+        assert len(measured) == 2
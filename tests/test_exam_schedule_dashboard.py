@@ -0,0 +1,45 @@
+from db.models import Reservation
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal, QueryCounter
+from util import encode_jwt
+
+ADMIN_HEADERS = {"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"}
+
+
+def _add_reservations():
+    session = TestingSessionLocal()
+    session.add(Reservation(user_id=1, exam_schedule_id=1, confirmed=True))
+    session.add(Reservation(user_id=2, exam_schedule_id=1))
+    session.add(Reservation(user_id=1, exam_schedule_id=2))
+    session.commit()
+
+
+class TestExamScheduleDashboard:
+    def test_should_return_counts_per_schedule(self, test_db_with_users_and_exam_schedules):
+        _add_reservations()
+
+        response = client.get("/api/v1/exam_schedule/dashboard", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200, response.text
+        schedules = response.json()['exam_schedules']
+        assert [(schedule['id'], schedule['pending_num'], schedule['confirmed_num'], schedule['remain_slot'])
+                for schedule in schedules] == [(1, 1, 1, 49999), (2, 1, 0, 50000)]
+        assert schedules[0]['fill_rate'] == 1 / 50000
+        assert 0 < schedules[0]['seconds_to_start'] < schedules[1]['seconds_to_start']
+
+    def test_should_aggregate_with_one_query_and_cache_it(self, test_db_with_users_and_exam_schedules):
+        with QueryCounter() as first:
+            aggregated_at = client.get("/api/v1/exam_schedule/dashboard", headers=ADMIN_HEADERS).json()['aggregated_at']
+        _add_reservations()
+        with QueryCounter() as second:
+            response = client.get("/api/v1/exam_schedule/dashboard", headers=ADMIN_HEADERS)
+
+        assert first.count == 1
+        assert second.count == 0
+        assert response.json()['aggregated_at'] == aggregated_at
+        assert all(schedule['pending_num'] == 0 for schedule in response.json()['exam_schedules'])
+
+    def test_should_return_403_for_client(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/exam_schedule/dashboard",
+                              headers={"Authorization": f"Bearer {encode_jwt('1', 'user 1', 'client')}"})
+
+        assert response.status_code == 403
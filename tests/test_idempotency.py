@@ -0,0 +1,135 @@
+import uuid
+
+from cache.idempotency_store import DatabaseIdempotencyStore, StoredResponse
+from cache.ttl_cache import TTLCache
+from db.models import Reservation
+from tests.test_main import client, test_db, test_db_with_users_and_exam_schedules, TestingSessionLocal, QueryCounter
+from util import encode_jwt
+
+
+class TestTTLCache:
+    def test_get_should_return_default_after_ttl(self):
+        now = [0]
+        cache = TTLCache(maxsize=10, ttl=5, timer=lambda: now[0])
+
+        cache.set('key', 'value')
+        assert cache.get('key') == 'value'
+
+        now[0] = 5
+        assert cache.get('key') is None
+
+    def test_set_should_evict_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_add_should_only_set_absent_key(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        assert cache.add('key', 1)
+        assert not cache.add('key', 2)
+        assert cache.get('key') == 1
+
+
+class TestDatabaseIdempotencyStore:
+    def test_reserve_save_and_release(self, test_db):
+        store = DatabaseIdempotencyStore(TestingSessionLocal, ttl=60)
+
+        assert store.reserve('key', 'fingerprint') is None
+        assert store.reserve('key', 'fingerprint') == StoredResponse(fingerprint='fingerprint')
+
+        store.save('key', StoredResponse(fingerprint='fingerprint', status_code=201, media_type='application/json',
+                                         body=b'{}'))
+        assert store.reserve('key', 'fingerprint').status_code == 201
+
+        store.release('key')
+        assert store.reserve('key', 'fingerprint') is None
+
+
+class TestIdempotentReservationRoute:
+    def test_make_reservation_should_replay_stored_response_without_query(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": str(uuid.uuid4())}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': 'comment'})
+        assert response.status_code == 201, response.text
+
+        with QueryCounter() as counter:
+            replayed_response = client.post("/api/v1/reservation/make_reservation/1", headers=headers,
+                                            json={'comment': 'comment'})
+
+        assert counter.count == 0
+        assert replayed_response.status_code == 201
+        assert replayed_response.json() == response.json()
+        assert replayed_response.headers['Idempotent-Replayed'] == 'true'
+
+        session = TestingSessionLocal()
+        assert session.query(Reservation).count() == 1
+
+    def test_make_reservation_should_return_422_when_key_reused_with_different_body(
+            self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": str(uuid.uuid4())}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': 'comment'})
+        assert response.status_code == 201, response.text
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': 'other'})
+
+        assert response.status_code == 422, response.text
+        assert response.json()['detail'] == "Idempotency-Key was already used with a different request"
+
+    def test_same_key_should_not_be_shared_between_users(self, test_db_with_users_and_exam_schedules):
+        idempotency_key = str(uuid.uuid4())
+        admin_token = encode_jwt('2', 'admin 1', 'admin')
+        client_token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.post("/api/v1/reservation/make_reservation/1",
+                               headers={"Authorization": f"Bearer {admin_token}", "Idempotency-Key": idempotency_key},
+                               json={'comment': ''})
+        assert response.status_code == 403
+
+        response = client.post("/api/v1/reservation/make_reservation/1",
+                               headers={"Authorization": f"Bearer {client_token}", "Idempotency-Key": idempotency_key},
+                               json={'comment': ''})
+        assert response.status_code == 201, response.text
+
+    def test_delete_reservation_should_replay_success(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": str(uuid.uuid4())}
+
+        session = TestingSessionLocal()
+        reservation = Reservation(user_id=1, exam_schedule_id=1, confirmed=False)
+        session.add(reservation)
+        session.commit()
+
+        response = client.delete(f"/api/v1/reservation/delete_reservation/{reservation.id}", headers=headers)
+        assert response.status_code == 200, response.text
+
+        response = client.delete(f"/api/v1/reservation/delete_reservation/{reservation.id}", headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["message"] == "Reservation deleted successfully"
+
+    def test_confirm_reservation_should_replay_not_found(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('2', 'admin 1', 'admin')
+        headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": str(uuid.uuid4())}
+
+        response = client.put("/api/v1/reservation/confirm_reservation", headers=headers,
+                               json={'user_id': 1, 'exam_schedule_id': 1})
+        assert response.status_code == 404, response.text
+
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1, confirmed=False))
+        session.commit()
+
+        response = client.put("/api/v1/reservation/confirm_reservation", headers=headers,
+                              json={'user_id': 1, 'exam_schedule_id': 1})
+        assert response.status_code == 404, response.text
+        assert response.json()["detail"] == "Reservation not found"
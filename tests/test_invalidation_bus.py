@@ -0,0 +1,133 @@
+import os
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from cache.invalidation_bus import InvalidationBus, InvalidationEvent, RESERVATION, RESET, CREATED, DELETED
+from db.database import replica_router
+from service.reservation_bitmap_index import reservation_bitmap_index
+from service.slot_inventory import SlotInventory, BookResult
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal, engine, QueryCounter, \
+    enabled_invalidation_bus
+from util import encode_jwt
+
+BENCHMARK_DATABASE_URL = os.environ.get('BENCHMARK_DATABASE_URL', '')
+
+
+@pytest.fixture()
+def other_worker():
+    """
+    다른 worker의 bus. sqlite에서는 같은 프로세스 안의 bus들에게 event가 전달됩니다.
+    """
+    bus = InvalidationBus(bind=engine, enabled=True)
+    events = []
+    bus.subscribe(events.append)
+    bus.events = events
+    return bus
+
+
+class TestInvalidationBus:
+    def test_committed_write_should_notify_other_workers(self, test_db_with_users_and_exam_schedules,
+                                                         enabled_invalidation_bus, other_worker):
+        own_events = []
+        enabled_invalidation_bus.subscribe(own_events.append)
+        token = encode_jwt('1', 'user 1', 'client')
+
+        try:
+            response = client.post("/api/v1/reservation/make_reservation/1",
+                                   headers={"Authorization": f"Bearer {token}"}, json={'comment': 'comment'})
+        finally:
+            enabled_invalidation_bus._handlers.remove(own_events.append)
+
+        assert response.status_code == 201, response.text
+        assert [(event.kind, event.exam_schedule_id, event.user_id, event.operation)
+                for event in other_worker.events] == [(RESERVATION, 1, 1, CREATED)]
+        # 발행한 worker는 자신의 event를 무시합니다
+        assert own_events == []
+
+    def test_rolled_back_write_should_not_notify(self, test_db_with_users_and_exam_schedules,
+                                                 enabled_invalidation_bus, other_worker):
+        session = TestingSessionLocal()
+        enabled_invalidation_bus.publish(session, RESERVATION, exam_schedule_id=1, user_id=1)
+        session.rollback()
+        session.commit()
+
+        assert other_worker.events == []
+
+    def test_event_with_user_should_update_caches_without_reload(self, test_db_with_users_and_exam_schedules,
+                                                                 enabled_invalidation_bus, other_worker, monkeypatch):
+        monkeypatch.setattr(reservation_bitmap_index, 'enabled', True)
+        session = TestingSessionLocal()
+        inventory = SlotInventory()
+        enabled_invalidation_bus.subscribe(inventory.handle_invalidation)
+        assert not reservation_bitmap_index.contains(session, 1, 1)
+        assert inventory.try_book(session, 1, 2, capacity=10) == BookResult.BOOKED
+
+        try:
+            # 다른 worker가 예약을 저장하고 삭제한 경우
+            session.execute(text("INSERT INTO reservations (id, user_id, exam_schedule_id, comment, confirmed) "
+                                 "VALUES ('0190f5e4-7b5c-7000-8000-000000000001', 1, 1, '', false)"))
+            other_worker.publish(session, RESERVATION, exam_schedule_id=1, user_id=1, operation=CREATED)
+            other_worker.publish(session, RESERVATION, exam_schedule_id=1, user_id=2, operation=DELETED)
+            session.commit()
+        finally:
+            enabled_invalidation_bus._handlers.remove(inventory.handle_invalidation)
+
+        # 시험 일정의 cache를 지우지 않고 변경된 유저만 반영하므로 DB를 다시 조회하지 않습니다
+        with QueryCounter() as counter:
+            assert reservation_bitmap_index.contains(session, 1, 1)
+            assert inventory.try_book(session, 1, 1, capacity=10) == BookResult.DUPLICATE
+            assert inventory.try_book(session, 1, 2, capacity=10) == BookResult.BOOKED
+        assert counter.count == 0
+
+    def test_event_without_user_should_evict_caches(self, test_db_with_users_and_exam_schedules,
+                                                    enabled_invalidation_bus, other_worker, monkeypatch):
+        monkeypatch.setattr(reservation_bitmap_index, 'enabled', True)
+        session = TestingSessionLocal()
+        assert not reservation_bitmap_index.contains(session, 1, 1)
+
+        # 다른 worker가 여러 유저의 예약을 한 번에 변경한 경우
+        session.execute(text("INSERT INTO reservations (id, user_id, exam_schedule_id, comment, confirmed) "
+                             "VALUES ('0190f5e4-7b5c-7000-8000-000000000001', 1, 1, '', false)"))
+        other_worker.publish(session, RESERVATION, exam_schedule_id=1)
+        session.commit()
+
+        assert reservation_bitmap_index.contains(session, 1, 1)
+
+    def test_event_with_user_should_route_user_to_primary(self, enabled_invalidation_bus, monkeypatch):
+        marked_user_ids = []
+        monkeypatch.setattr(replica_router, 'mark_write', marked_user_ids.append)
+
+        replica_router.handle_invalidation(InvalidationEvent(RESERVATION, 1, 3, 'other'))
+        replica_router.handle_invalidation(InvalidationEvent(RESET))
+
+        assert marked_user_ids == [3]
+
+    @pytest.mark.skipif(not BENCHMARK_DATABASE_URL.startswith('postgresql'),
+                        reason='BENCHMARK_DATABASE_URL is not a postgres url')
+    def test_notify_should_reach_listener_on_postgres(self):
+        postgres_engine = create_engine(BENCHMARK_DATABASE_URL)
+        publisher = InvalidationBus(bind=postgres_engine, enabled=True, channel='test_cache_invalidation')
+        listener = InvalidationBus(bind=postgres_engine, enabled=True, channel='test_cache_invalidation')
+        received = threading.Event()
+        events = []
+        listener.subscribe(events.append)
+        listener.subscribe(lambda event: event.kind == RESERVATION and received.set())
+        listener.start()
+
+        try:
+            # LISTEN이 실행될 때까지 publish를 반복합니다
+            while not received.is_set():
+                with Session(bind=postgres_engine) as session:
+                    publisher.publish(session, RESERVATION, exam_schedule_id=1, user_id=2)
+                    session.commit()
+                received.wait(0.1)
+        finally:
+            listener.stop()
+            postgres_engine.dispose()
+
+        # LISTEN 전의 event는 받을 수 없으므로 처음 연결한 뒤에도 모든 cache를 지웁니다
+        assert events[0].kind == RESET
+        assert (events[-1].kind, events[-1].exam_schedule_id, events[-1].user_id) == (RESERVATION, 1, 2)
@@ -4,7 +4,7 @@
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
@@ -12,8 +12,16 @@ import os
 from typing import Tuple
 import datetime
 
-from db.database import Base, get_db
+from auth.rate_limiter import get_rate_limit_backend
+from cache.invalidation_bus import invalidation_bus
+from db.database import Base, get_db, get_read_db, get_read_session_factory
 from main import app
+from repository.exam_schedule_repository import exam_schedule_cache
+from service.exam_schedule_service import dashboard_cache
+from service.me_dashboard_version import me_dashboard_versions
+from service.reservation_bitmap_index import reservation_bitmap_index
+from service.slot_inventory import slot_inventory
+from service.waiting_room import waiting_room
 
 load_dotenv()
 
@@ -24,7 +32,7 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 def override_get_db():
@@ -35,6 +43,25 @@ def override_get_db():
         db.close()
 
 
+class QueryCounter:
+    """
+    `with` 블록 안에서 테스트 DB에 실행된 쿼리 수를 셉니다.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(engine, 'before_cursor_execute', self)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(engine, 'before_cursor_execute', self)
+
+
 class UtilTest:
     def insert_user_data(data: Tuple):
         conn = engine.raw_connection()
@@ -55,8 +82,22 @@ class UtilTest:
         conn.commit()
 
 
+def reset_app_state():
+    """
+    테스트 간에 공유되는 프로세스 메모리 상태를 초기화합니다.
+    """
+    get_rate_limit_backend().reset()
+    waiting_room.reset()
+    slot_inventory.reset()
+    reservation_bitmap_index.reset()
+    dashboard_cache.clear()
+    me_dashboard_versions.reset()
+    exam_schedule_cache.clear()
+
+
 @pytest.fixture()
 def test_db():
+    reset_app_state()
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
@@ -64,6 +105,7 @@ def test_db():
 
 @pytest.fixture()
 def test_db_with_users():
+    reset_app_state()
     Base.metadata.create_all(bind=engine)
     UtilTest.insert_user_data((1, 'user 1', '71b3b26aaa319e0cdf6fdb8429c112b0', 'client'))
     UtilTest.insert_user_data((2, 'admin 1', '71b3b26aaa319e0cdf6fdb8429c112b0', 'admin'))
@@ -73,6 +115,7 @@ def test_db_with_users():
 
 @pytest.fixture()
 def test_db_with_users_and_exam_schedules():
+    reset_app_state()
     Base.metadata.create_all(bind=engine)
     UtilTest.insert_user_data((1, 'user 1', '71b3b26aaa319e0cdf6fdb8429c112b0', 'client'))
     UtilTest.insert_user_data((2, 'admin 1', '71b3b26aaa319e0cdf6fdb8429c112b0', 'admin'))
@@ -86,7 +129,15 @@ def test_db_with_users_and_exam_schedules():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture()
+def enabled_invalidation_bus(monkeypatch):
+    monkeypatch.setattr(invalidation_bus, 'enabled', True)
+    return invalidation_bus
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
+app.dependency_overrides[get_read_session_factory] = lambda: TestingSessionLocal
 
 client = TestClient(app)
 
@@ -0,0 +1,85 @@
+from cache.invalidation_bus import InvalidationEvent, RESERVATION, CONFIRMED
+from db.models import Reservation
+from service.me_dashboard_version import me_dashboard_versions
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal, QueryCounter, \
+    enabled_invalidation_bus
+from util import encode_jwt
+
+CLIENT_HEADERS = {"Authorization": f"Bearer {encode_jwt('1', 'user 1', 'client')}"}
+ADMIN_HEADERS = {"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"}
+
+
+class TestMeDashboard:
+    def test_should_return_available_schedules_and_reservations(self, test_db_with_users_and_exam_schedules,
+                                                                enabled_invalidation_bus):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=2, exam_schedule_id=1, confirmed=True))
+        session.commit()
+        response = client.post("/api/v1/reservation/make_reservation/2", headers=CLIENT_HEADERS,
+                               json={'comment': 'comment'})
+        assert response.status_code == 201, response.text
+
+        with QueryCounter() as counter:
+            response = client.get("/api/v1/me/dashboard", headers=CLIENT_HEADERS)
+
+        assert response.status_code == 200, response.text
+        assert response.headers['etag'].startswith('W/"')
+        assert [(schedule['name'], schedule['remain_slot']) for schedule in response.json()['exam_schedules']] \
+               == [('exam 1', 49999)]
+        assert [(reservation['exam_schedule_id'], reservation['comment'])
+                for reservation in response.json()['reservations']] == [(2, 'comment')]
+        # 예약할 수 있는 시험 일정, 확정된 예약 수, 내 예약 신청
+        assert counter.count == 3
+
+    def test_should_return_304_without_queries_when_not_modified(self, test_db_with_users_and_exam_schedules,
+                                                                 enabled_invalidation_bus):
+        etag = client.get("/api/v1/me/dashboard", headers=CLIENT_HEADERS).headers['etag']
+
+        with QueryCounter() as counter:
+            response = client.get("/api/v1/me/dashboard", headers={**CLIENT_HEADERS, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['etag'] == etag
+        assert counter.count == 0
+
+    def test_reservation_changes_should_change_etag(self, test_db_with_users_and_exam_schedules,
+                                                    enabled_invalidation_bus):
+        etag = client.get("/api/v1/me/dashboard", headers=CLIENT_HEADERS).headers['etag']
+        reservation_id = client.post("/api/v1/reservation/make_reservation/1", headers=CLIENT_HEADERS,
+                                     json={'comment': 'comment'}).json()['id']
+
+        response = client.get("/api/v1/me/dashboard", headers={**CLIENT_HEADERS, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert len(response.json()['reservations']) == 1
+        etag = response.headers['etag']
+
+        # 다른 유저의 예약이 확정되면 남은 슬롯이 바뀝니다
+        client.put("/api/v1/reservation/confirm_reservation", headers=ADMIN_HEADERS,
+                   json={'user_id': 1, 'exam_schedule_id': 1})
+        response = client.get("/api/v1/me/dashboard", headers={**CLIENT_HEADERS, 'If-None-Match': etag})
+        assert response.status_code == 200
+        etag = response.headers['etag']
+
+        # 다른 worker에서 변경된 예약
+        me_dashboard_versions.handle_invalidation(InvalidationEvent(RESERVATION, exam_schedule_id=1, user_id=1))
+        response = client.get("/api/v1/me/dashboard", headers={**CLIENT_HEADERS, 'If-None-Match': etag})
+        assert response.status_code == 200
+        etag = response.headers['etag']
+
+        # 다른 worker에서 다른 유저의 예약이 확정된 경우
+        me_dashboard_versions.handle_invalidation(InvalidationEvent(RESERVATION, exam_schedule_id=1, user_id=3,
+                                                                    operation=CONFIRMED))
+        response = client.get("/api/v1/me/dashboard", headers={**CLIENT_HEADERS, 'If-None-Match': etag})
+        assert response.status_code == 200
+
+    def test_should_not_use_etag_without_invalidation_bus(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/me/dashboard", headers={**CLIENT_HEADERS, 'If-None-Match': '*'})
+
+        # 다른 worker의 변경을 알 수 없으므로 항상 DB에서 조회합니다
+        assert response.status_code == 200, response.text
+        assert 'etag' not in response.headers
+
+    def test_should_return_403_for_admin(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/me/dashboard", headers={**ADMIN_HEADERS, 'If-None-Match': '*'})
+
+        assert response.status_code == 403
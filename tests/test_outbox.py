@@ -0,0 +1,125 @@
+import pytest
+
+from db.models import Reservation, ReservationOutbox
+from jobs.outbox_relay import relay_outbox
+from repository.reservation_repository import ReservationRepository
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal
+from util import encode_jwt, generate_uuid7
+
+
+@pytest.fixture()
+def enabled_outbox(monkeypatch):
+    monkeypatch.setattr('repository.reservation_outbox_repository.OUTBOX_ENABLED', True)
+
+
+def _make_reservation(token: str, exam_schedule_id: int) -> str:
+    response = client.post(f"/api/v1/reservation/make_reservation/{exam_schedule_id}",
+                           headers={"Authorization": f"Bearer {token}"}, json={'comment': 'comment'})
+    assert response.status_code == 201, response.text
+    return response.json()['id']
+
+
+class TestReservationOutbox:
+    def test_reservation_writes_should_add_events(self, test_db_with_users_and_exam_schedules, enabled_outbox):
+        client_token = encode_jwt('1', 'user 1', 'client')
+        client_headers = {"Authorization": f"Bearer {client_token}"}
+        admin_headers = {"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"}
+
+        reservation_id = _make_reservation(client_token, 1)
+        client.put(f"/api/v1/reservation/edit_reservation/{reservation_id}", headers=client_headers,
+                   json={'comment': 'new comment'})
+        client.delete(f"/api/v1/reservation/delete_reservation/{reservation_id}", headers=client_headers)
+        _make_reservation(client_token, 2)
+        client.put("/api/v1/reservation/confirm_reservation", headers=admin_headers,
+                   json={'user_id': 1, 'exam_schedule_id': 2})
+
+        session = TestingSessionLocal()
+        events = session.query(ReservationOutbox).order_by(ReservationOutbox.id).all()
+        assert [(event.event_type, event.exam_schedule_id, event.comment) for event in events] == [
+            ('created', 1, 'comment'),
+            ('updated', 1, 'new comment'),
+            ('deleted', 1, 'new comment'),
+            ('created', 2, 'comment'),
+            ('confirmed', 2, 'comment'),
+        ]
+        assert str(events[0].reservation_id) == reservation_id
+        assert all(event.position is None for event in events)
+
+    def test_conflicting_reservations_should_not_add_events(self, test_db_with_users_and_exam_schedules,
+                                                            enabled_outbox):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+
+        ReservationRepository(session).create_many([
+            {'id': generate_uuid7(), 'user_id': 1, 'exam_schedule_id': 1, 'comment': '', 'confirmed': False},
+            {'id': generate_uuid7(), 'user_id': 1, 'exam_schedule_id': 2, 'comment': '', 'confirmed': False},
+        ])
+
+        assert [event.exam_schedule_id for event in session.query(ReservationOutbox).all()] == [2]
+
+    def test_disabled_outbox_should_not_add_events(self, test_db_with_users_and_exam_schedules):
+        _make_reservation(encode_jwt('1', 'user 1', 'client'), 1)
+
+        assert TestingSessionLocal().query(ReservationOutbox).count() == 0
+
+
+class TestOutboxRelay:
+    def test_relay_should_publish_events_in_batches_once(self, test_db_with_users_and_exam_schedules,
+                                                         enabled_outbox):
+        token = encode_jwt('1', 'user 1', 'client')
+        _make_reservation(token, 1)
+        _make_reservation(token, 2)
+        batches = []
+
+        assert relay_outbox(TestingSessionLocal, batches.append, batch_size=1) == 2
+        assert relay_outbox(TestingSessionLocal, batches.append, batch_size=1) == 0
+
+        assert [[(change.position, change.exam_schedule_id) for change in batch] for batch in batches] \
+               == [[(1, 1)], [(2, 2)]]
+
+    def test_failed_publish_should_be_retried(self, test_db_with_users_and_exam_schedules, enabled_outbox):
+        _make_reservation(encode_jwt('1', 'user 1', 'client'), 1)
+
+        def fail(changes):
+            raise ConnectionError()
+
+        with pytest.raises(ConnectionError):
+            relay_outbox(TestingSessionLocal, fail)
+
+        published = []
+        assert relay_outbox(TestingSessionLocal, published.extend) == 1
+        assert published[0].position == 1
+
+
+class TestGetChanges:
+    def test_should_return_published_changes_after_cursor(self, test_db_with_users_and_exam_schedules,
+                                                          enabled_outbox):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"}
+        _make_reservation(token, 1)
+        _make_reservation(token, 2)
+
+        # 발행되지 않은 변경은 반환하지 않습니다
+        assert client.get("/api/v1/changes", headers=headers).json() == {'changes': [], 'next_cursor': None}
+
+        relay_outbox(TestingSessionLocal, lambda changes: None)
+        response = client.get("/api/v1/changes", headers=headers, params={'limit': 1})
+
+        assert response.status_code == 200, response.text
+        assert [change['exam_schedule_id'] for change in response.json()['changes']] == [1]
+        assert 'id' not in response.json()['changes'][0]
+        next_cursor = response.json()['next_cursor']
+
+        response = client.get("/api/v1/changes", headers=headers, params={'after': next_cursor})
+        assert [(change['event_type'], change['exam_schedule_id']) for change in response.json()['changes']] \
+               == [('created', 2)]
+
+        response = client.get("/api/v1/changes", headers=headers, params={'after': response.json()['next_cursor']})
+        assert response.json() == {'changes': [], 'next_cursor': 2}
+
+    def test_should_return_403_for_client(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/changes",
+                              headers={"Authorization": f"Bearer {encode_jwt('1', 'user 1', 'client')}"})
+
+        assert response.status_code == 403
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+from db.models import Reservation, ReservationId
+from db.partitions import create_reservation_partition, reservation_partition_name
+from repository.reservation_repository import ReservationRepository
+from tests.test_main import test_db, test_db_with_users_and_exam_schedules, TestingSessionLocal
+
+
+class TestReservationPartition:
+    def test_reservations_should_be_list_partitioned_by_exam_schedule_on_postgres(self):
+        ddl = str(CreateTable(Reservation.__table__).compile(dialect=postgresql.dialect()))
+
+        assert 'PARTITION BY LIST (exam_schedule_id)' in ddl
+        assert 'PRIMARY KEY (user_id, exam_schedule_id)' in ddl
+
+    def test_unique_indexes_should_include_partition_key(self):
+        for index in Reservation.__table__.indexes:
+            ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+            assert not index.unique or 'exam_schedule_id' in ddl
+
+    def test_create_reservation_partition_should_do_nothing_on_sqlite(self, test_db):
+        session = TestingSessionLocal()
+
+        create_reservation_partition(session, 1)
+
+        assert reservation_partition_name(1) == 'reservations_p1'
+        assert not session.in_transaction()
+
+    def test_reservation_id_should_be_unique_across_exam_schedules(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        reservation = Reservation(user_id=1, exam_schedule_id=1)
+        session.add(reservation)
+        session.commit()
+
+        session.add(Reservation(id=reservation.id, user_id=1, exam_schedule_id=2))
+        with pytest.raises(IntegrityError):
+            session.commit()
+
+    def test_reservation_ids_should_follow_reservations(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        reservation = Reservation(user_id=1, exam_schedule_id=2)
+        session.add(reservation)
+        session.commit()
+
+        assert session.get(ReservationId, reservation.id).exam_schedule_id == 2
+        assert ReservationRepository(session).get_by_id(str(reservation.id)).exam_schedule_id == 2
+
+        session.delete(reservation)
+        session.commit()
+
+        assert session.query(ReservationId).count() == 0
+        assert ReservationRepository(session).get_by_id(str(reservation.id)) is None
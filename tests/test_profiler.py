@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+
+import pytest
+
+from telemetry import profiler
+from telemetry.profiler import Profile, stack_sampler, profile_all_threads
+from tests.test_main import client, test_db_with_users_and_exam_schedules
+from util import encode_jwt
+
+
+def _busy_wait(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture()
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, 'PROFILER_DIR', str(tmp_path))
+    return tmp_path
+
+
+class TestProfile:
+    def test_sampler_should_collect_only_registered_threads(self):
+        profile = Profile('test', 0.001, {threading.get_ident()})
+        other_thread = threading.Thread(target=_busy_wait, args=(0.1,))
+
+        stack_sampler.start(profile)
+        other_thread.start()
+        _busy_wait(0.1)
+        stack_sampler.stop(profile)
+        other_thread.join()
+
+        assert profile.samples
+        names = {frame[0] for stack in profile.samples for frame in stack}
+        assert 'test_sampler_should_collect_only_registered_threads' in names
+        assert all(stack[-1][0] != 'run' for stack in profile.samples)
+
+    def test_to_speedscope_should_share_frames_between_samples(self):
+        profile = Profile('test', 0.01)
+        profile.samples = [(('main', 'a.py', 1), ('f', 'a.py', 10)), (('main', 'a.py', 1), ('g', 'a.py', 20))]
+
+        speedscope = profile.to_speedscope()
+
+        assert [frame['name'] for frame in speedscope['shared']['frames']] == ['main', 'f', 'g']
+        assert speedscope['profiles'][0]['samples'] == [[0, 1], [0, 2]]
+        assert speedscope['profiles'][0]['weights'] == [0.01, 0.01]
+
+    def test_profile_all_threads_should_save_speedscope_file(self, tmp_path):
+        path = profile_all_threads(duration=0.05, interval=0.005, directory=str(tmp_path))
+
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f)['profiles'][0]['type'] == 'sampled'
+
+
+class TestProfileRequest:
+    def test_admin_request_should_save_profile(self, test_db_with_users_and_exam_schedules, profile_dir):
+        token = encode_jwt('2', 'admin 1', 'admin')
+
+        response = client.get("/api/v1/exam_schedule", params={'profile': 'true'},
+                              headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200, response.text
+        with open(response.headers['X-Profile-Path'], encoding='utf-8') as f:
+            speedscope = json.load(f)
+        assert speedscope['name'] == 'GET /api/v1/exam_schedule/'
+
+    def test_client_request_should_not_be_profiled(self, test_db_with_users_and_exam_schedules, profile_dir):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.get("/api/v1/exam_schedule", headers={"Authorization": f"Bearer {token}", "X-Profile": "true"})
+
+        assert response.status_code == 200, response.text
+        assert 'X-Profile-Path' not in response.headers
+        assert list(profile_dir.iterdir()) == []
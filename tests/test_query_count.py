@@ -0,0 +1,99 @@
+"""
+쓰기 API들이 실행하는 쿼리 수를 확인하는 테스트입니다.
+쓰기 후 refresh를 위한 SELECT 없이 RETURNING 결과로 응답을 만드는지 확인합니다.
+"""
+
+import datetime
+
+from db.models import Reservation
+from repository.exam_schedule_repository import ExamScheduleRepository
+from tests.test_main import client, test_db_with_users, test_db_with_users_and_exam_schedules, TestingSessionLocal, \
+    QueryCounter
+from util import encode_jwt
+
+
+class TestWriteRouteQueryCount:
+    def test_make_reservation(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        with QueryCounter() as counter:
+            response = client.post("/api/v1/reservation/make_reservation/1",
+                                   headers={"Authorization": f"Bearer {token}"}, json={'comment': 'comment'})
+
+        assert response.status_code == 201, response.text
+        # 시험 일정 조회, 중복 예약 확인, 확정 예약 수 조회, INSERT ... RETURNING
+        assert counter.count == 4
+
+    def test_make_reservation_with_cached_exam_schedule(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+        assert ExamScheduleRepository(TestingSessionLocal()).load_cache() == 2
+
+        with QueryCounter() as counter:
+            response = client.post("/api/v1/reservation/make_reservation/1",
+                                   headers={"Authorization": f"Bearer {token}"}, json={'comment': 'comment'})
+
+        assert response.status_code == 201, response.text
+        # 중복 예약 확인, 확정 예약 수 조회, INSERT ... RETURNING
+        assert counter.count == 3
+
+    def test_confirm_reservation(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('2', 'admin 1', 'admin')
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+
+        with QueryCounter() as counter:
+            response = client.put("/api/v1/reservation/confirm_reservation",
+                                  headers={"Authorization": f"Bearer {token}"},
+                                  json={'user_id': 1, 'exam_schedule_id': 1})
+
+        assert response.status_code == 200, response.text
+        # 예약 조회, UPDATE ... RETURNING
+        assert counter.count == 2
+
+    def test_edit_reservation(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+        session = TestingSessionLocal()
+        reservation = Reservation(user_id=1, exam_schedule_id=1)
+        session.add(reservation)
+        session.commit()
+
+        with QueryCounter() as counter:
+            response = client.put(f"/api/v1/reservation/edit_reservation/{reservation.id}",
+                                  headers={"Authorization": f"Bearer {token}"}, json={'comment': 'new comment'})
+
+        assert response.status_code == 200, response.text
+        # 예약의 시험 일정 조회, 예약 조회, UPDATE ... RETURNING
+        assert counter.count == 3
+
+    def test_delete_reservation(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+        session = TestingSessionLocal()
+        reservation = Reservation(user_id=1, exam_schedule_id=1)
+        session.add(reservation)
+        session.commit()
+
+        with QueryCounter() as counter:
+            response = client.delete(f"/api/v1/reservation/delete_reservation/{reservation.id}",
+                                     headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200, response.text
+        # 예약의 시험 일정 조회, 예약 조회, DELETE
+        assert counter.count == 3
+
+    def test_create_exam_schedule(self, test_db_with_users):
+        token = encode_jwt('2', 'admin 1', 'admin')
+        start_time = datetime.datetime.now() + datetime.timedelta(days=10)
+
+        with QueryCounter() as counter:
+            response = client.post("/api/v1/exam_schedule", headers={"Authorization": f"Bearer {token}"}, json={
+                'name': 'new exam',
+                'start_time': start_time.isoformat(),
+                'end_time': (start_time + datetime.timedelta(hours=2)).isoformat()
+            })
+
+        assert response.status_code == 201, response.text
+        assert response.json()['name'] == 'new exam'
+        assert response.json()['id'] == 1
+        # 이름 중복 확인, INSERT ... RETURNING
+        assert counter.count == 2
@@ -0,0 +1,78 @@
+import tests.test_main
+from auth.rate_limiter import InMemoryRateLimitBackend, make_reservation_rate_limiter, login_rate_limiter
+from tests.test_main import client, test_db_with_users, test_db_with_users_and_exam_schedules
+from util import encode_jwt
+
+
+class TestInMemoryRateLimitBackend:
+    def test_consume_should_allow_burst_up_to_capacity(self):
+        backend = InMemoryRateLimitBackend(timer=lambda: 0)
+
+        assert [backend.consume('key', rate=1, capacity=3) for _ in range(3)] == [0, 0, 0]
+        assert backend.consume('key', rate=1, capacity=3) == 1
+
+    def test_consume_should_refill_tokens_over_time(self):
+        now = [0]
+        backend = InMemoryRateLimitBackend(timer=lambda: now[0])
+
+        backend.consume('key', rate=2, capacity=1)
+        assert backend.consume('key', rate=2, capacity=1) == 0.5
+
+        now[0] = 0.5
+        assert backend.consume('key', rate=2, capacity=1) == 0
+
+    def test_consume_should_separate_keys(self):
+        backend = InMemoryRateLimitBackend(timer=lambda: 0)
+
+        backend.consume('a', rate=1, capacity=1)
+
+        assert backend.consume('b', rate=1, capacity=1) == 0
+
+    def test_buckets_should_be_bounded(self):
+        backend = InMemoryRateLimitBackend(max_keys=2, timer=lambda: 0)
+
+        for key in ['a', 'b', 'c']:
+            backend.consume(key, rate=1, capacity=1)
+
+        assert len(backend._buckets) == 2
+
+
+class TestRateLimitedRoutes:
+    def test_make_reservation_should_return_429_without_opening_db_session(self, test_db_with_users_and_exam_schedules,
+                                                                          monkeypatch):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        for _ in range(int(make_reservation_rate_limiter.capacity)):
+            client.post("/api/v1/reservation/make_reservation/1000", headers={"Authorization": f"Bearer {token}"},
+                        json={'comment': ''})
+
+        opened_sessions = []
+        session_local = tests.test_main.TestingSessionLocal
+
+        def counting_session_local():
+            opened_sessions.append(1)
+            return session_local()
+
+        monkeypatch.setattr(tests.test_main, 'TestingSessionLocal', counting_session_local)
+
+        response = client.post("/api/v1/reservation/make_reservation/1000",
+                               headers={"Authorization": f"Bearer {token}"}, json={'comment': ''})
+
+        assert response.status_code == 429, response.text
+        assert response.json()['detail'] == 'Too many requests'
+        assert int(response.headers['Retry-After']) >= 1
+        assert opened_sessions == []
+
+        # 다른 유저는 제한되지 않습니다
+        other_token = encode_jwt('3', 'user 3', 'client')
+        response = client.post("/api/v1/reservation/make_reservation/1000",
+                               headers={"Authorization": f"Bearer {other_token}"}, json={'comment': ''})
+        assert response.status_code == 404, response.text
+
+    def test_login_should_be_limited_by_ip(self, test_db_with_users):
+        for _ in range(login_rate_limiter.capacity):
+            client.post("/api/v1/users/login", json={"user_id": 'invalid id', "password": '789456'})
+
+        response = client.post("/api/v1/users/login", json={"user_id": 'user 1', "password": '789456'})
+
+        assert response.status_code == 429, response.text
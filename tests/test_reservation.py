@@ -43,7 +43,7 @@ class TestReservationRoute:
                                                                                       test_db_with_users_and_exam_schedules):
             token = encode_jwt('1', 'user 1', 'client')
 
-            existing_reservation = Reservation(id=1, user_id='1', exam_schedule_id=1)
+            existing_reservation = Reservation(user_id='1', exam_schedule_id=1)
             session = TestingSessionLocal()
 
             session.add(existing_reservation)
@@ -60,6 +60,24 @@ class TestReservationRoute:
             # Assert that the response status code is 400
             assert response.status_code == 400
 
+        def test_make_reservation_should_allow_reservation_for_other_exam_schedule(
+                self, test_db_with_users_and_exam_schedules):
+            token = encode_jwt('1', 'user 1', 'client')
+
+            session = TestingSessionLocal()
+            session.add(Reservation(user_id=1, exam_schedule_id=1))
+            session.commit()
+
+            response = client.post(
+                "/api/v1/reservation/make_reservation/2",
+                headers={"Authorization": f"Bearer {token}"},
+                json={
+                    'comment': ""
+                }
+            )
+
+            assert response.status_code == 201, response.text
+
         @pytest.mark.parametrize("exam_schedule_id", [1000, 999, -1])  # IDs that don't exist
         def test_make_reservation_exam_schedule_not_found(self, exam_schedule_id, test_db_with_users):
             token = encode_jwt('1', 'user 1', 'client')
@@ -76,6 +94,26 @@ class TestReservationRoute:
 
             assert response.json() == {"detail": "Exam schedule not found"}
 
+        def test_make_reservation_should_return_400_when_exam_schedule_already_started(self, test_db_with_users):
+            token = encode_jwt('1', 'user 1', 'client')
+            now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+            exam_schedule = ExamSchedule(name="Started Exam", start_time=now - datetime.timedelta(minutes=10),
+                                         end_time=now + datetime.timedelta(hours=1))
+            session = TestingSessionLocal()
+            session.add(exam_schedule)
+            session.commit()
+
+            response = client.post(
+                f"/api/v1/reservation/make_reservation/{exam_schedule.id}",
+                headers={"Authorization": f"Bearer {token}"},
+                json={
+                    'comment': ""
+                }
+            )
+
+            assert response.status_code == 400
+            assert response.json() == {"detail": "Exam schedule has already started"}
+
         def test_make_reservation_max_reservation_reached(self, test_db_with_users):
             token = encode_jwt('1', 'user 1', 'client')
 
@@ -99,7 +137,7 @@ class TestReservationRoute:
             test_users = session.query(User).filter(User.id != 1, User.role.contains('client')).all()
 
             for i, user in enumerate(test_users):
-                reservation = Reservation(id=i, user_id=user.id, exam_schedule_id=exam_schedule.id, confirmed=True)
+                reservation = Reservation(user_id=user.id, exam_schedule_id=exam_schedule.id, confirmed=True)
                 session.add(reservation)
 
             session.commit()
@@ -148,6 +186,30 @@ class TestReservationRoute:
             assert response.json()["comment"] == test_comment
             assert response.json()["confirmed"] is False
 
+            created_reservation = session.get(Reservation, (1, exam_schedule.id))
+            assert str(created_reservation.id) == response.json()["id"]
+
+        def test_make_reservation_should_generate_id_per_reservation(self, test_db_with_users_and_exam_schedules):
+            token = encode_jwt('1', 'user 1', 'client')
+
+            session = TestingSessionLocal()
+            session.add(Reservation(user_id=2, exam_schedule_id=2))
+            session.commit()
+
+            response = client.post(
+                "/api/v1/reservation/make_reservation/1",
+                headers={"Authorization": f"Bearer {token}"},
+                json={
+                    'comment': ""
+                }
+            )
+
+            assert response.status_code == 201, response.text
+
+            reservation_ids = [str(reservation.id) for reservation in session.query(Reservation).all()]
+            assert len(set(reservation_ids)) == 2
+            assert response.json()["id"] in reservation_ids
+
 
 class TestGetMyReservation:
     def test_my_reservation_should_return_403_with_no_token(self, test_db):
@@ -361,7 +423,7 @@ class TestGetUserReservations:
             test_exam_schedule_id = 1
 
             session = TestingSessionLocal()
-            reservation = Reservation(id=1, user_id=test_user_id, exam_schedule_id=test_exam_schedule_id, confirmed=True)
+            reservation = Reservation(user_id=test_user_id, exam_schedule_id=test_exam_schedule_id, confirmed=True)
             session.add(reservation)
             session.flush()
 
@@ -385,7 +447,7 @@ class TestGetUserReservations:
             test_exam_schedule_id = 1
 
             session = TestingSessionLocal()
-            reservation = Reservation(id=1, user_id=test_user_id, exam_schedule_id=test_exam_schedule_id, confirmed=False)
+            reservation = Reservation(user_id=test_user_id, exam_schedule_id=test_exam_schedule_id, confirmed=False)
             session.add(reservation)
             session.flush()
 
@@ -442,7 +504,7 @@ class TestGetUserReservations:
             def test_edit_reservation_should_return_400_when_edit_confirmed_reservation(self,
                                                                                         test_db_with_users_and_exam_schedules):
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, comment="Old Comment", confirmed=True)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, comment="Old Comment", confirmed=True)
                 session.add(reservation)
                 session.flush()
 
@@ -460,7 +522,7 @@ class TestGetUserReservations:
 
             def test_edit_reservation_client_editing_other_user_reservation(self, test_db_with_users_and_exam_schedules):
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=2, exam_schedule_id=1, comment="Old Comment", confirmed=False)
+                reservation = Reservation(user_id=2, exam_schedule_id=1, comment="Old Comment", confirmed=False)
                 session.add(reservation)
                 session.flush()
 
@@ -478,7 +540,7 @@ class TestGetUserReservations:
 
             def test_edit_reservation_success_for_client(self, test_db_with_users_and_exam_schedules):
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, comment="Old Comment", confirmed=False)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, comment="Old Comment", confirmed=False)
                 session.add(reservation)
                 session.flush()
 
@@ -501,7 +563,7 @@ class TestGetUserReservations:
 
             def test_edit_reservation_success_for_admin(self, test_db_with_users_and_exam_schedules):
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, comment="Old Comment", confirmed=False)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, comment="Old Comment", confirmed=False)
                 session.add(reservation)
                 session.flush()
 
@@ -559,7 +621,7 @@ class TestGetUserReservations:
                 token = encode_jwt('1', 'user 1', 'client')
 
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=2, exam_schedule_id=1, confirmed=False)
+                reservation = Reservation(user_id=2, exam_schedule_id=1, confirmed=False)
                 session.add(reservation)
                 session.flush()
 
@@ -577,7 +639,7 @@ class TestGetUserReservations:
                 token = encode_jwt('1', 'user 1', 'client')
 
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, confirmed=True)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, confirmed=True)
                 session.add(reservation)
                 session.flush()
 
@@ -595,7 +657,7 @@ class TestGetUserReservations:
                 token = encode_jwt('2', 'admin 1', 'admin')
 
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, confirmed=True)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, confirmed=True)
                 session.add(reservation)
                 session.flush()
 
@@ -612,7 +674,7 @@ class TestGetUserReservations:
                 token = encode_jwt('1', 'user 1', 'client')
 
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, confirmed=False)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, confirmed=False)
                 session.add(reservation)
                 session.flush()
 
@@ -633,7 +695,7 @@ class TestGetUserReservations:
                 token = encode_jwt('2', 'admin 1', 'admin')
 
                 session = TestingSessionLocal()
-                reservation = Reservation(id=1, user_id=1, exam_schedule_id=1, confirmed=False)
+                reservation = Reservation(user_id=1, exam_schedule_id=1, confirmed=False)
                 session.add(reservation)
                 session.flush()
 
@@ -649,3 +711,88 @@ class TestGetUserReservations:
                 session.expire_all()
                 deleted_reservation = session.get(Reservation, (1,1))
                 assert deleted_reservation is None
+
+
+class TestGetScheduleReservations:
+    def test_get_schedule_reservations_should_return_403_with_no_token(self, test_db):
+        response = client.get(
+            "/api/v1/reservation/by_schedule/1",
+        )
+
+        assert response.status_code == 403, response.text
+
+    def test_get_schedule_reservations_should_return_403_for_client(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.get(
+            "/api/v1/reservation/by_schedule/1",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 403, response.text
+        assert response.json()["detail"] == "Only admins can view exam schedule reservations"
+
+    def test_get_schedule_reservations_should_return_404_when_exam_schedule_not_found(self, test_db_with_users):
+        token = encode_jwt('2', 'admin 1', 'admin')
+
+        response = client.get(
+            "/api/v1/reservation/by_schedule/999",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 404, response.text
+        assert response.json()["detail"] == "Exam schedule not found"
+
+    def test_get_schedule_reservations_should_paginate_with_cursor(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('2', 'admin 1', 'admin')
+
+        session = TestingSessionLocal()
+        for user_id in range(3, 8):
+            session.add(User(id=user_id, user_id=f'user {user_id}', password='123123123', role='client'))
+            session.add(Reservation(user_id=user_id, exam_schedule_id=1, confirmed=user_id % 2 == 0))
+        session.add(Reservation(user_id=3, exam_schedule_id=2))
+        session.commit()
+
+        response = client.get(
+            "/api/v1/reservation/by_schedule/1?limit=2",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert [item['user_id'] for item in data['reservations']] == [3, 4]
+        assert data['next_cursor'] == 4
+
+        response = client.get(
+            f"/api/v1/reservation/by_schedule/1?limit=2&after={data['next_cursor']}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        data = response.json()
+        assert [item['user_id'] for item in data['reservations']] == [5, 6]
+
+        response = client.get(
+            f"/api/v1/reservation/by_schedule/1?limit=2&after={data['next_cursor']}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        data = response.json()
+        assert [item['user_id'] for item in data['reservations']] == [7]
+        assert data['next_cursor'] is None
+
+    def test_get_schedule_reservations_should_filter_by_confirmed(self, test_db_with_users_and_exam_schedules):
+        token = encode_jwt('2', 'admin 1', 'admin')
+
+        session = TestingSessionLocal()
+        for user_id in range(3, 8):
+            session.add(User(id=user_id, user_id=f'user {user_id}', password='123123123', role='client'))
+            session.add(Reservation(user_id=user_id, exam_schedule_id=1, confirmed=user_id % 2 == 0))
+        session.commit()
+
+        response = client.get(
+            "/api/v1/reservation/by_schedule/1?confirmed=true",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert [item['user_id'] for item in data['reservations']] == [4, 6]
+        assert all(item['confirmed'] for item in data['reservations'])
@@ -0,0 +1,130 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from db.models import Reservation
+from service.reservation_batch_writer import ReservationBatchWriter, ReservationBatchWriterStopped, \
+    _PendingReservation, reservation_batch_writer
+from service.slot_inventory import BookResult
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal, QueryCounter
+from util import encode_jwt, generate_uuid7
+
+
+def _pending(user_id: int, exam_schedule_id: int, capacity: int = 10) -> _PendingReservation:
+    return _PendingReservation({'id': generate_uuid7(), 'user_id': user_id, 'exam_schedule_id': exam_schedule_id,
+                                'comment': '', 'confirmed': False}, capacity)
+
+
+@pytest.fixture()
+def enabled_batch_writer(monkeypatch):
+    monkeypatch.setattr(reservation_batch_writer, 'enabled', True)
+    monkeypatch.setattr(reservation_batch_writer, 'session_factory', TestingSessionLocal)
+    reservation_batch_writer.start()
+    yield reservation_batch_writer
+    reservation_batch_writer.stop()
+
+
+class TestReservationBatchWriter:
+    def test_write_batch_should_resolve_each_result_in_one_transaction(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.add(Reservation(user_id=3, exam_schedule_id=2, confirmed=True))
+        session.commit()
+        writer = ReservationBatchWriter(session_factory=TestingSessionLocal)
+        batch = [_pending(1, 1), _pending(2, 1), _pending(2, 1), _pending(4, 2, capacity=1)]
+
+        with QueryCounter() as counter:
+            writer.write_batch(batch)
+
+        # 중복 예약 조회, 확정 예약 수 조회, INSERT
+        assert counter.count == 3
+        assert [pending.future.result()[0] for pending in batch] == [BookResult.DUPLICATE, BookResult.BOOKED,
+                                                                      BookResult.DUPLICATE, BookResult.FULL]
+        assert batch[1].future.result()[1].id == batch[1].values['id']
+        assert session.query(Reservation).count() == 3
+
+    def test_submit_should_coalesce_concurrent_reservations(self, test_db_with_users_and_exam_schedules):
+        writer = ReservationBatchWriter(session_factory=TestingSessionLocal, window_ms=200)
+        written_batches = []
+        original_write_batch = writer.write_batch
+
+        def write_batch(batch):
+            written_batches.append(len(batch))
+            original_write_batch(batch)
+
+        writer.write_batch = write_batch
+
+        futures = [writer.submit(user_id, 1, '', capacity=10) for user_id in range(1, 6)]
+        results = [future.result(timeout=5) for future in futures]
+        writer.stop()
+
+        assert written_batches == [5]
+        assert all(result == BookResult.BOOKED for result, _ in results)
+
+    def test_write_batch_should_fail_on_non_unique_violation(self, test_db_with_users_and_exam_schedules):
+        # NOT NULL 위반은 중복 예약이 아니므로 DUPLICATE로 응답하지 않습니다
+        writer = ReservationBatchWriter(session_factory=TestingSessionLocal)
+        batch = [_pending(1, 1), _pending(None, 1)]
+
+        writer.write_batch(batch)
+
+        for pending in batch:
+            with pytest.raises(IntegrityError):
+                pending.future.result()
+        assert TestingSessionLocal().query(Reservation).count() == 0
+
+    def test_write_batch_should_set_exception_when_database_fails(self):
+        def broken_session_factory():
+            raise RuntimeError('database is down')
+
+        writer = ReservationBatchWriter(session_factory=broken_session_factory)
+        pending = _pending(1, 1)
+
+        writer.write_batch([pending])
+
+        with pytest.raises(RuntimeError):
+            pending.future.result()
+
+    def test_submit_should_be_rejected_after_stop(self, test_db_with_users_and_exam_schedules):
+        writer = ReservationBatchWriter(session_factory=TestingSessionLocal)
+        submitted = writer.submit(1, 1, '', capacity=10)
+        writer.stop()
+
+        rejected = writer.submit(2, 1, '', capacity=10)
+
+        # 종료 전에 받은 예약은 저장되고, 이후의 예약은 기다리지 않고 바로 실패합니다
+        assert submitted.result(timeout=5)[0] == BookResult.BOOKED
+        with pytest.raises(ReservationBatchWriterStopped):
+            rejected.result(timeout=0)
+
+        writer.start()
+        assert writer.submit(2, 1, '', capacity=10).result(timeout=5)[0] == BookResult.BOOKED
+        writer.stop()
+
+
+class TestReservationBatchWriterRoute:
+    def test_make_reservation_should_use_batch_writer(self, test_db_with_users_and_exam_schedules,
+                                                      enabled_batch_writer):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': 'comment'})
+        assert response.status_code == 201, response.text
+        assert response.json()['comment'] == 'comment'
+
+        session = TestingSessionLocal()
+        assert str(session.query(Reservation).one().id) == response.json()['id']
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 400, response.text
+        assert response.json()['detail'] == "User already has a reservation for this exam schedule"
+
+    def test_make_reservation_should_return_503_when_batch_writer_is_stopped(
+            self, test_db_with_users_and_exam_schedules, enabled_batch_writer):
+        enabled_batch_writer.stop()
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers={"Authorization": f"Bearer {token}"},
+                               json={'comment': 'comment'})
+
+        assert response.status_code == 503, response.text
+        assert TestingSessionLocal().query(Reservation).count() == 0
@@ -0,0 +1,175 @@
+import random
+
+import pytest
+
+from cache.roaring_bitmap import RoaringBitmap, ARRAY_CONTAINER_MAX_SIZE
+from db.models import Reservation
+from service.reservation_bitmap_index import ReservationBitmapIndex, reservation_bitmap_index
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal, QueryCounter, \
+    enabled_invalidation_bus
+from util import encode_jwt
+
+
+@pytest.fixture()
+def enabled_bitmap_index(monkeypatch, enabled_invalidation_bus):
+    monkeypatch.setattr(reservation_bitmap_index, 'enabled', True)
+    monkeypatch.setattr(reservation_bitmap_index, 'session_factory', TestingSessionLocal)
+    return reservation_bitmap_index
+
+
+class TestRoaringBitmap:
+    def test_should_behave_like_set(self):
+        values = random.Random(0).sample(range(1 << 20), 20000)
+        bitmap = RoaringBitmap(values[:10000])
+        expected = set(values[:10000])
+
+        for value in values[10000:15000]:
+            bitmap.add(value)
+            expected.add(value)
+        for value in values[:5000]:
+            bitmap.discard(value)
+            expected.discard(value)
+
+        assert len(bitmap) == len(expected)
+        assert list(bitmap) == sorted(expected)
+        assert all((value in bitmap) == (value in expected) for value in values)
+
+    def test_dense_values_should_use_bitmap_container(self):
+        bitmap = RoaringBitmap(range(1, 50011))
+
+        # 유저 id 50,010개를 1개당 1bit로 저장합니다
+        assert bitmap.nbytes() == 8192
+        for value in range(ARRAY_CONTAINER_MAX_SIZE + 1, 50011):
+            bitmap.discard(value)
+        assert bitmap.nbytes() == ARRAY_CONTAINER_MAX_SIZE * 2
+        assert list(bitmap) == list(range(1, ARRAY_CONTAINER_MAX_SIZE + 1))
+
+    def test_membership_should_match_each_container(self):
+        # 홀수 유저 id 25,005개는 bitmap container, 큰 id 3개는 array container에 저장됩니다
+        bitmap = RoaringBitmap([*range(1, 50011, 2), 1 << 20, (1 << 20) + 2, 1 << 30])
+        user_ids = random.Random(0).sample(range(1, 50011), 10000)
+
+        assert all((user_id in bitmap) == (user_id % 2 == 1) for user_id in user_ids)
+        assert (1 << 20) + 2 in bitmap
+        assert (1 << 20) + 1 not in bitmap
+        assert 1 << 30 in bitmap
+        assert (1 << 30) - 1 not in bitmap
+
+
+class TestReservationBitmapIndex:
+    def test_start_should_load_all_reservations(self, test_db_with_users_and_exam_schedules,
+                                                enabled_invalidation_bus):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+        index = ReservationBitmapIndex(session_factory=TestingSessionLocal, enabled=True)
+        index.start()
+
+        with QueryCounter() as counter:
+            assert index.contains(session, 1, 1)
+            # 예약이 없는 시험 일정은 처음 조회할 때 DB에서 읽습니다
+            assert not index.contains(session, 2, 1)
+            assert not index.contains(session, 2, 1)
+
+        assert counter.count == 1
+
+    def test_add_and_discard_should_update_loaded_bitmaps(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        index = ReservationBitmapIndex(session_factory=TestingSessionLocal, enabled=True)
+
+        assert index.filter_unreserved(session, [1, 2], 1) == [1, 2]
+        index.add(1, 1)
+        assert index.filter_unreserved(session, [1, 2], 1) == [2]
+        index.discard(1, 1)
+        assert index.contains(session, 1, 1) is False
+
+    def test_changes_during_load_should_not_be_lost(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        index = ReservationBitmapIndex(session_factory=TestingSessionLocal, enabled=True)
+
+        def read_keys():
+            # DB를 읽은 뒤 다른 요청이 예약을 만든 경우
+            index.add(1, 2)
+            return [(1, 1)]
+
+        index._load(read_keys, [1])
+
+        assert index.contains(session, 1, 1)
+        assert index.contains(session, 1, 2)
+
+    def test_reset_after_load_should_not_fail_lookup(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+        index = ReservationBitmapIndex(session_factory=TestingSessionLocal, enabled=True)
+        ensure_loaded = index._ensure_loaded
+
+        def ensure_loaded_then_reset(*args):
+            bitmaps = ensure_loaded(*args)
+            # bitmap을 만든 직후 보관 작업이나 다른 worker의 event로 bitmap이 지워진 경우
+            index.reset()
+            return bitmaps
+
+        index._ensure_loaded = ensure_loaded_then_reset
+
+        assert index.contains(session, 1, 1)
+        assert index.filter_unreserved(session, [1, 2], 1) == [2]
+
+
+class TestReservationBitmapIndexRoute:
+    def test_make_reservation_should_check_duplicate_without_query(self, test_db_with_users_and_exam_schedules,
+                                                                   enabled_bitmap_index):
+        token = encode_jwt('1', 'user 1', 'client')
+        client.post("/api/v1/reservation/make_reservation/1", headers={"Authorization": f"Bearer {token}"},
+                    json={'comment': 'comment'})
+
+        with QueryCounter() as counter:
+            response = client.post("/api/v1/reservation/make_reservation/1",
+                                   headers={"Authorization": f"Bearer {token}"}, json={'comment': 'comment'})
+
+        assert response.status_code == 400, response.text
+        # 시험 일정도 cache에서 확인합니다
+        assert counter.count == 0
+
+    def test_get_schedules_should_exclude_reserved_schedules(self, test_db_with_users_and_exam_schedules,
+                                                             enabled_bitmap_index):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+        assert len(client.get("/api/v1/exam_schedule", headers=headers).json()) == 1
+
+        client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': 'comment'})
+
+        assert client.get("/api/v1/exam_schedule", headers=headers).json() == []
+
+    def test_deleted_reservation_should_be_available_again(self, test_db_with_users_and_exam_schedules,
+                                                           enabled_bitmap_index):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+        reservation_id = client.post("/api/v1/reservation/make_reservation/1", headers=headers,
+                                     json={'comment': 'comment'}).json()['id']
+
+        client.delete(f"/api/v1/reservation/delete_reservation/{reservation_id}", headers=headers)
+
+        assert client.post("/api/v1/reservation/make_reservation/1", headers=headers,
+                           json={'comment': 'comment'}).status_code == 201
+
+    def test_should_check_database_without_invalidation_bus(self, test_db_with_users_and_exam_schedules,
+                                                            monkeypatch):
+        monkeypatch.setattr(reservation_bitmap_index, 'enabled', True)
+        monkeypatch.setattr(reservation_bitmap_index, 'session_factory', TestingSessionLocal)
+        session = TestingSessionLocal()
+        for exam_schedule_id in (1, 2):
+            reservation_bitmap_index.contains(session, exam_schedule_id, 1)
+        # 다른 worker에서 생성되어 이 worker의 bitmap에는 없는 예약과, 삭제되어 bitmap에만 남아있는 예약
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+        reservation_bitmap_index.add(2, 1)
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers={"Authorization": f"Bearer {token}"},
+                               json={'comment': 'comment'})
+        assert response.status_code == 400, response.text
+
+        response = client.post("/api/v1/reservation/make_reservation/2", headers={"Authorization": f"Bearer {token}"},
+                               json={'comment': 'comment'})
+        assert response.status_code == 201, response.text
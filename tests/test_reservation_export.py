@@ -0,0 +1,73 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+
+from db.models import Reservation, ReservationArchive
+from service.reservation_export import escape_csv_formula
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal
+from util import encode_jwt, generate_uuid7
+
+ADMIN_HEADERS = {"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"}
+
+
+def _add_reservations():
+    session = TestingSessionLocal()
+    session.add(Reservation(user_id=1, exam_schedule_id=1, comment='코멘트, "따옴표"', confirmed=True))
+    session.add(Reservation(user_id=2, exam_schedule_id=1, comment='=HYPERLINK("http://example.com")'))
+    session.add(ReservationArchive(id=generate_uuid7(), user_id=1, exam_schedule_id=1, comment='archived',
+                                   confirmed=True, archived_at=datetime.datetime.now()))
+    session.add(Reservation(user_id=1, exam_schedule_id=2))
+    session.commit()
+
+
+class TestExportScheduleReservations:
+    def test_should_stream_csv_with_login_id(self, test_db_with_users_and_exam_schedules):
+        _add_reservations()
+
+        response = client.get("/api/v1/reservation/export/1", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 200, response.text
+        assert response.headers['content-type'].startswith('text/csv')
+        assert response.headers['content-disposition'] == 'attachment; filename="reservations_1.csv"'
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [(row['user_id'], row['login_id'], row['comment'], row['confirmed'], row['archived']) for row in rows] \
+               == [('1', 'user 1', '코멘트, "따옴표"', 'True', 'False'),
+                   ('1', 'user 1', 'archived', 'True', 'True'),
+                   # 스프레드시트에서 수식으로 실행되지 않도록 escape 합니다
+                   ('2', 'admin 1', '\'=HYPERLINK("http://example.com")', 'False', 'False')]
+
+    def test_should_stream_gzipped_ndjson(self, test_db_with_users_and_exam_schedules):
+        _add_reservations()
+
+        response = client.get("/api/v1/reservation/export/1", headers=ADMIN_HEADERS,
+                              params={'format': 'ndjson', 'gzip': 'true'})
+
+        assert response.status_code == 200, response.text
+        assert response.headers['content-type'] == 'application/gzip'
+        lines = gzip.decompress(response.content).decode('utf-8').splitlines()
+        assert [(json.loads(line)['login_id'], json.loads(line)['archived']) for line in lines] \
+               == [('user 1', False), ('user 1', True), ('admin 1', False)]
+        # NDJSON은 스프레드시트로 열지 않으므로 값을 그대로 내보냅니다
+        assert json.loads(lines[2])['comment'] == '=HYPERLINK("http://example.com")'
+
+    def test_escape_csv_formula(self):
+        assert [escape_csv_formula(value) for value in ('=1+1', '+1', '-1', '@SUM(A1)', '\tx', '\rx', 'a=1', '')] \
+               == ["'=1+1", "'+1", "'-1", "'@SUM(A1)", "'\tx", "'\rx", 'a=1', '']
+
+    def test_should_return_only_header_for_schedule_without_reservations(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/reservation/export/2", headers=ADMIN_HEADERS)
+
+        assert response.text == 'reservation_id,user_id,login_id,comment,confirmed,archived\n'
+
+    def test_should_return_404_when_exam_schedule_not_found(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/reservation/export/1000", headers=ADMIN_HEADERS)
+
+        assert response.status_code == 404
+
+    def test_should_return_403_for_client(self, test_db_with_users_and_exam_schedules):
+        response = client.get("/api/v1/reservation/export/1",
+                              headers={"Authorization": f"Bearer {encode_jwt('1', 'user 1', 'client')}"})
+
+        assert response.status_code == 403
@@ -0,0 +1,132 @@
+import pytest
+
+from cache.invalidation_bus import InvalidationEvent, RESERVATION
+from db.models import Reservation
+from service.reservation_batch_writer import reservation_batch_writer
+from service.slot_inventory import SlotInventory, BookResult, slot_inventory
+from tests.test_main import client, test_db_with_users_and_exam_schedules, TestingSessionLocal, QueryCounter
+from util import encode_jwt
+
+
+@pytest.fixture()
+def enabled_slot_inventory(monkeypatch):
+    monkeypatch.setattr(slot_inventory, 'enabled', True)
+    monkeypatch.setattr(reservation_batch_writer, 'session_factory', TestingSessionLocal)
+    reservation_batch_writer.start()
+    yield slot_inventory
+    reservation_batch_writer.stop()
+
+
+class TestSlotInventory:
+    def test_try_book_should_load_state_from_reservations_table(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1, confirmed=True))
+        session.commit()
+        inventory = SlotInventory()
+
+        assert inventory.try_book(session, 1, 1, capacity=2) == BookResult.DUPLICATE
+        assert inventory.try_book(session, 1, 2, capacity=1) == BookResult.FULL
+        assert inventory.try_book(session, 1, 2, capacity=2) == BookResult.BOOKED
+
+    def test_release_should_allow_booking_again(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        inventory = SlotInventory()
+        inventory.try_book(session, 1, 1, capacity=1)
+
+        inventory.release(1, 1, confirmed=False)
+
+        assert inventory.try_book(session, 1, 1, capacity=1) == BookResult.BOOKED
+
+    def test_try_book_should_reload_when_unloaded_after_loading(self, test_db_with_users_and_exam_schedules):
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+        inventory = SlotInventory()
+        ensure_loaded = inventory._ensure_loaded
+        unloaded = []
+
+        def ensure_loaded_then_unload(*args):
+            ensure_loaded(*args)
+            if not unloaded:
+                # 불러온 직후 다른 worker의 event로 inventory가 지워진 경우
+                inventory.handle_invalidation(InvalidationEvent(RESERVATION, exam_schedule_id=1))
+                unloaded.append(True)
+
+        inventory._ensure_loaded = ensure_loaded_then_unload
+
+        assert inventory.try_book(session, 1, 1, capacity=1) == BookResult.DUPLICATE
+        assert unloaded
+
+
+class TestSlotInventoryRoute:
+    def test_make_reservation_should_save_before_responding(self, test_db_with_users_and_exam_schedules,
+                                                            enabled_slot_inventory):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': 'comment'})
+
+        assert response.status_code == 201, response.text
+        session = TestingSessionLocal()
+        saved_reservation = session.query(Reservation).filter_by(user_id=1, exam_schedule_id=1).one()
+        assert str(saved_reservation.id) == response.json()['id']
+
+    def test_make_reservation_should_reject_duplicate_without_query(self, test_db_with_users_and_exam_schedules,
+                                                                    enabled_slot_inventory):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 201, response.text
+
+        with QueryCounter() as counter:
+            response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+
+        assert response.status_code == 400, response.text
+        assert response.json()['detail'] == "User already has a reservation for this exam schedule"
+        assert counter.count == 0
+
+    def test_make_reservation_should_release_slot_when_saving_fails(self, test_db_with_users_and_exam_schedules,
+                                                                    enabled_slot_inventory):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+        reservation_batch_writer.stop()
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 503, response.text
+        assert TestingSessionLocal().query(Reservation).count() == 0
+
+        # 저장하지 못한 예약은 메모리에서도 지워져, 다시 요청하면 예약할 수 있습니다
+        reservation_batch_writer.start()
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 201, response.text
+
+    def test_make_reservation_should_keep_database_as_source_of_truth(self, test_db_with_users_and_exam_schedules,
+                                                                      enabled_slot_inventory):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+        enabled_slot_inventory.try_book(TestingSessionLocal(), 1, 3, capacity=10)
+
+        # 메모리 상태를 만든 뒤 다른 worker가 같은 예약을 저장한 경우
+        session = TestingSessionLocal()
+        session.add(Reservation(user_id=1, exam_schedule_id=1))
+        session.commit()
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+
+        assert response.status_code == 400, response.text
+        assert response.json()['detail'] == "User already has a reservation for this exam schedule"
+        assert session.query(Reservation).filter_by(user_id=1, exam_schedule_id=1).count() == 1
+
+    def test_delete_reservation_should_allow_booking_again(self, test_db_with_users_and_exam_schedules,
+                                                           enabled_slot_inventory):
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 201, response.text
+
+        response = client.delete(f"/api/v1/reservation/delete_reservation/{response.json()['id']}", headers=headers)
+        assert response.status_code == 200, response.text
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 201, response.text
@@ -0,0 +1,141 @@
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from telemetry.request_context import current_route
+from telemetry.slow_query_log import SlowQueryLog, _is_read_only
+
+
+@pytest.fixture()
+def sqlite_engine(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "slow_query.db"}')
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE users (id INTEGER PRIMARY KEY, user_id TEXT)'))
+        conn.execute(text("INSERT INTO users (id, user_id) VALUES (1, 'user 1')"))
+    yield engine
+    engine.dispose()
+
+
+def _read_records(path) -> list:
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+class TestSlowQueryLog:
+    def test_slow_query_should_be_written_with_route_parameters_and_plan(self, sqlite_engine, tmp_path):
+        path = tmp_path / 'slow_queries.jsonl'
+        slow_query_log = SlowQueryLog(str(path), threshold_ms=0)
+        slow_query_log.instrument(sqlite_engine)
+
+        token = current_route.set('GET /api/v1/users/')
+        try:
+            with sqlite_engine.connect() as conn:
+                conn.execute(text('SELECT * FROM users WHERE user_id LIKE :user_id'), {'user_id': '%user%'})
+        finally:
+            current_route.reset(token)
+        slow_query_log.flush()
+        slow_query_log.close()
+
+        records = _read_records(path)
+        assert len(records) == 1
+        assert records[0]['route'] == 'GET /api/v1/users/'
+        assert records[0]['statement'] == 'SELECT * FROM users WHERE user_id LIKE ?'
+        assert records[0]['parameters'] == ['%user%']
+        assert any('SCAN' in step for step in records[0]['plan'])
+
+    def test_explain_should_not_apply_write_statement(self, sqlite_engine, tmp_path):
+        path = tmp_path / 'slow_queries.jsonl'
+        slow_query_log = SlowQueryLog(str(path), threshold_ms=0)
+        slow_query_log.instrument(sqlite_engine)
+
+        with sqlite_engine.begin() as conn:
+            conn.execute(text("DELETE FROM users WHERE id = :id"), {'id': 2})
+        slow_query_log.flush()
+        slow_query_log.close()
+
+        assert [record['statement'] for record in _read_records(path)] == ['DELETE FROM users WHERE id = ?']
+        with sqlite_engine.connect() as conn:
+            assert conn.execute(text('SELECT count(*) FROM users')).scalar() == 1
+
+    def test_same_statement_should_be_explained_once(self, sqlite_engine, tmp_path):
+        path = tmp_path / 'slow_queries.jsonl'
+        slow_query_log = SlowQueryLog(str(path), threshold_ms=0)
+        slow_query_log.instrument(sqlite_engine)
+
+        with sqlite_engine.connect() as conn:
+            for user_id in (1, 2):
+                conn.execute(text('SELECT * FROM users WHERE id = :id'), {'id': user_id})
+        slow_query_log.flush()
+        slow_query_log.close()
+
+        records = _read_records(path)
+        assert len(records) == 2
+        assert sum('plan' in record for record in records) == 1
+        assert sum(record.get('explain_skipped') == 'explained recently' for record in records) == 1
+
+    def test_explain_should_be_skipped_when_queue_is_full(self, sqlite_engine, tmp_path):
+        path = tmp_path / 'slow_queries.jsonl'
+        slow_query_log = SlowQueryLog(str(path), threshold_ms=0, queue_size=1)
+        slow_query_log.instrument(sqlite_engine)
+        started, release = threading.Event(), threading.Event()
+        explain_and_write = slow_query_log._explain_and_write
+
+        def blocked_explain_and_write(*args):
+            started.set()
+            release.wait(5)
+            explain_and_write(*args)
+
+        slow_query_log._explain_and_write = blocked_explain_and_write
+
+        with sqlite_engine.connect() as conn:
+            conn.execute(text('SELECT id FROM users'))
+            started.wait(5)
+            conn.execute(text('SELECT user_id FROM users'))
+            conn.execute(text('SELECT * FROM users'))
+        release.set()
+        slow_query_log.flush()
+        slow_query_log.close()
+
+        records = {record['statement']: record for record in _read_records(path)}
+        assert 'plan' in records['SELECT id FROM users']
+        assert 'plan' in records['SELECT user_id FROM users']
+        assert records['SELECT * FROM users']['explain_skipped'] == 'explain queue is full'
+
+    @pytest.mark.parametrize('statement, read_only', [
+        ('SELECT * FROM reservations WHERE id = %(id)s', True),
+        ('  select count(*) from reservations', True),
+        ('SELECT * FROM reservations FOR UPDATE', False),
+        ('SELECT pg_notify(%(channel)s, %(payload)s)', False),
+        ('SELECT pg_try_advisory_xact_lock(%(key)s)', False),
+        ('UPDATE reservations SET confirmed = true', False),
+        ('WITH deleted AS (DELETE FROM reservations RETURNING *) SELECT * FROM deleted', False),
+    ])
+    def test_only_read_only_select_should_be_analyzed(self, statement, read_only):
+        assert _is_read_only(statement) == read_only
+
+    def test_fast_query_should_not_be_written(self, sqlite_engine, tmp_path):
+        path = tmp_path / 'slow_queries.jsonl'
+        slow_query_log = SlowQueryLog(str(path), threshold_ms=60 * 1000)
+        slow_query_log.instrument(sqlite_engine)
+
+        with sqlite_engine.connect() as conn:
+            conn.execute(text('SELECT * FROM users'))
+        slow_query_log.flush()
+        slow_query_log.close()
+
+        assert not path.exists()
+
+    def test_log_file_should_rotate(self, sqlite_engine, tmp_path):
+        path = tmp_path / 'slow_queries.jsonl'
+        slow_query_log = SlowQueryLog(str(path), threshold_ms=0, explain=False, max_bytes=300, backup_count=2)
+        slow_query_log.instrument(sqlite_engine)
+
+        with sqlite_engine.connect() as conn:
+            for _ in range(10):
+                conn.execute(text('SELECT * FROM users'))
+        slow_query_log.close()
+
+        assert (tmp_path / 'slow_queries.jsonl.1').exists()
+        assert not (tmp_path / 'slow_queries.jsonl.3').exists()
@@ -0,0 +1,83 @@
+import pytest
+
+pytest.importorskip('opentelemetry.sdk')
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import ALWAYS_OFF
+
+from telemetry.tracing import instrument_engine, set_tracer_provider, trace_methods
+from tests.test_main import client, engine, test_db_with_users_and_exam_schedules
+from util import encode_jwt
+
+
+@pytest.fixture(scope='module', autouse=True)
+def instrumented_engine():
+    instrument_engine(engine)
+
+
+@pytest.fixture()
+def span_exporter():
+    exporter = InMemorySpanExporter()
+    tracer_provider = TracerProvider()
+    tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+    set_tracer_provider(tracer_provider)
+    yield exporter
+    set_tracer_provider(None)
+
+
+class TestTracing:
+    def test_make_reservation_should_record_nested_spans(self, test_db_with_users_and_exam_schedules,
+                                                         span_exporter):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.post("/api/v1/reservation/make_reservation/1",
+                               headers={"Authorization": f"Bearer {token}"}, json={'comment': ''})
+
+        assert response.status_code == 201, response.text
+        spans = {span.name: span for span in span_exporter.get_finished_spans()}
+        route_span = spans['POST /api/v1/reservation/make_reservation/{exam_schedule_id}']
+        service_span = spans['ReservationService.make_reservation']
+        repository_span = spans['ReservationRepository.create']
+
+        assert route_span.attributes['http.status_code'] == 201
+        assert spans['JWTBearer'].parent.span_id == route_span.context.span_id
+        assert service_span.parent.span_id == route_span.context.span_id
+        assert repository_span.parent.span_id == service_span.context.span_id
+        assert spans['INSERT'].parent.span_id == repository_span.context.span_id
+        assert spans['INSERT'].attributes['db.statement'].startswith('INSERT INTO reservations')
+
+    def test_http_error_should_be_recorded_as_status_code(self, test_db_with_users_and_exam_schedules,
+                                                          span_exporter):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.post("/api/v1/reservation/make_reservation/100",
+                               headers={"Authorization": f"Bearer {token}"}, json={'comment': ''})
+
+        assert response.status_code == 404, response.text
+        route_span = next(span for span in span_exporter.get_finished_spans() if span.name.startswith('POST'))
+        assert route_span.attributes['http.status_code'] == 404
+        assert route_span.status.is_ok
+
+    def test_unsampled_request_should_not_export_spans(self, test_db_with_users_and_exam_schedules):
+        exporter = InMemorySpanExporter()
+        tracer_provider = TracerProvider(sampler=ALWAYS_OFF)
+        tracer_provider.add_span_processor(SimpleSpanProcessor(exporter))
+        set_tracer_provider(tracer_provider)
+        try:
+            response = client.get("/api/v1/exam_schedule",
+                                  headers={"Authorization": f"Bearer {encode_jwt('2', 'admin 1', 'admin')}"})
+        finally:
+            set_tracer_provider(None)
+
+        assert response.status_code == 200, response.text
+        assert exporter.get_finished_spans() == ()
+
+    def test_trace_methods_should_not_record_without_tracer(self):
+        @trace_methods
+        class Repository:
+            def get(self):
+                return 'value'
+
+        assert Repository().get() == 'value'
@@ -1,4 +1,6 @@
-from util import encode_jwt, decode_jwt
+import time
+
+from util import encode_jwt, decode_jwt, generate_uuid7
 
 
 class TestUtil:
@@ -9,3 +11,14 @@ class TestUtil:
         assert payload['id'] == '1'
         assert payload['user_id'] == 'user 1'
         assert payload['role'] == 'client'
+
+    def test_generate_uuid7(self):
+        first = generate_uuid7()
+        time.sleep(0.002)
+        second = generate_uuid7()
+
+        assert first.version == 7
+        assert first != second
+        # 앞의 48bit timestamp 때문에 나중에 생성된 값이 더 큽니다
+        assert first < second
+        assert abs((first.int >> 80) - time.time_ns() // 1_000_000) < 1000
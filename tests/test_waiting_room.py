@@ -0,0 +1,150 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from service.waiting_room import WaitingRoom, waiting_room
+from tests.test_main import client, test_db_with_users, test_db_with_users_and_exam_schedules
+from util import encode_jwt
+
+BENCHMARK_DATABASE_URL = os.environ.get('BENCHMARK_DATABASE_URL', '')
+
+
+class TestWaitingRoom:
+    def test_issue_ticket_should_admit_burst_then_rate(self):
+        now = [0]
+        room = WaitingRoom(admit_per_second=2, burst=1, timer=lambda: now[0])
+
+        statuses = [room.issue_ticket(1, user_id) for user_id in range(1, 5)]
+
+        assert [status.ticket for status in statuses] == [1, 2, 3, 4]
+        assert [status.admitted for status in statuses] == [True, False, False, False]
+        assert statuses[3].position == 3
+        assert statuses[3].estimated_wait_seconds == 2
+
+        now[0] = 1
+        assert [room.is_admitted(1, user_id) for user_id in range(1, 5)] == [True, True, True, False]
+
+    def test_issue_ticket_should_return_same_ticket_for_same_user(self):
+        room = WaitingRoom(admit_per_second=1, burst=0, timer=lambda: 0)
+
+        first = room.issue_ticket(1, 1)
+        room.issue_ticket(1, 2)
+
+        assert room.issue_ticket(1, 1) == first
+
+    def test_idle_time_should_not_accumulate_more_than_burst(self):
+        now = [0]
+        room = WaitingRoom(admit_per_second=10, burst=2, timer=lambda: now[0])
+        room.issue_ticket(1, 1)
+
+        now[0] = 1000
+        statuses = [room.issue_ticket(1, user_id) for user_id in range(2, 6)]
+
+        assert [status.admitted for status in statuses] == [True, True, False, False]
+
+    def test_queues_should_be_separated_by_exam_schedule(self):
+        room = WaitingRoom(admit_per_second=1, burst=1, timer=lambda: 0)
+
+        room.issue_ticket(1, 1)
+
+        assert room.issue_ticket(2, 2).admitted
+        assert room.get_status(2, 1) is None
+
+    def test_complete_should_remove_ticket(self):
+        room = WaitingRoom(admit_per_second=1, burst=1, timer=lambda: 0)
+        room.issue_ticket(1, 1)
+
+        room.complete(1, 1)
+
+        assert room.get_status(1, 1) is None
+
+    def test_expired_tickets_and_queues_should_be_pruned(self):
+        now = [0]
+        room = WaitingRoom(admit_per_second=1, burst=0, ticket_ttl=60, timer=lambda: now[0])
+        room.issue_ticket(1, 1)
+        room.issue_ticket(1, 2)
+        room.issue_ticket(2, 3)
+
+        # 대기 상태를 계속 조회하는 유저의 대기표는 유지됩니다
+        now[0] = 50
+        room.get_status(1, 2)
+        now[0] = 100
+        room.issue_ticket(3, 4)
+
+        assert room.get_status(1, 1) is None
+        assert room.get_status(1, 2).ticket == 2
+        assert room.get_status(2, 3) is None
+        assert sorted(room._queues) == [1, 3]
+
+    @pytest.mark.skipif(not BENCHMARK_DATABASE_URL.startswith('postgresql'),
+                        reason='BENCHMARK_DATABASE_URL is not a postgres url')
+    def test_start_should_fail_when_other_process_uses_waiting_room(self):
+        postgres_engine = create_engine(BENCHMARK_DATABASE_URL)
+        first, second = WaitingRoom(enabled=True), WaitingRoom(enabled=True)
+
+        try:
+            first.start(postgres_engine)
+            with pytest.raises(RuntimeError):
+                second.start(postgres_engine)
+        finally:
+            first.stop()
+            second.stop()
+            postgres_engine.dispose()
+
+
+class TestWaitingRoomRoute:
+    def test_issue_ticket_should_return_403_for_admin(self, test_db_with_users):
+        token = encode_jwt('2', 'admin 1', 'admin')
+
+        response = client.post("/api/v1/waiting_room/1", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 403, response.text
+
+    def test_get_status_should_return_404_without_ticket(self, test_db_with_users):
+        token = encode_jwt('1', 'user 1', 'client')
+
+        response = client.get("/api/v1/waiting_room/1", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 404, response.text
+        assert response.json()['detail'] == "Waiting room ticket not found"
+
+    def test_make_reservation_should_require_admission_when_enabled(self, test_db_with_users_and_exam_schedules,
+                                                                    monkeypatch):
+        monkeypatch.setattr(waiting_room, 'enabled', True)
+        monkeypatch.setattr(waiting_room, 'burst', 0)
+        monkeypatch.setattr(waiting_room, 'admit_per_second', 0.001)
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 429, response.text
+        assert response.json()['detail'] == "Waiting room ticket is required to make a reservation"
+
+        response = client.post("/api/v1/waiting_room/1", headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()['admitted'] is False
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 429, response.text
+        assert response.json()['detail'] == "Not admitted from the waiting room yet"
+        assert 'Retry-After' in response.headers
+
+    def test_make_reservation_should_succeed_after_admission(self, test_db_with_users_and_exam_schedules, monkeypatch):
+        monkeypatch.setattr(waiting_room, 'enabled', True)
+        token = encode_jwt('1', 'user 1', 'client')
+        headers = {"Authorization": f"Bearer {token}"}
+
+        response = client.post("/api/v1/waiting_room/1", headers=headers)
+        assert response.json()['admitted'] is True
+
+        response = client.get("/api/v1/waiting_room/1", headers=headers)
+        assert response.json() == {'exam_schedule_id': 1, 'ticket': 1, 'admitted': True, 'position': 0,
+                                   'estimated_wait_seconds': 0}
+
+        response = client.post("/api/v1/reservation/make_reservation/1", headers=headers, json={'comment': ''})
+        assert response.status_code == 201, response.text
+
+        # 예약을 마치면 대기표는 삭제됩니다
+        response = client.get("/api/v1/waiting_room/1", headers=headers)
+        assert response.status_code == 404, response.text
@@ -1,11 +1,13 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
 import jwt
 from dotenv import load_dotenv
 import os
 import datetime
+import time
+import uuid
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 
 load_dotenv()
@@ -28,8 +30,53 @@ def decode_jwt(token):
     return jwt.decode(token, JWT_SECRET, algorithms='HS256')
 
 
+def generate_uuid7() -> uuid.UUID:
+    """
+    시간순으로 정렬되는 UUID version 7(RFC 9562)을 생성합니다.
+    앞의 48bit가 millisecond 단위 unix timestamp라서, index에 항상 뒤쪽으로 추가되어 B-tree page split이 적습니다.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), 'big')
+    # version(4bit)과 variant(2bit) 필드 설정
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def as_utc(value: datetime.datetime) -> datetime.datetime:
+    """
+    DB에는 timezone 없이 UTC 시각으로 저장되므로, timezone이 없는 값은 UTC로 간주합니다.
+    """
+    return value.replace(tzinfo=datetime.UTC) if value.tzinfo is None else value
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]):
-    return decode_jwt(token)
\ No newline at end of file
+    return decode_jwt(token)
+
+
+def get_token_payload_from_request(request: Request) -> Optional[dict]:
+    """
+    요청의 bearer token을 읽습니다. token이 없거나 잘못된 경우 None을 반환합니다.
+    """
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme != 'Bearer' or not token:
+        return None
+
+    try:
+        return decode_jwt(token)
+    except Exception:
+        return None
+
+
+def get_user_id_from_request(request: Request) -> Optional[int]:
+    """
+    요청의 bearer token에서 유저의 `id`를 읽습니다. token이 없거나 잘못된 경우 None을 반환합니다.
+    """
+    payload = get_token_payload_from_request(request)
+    try:
+        return int(payload['id']) if payload else None
+    except (KeyError, TypeError, ValueError):
+        return None